@@ -15,12 +15,26 @@ def create_app(config_name='development'):
     app = Flask(__name__)
     app.config.from_object(config[config_name])
 
+    # Per-view request body limits (see app.utils.uploads.max_content_length)
+    from app.utils.uploads import UploadRequest
+    app.request_class = UploadRequest
+
+    # Fast JSON serialization and compression of large responses
+    from app.utils.json_provider import init_json_provider
+    from app.utils.compression import init_compression
+    init_json_provider(app)
+    init_compression(app)
+
     # Initialize extensions
     db.init_app(app)
     migrate.init_app(app, db)
     CORS(app)
     jwt.init_app(app)
 
+    # Catalog result caches (invalidated on recipe/ingredient writes)
+    from app.services.catalog_cache import init_catalog_cache
+    init_catalog_cache(app)
+
     # JWT error handlers
     @jwt.invalid_token_loader
     def invalid_token_callback(error_string):
@@ -51,6 +65,10 @@ def create_app(config_name='development'):
     app.register_blueprint(ingredients_bp, url_prefix='/api/ingredients')
     app.register_blueprint(users_bp, url_prefix='/api/users')
 
+    # CLI commands
+    from app.cli import register_commands
+    register_commands(app)
+
     # Health check route
     @app.route('/health')
     def health():
@@ -1,12 +1,19 @@
+import functools
 import logging
 import os
 
 from flask import request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app import db
-from app.models import Ingredient, DetectionFeedback
+from app.models import Ingredient, DetectionFeedback, DetectionAnnotation, UnmappedLabel
 from app.api import ingredients_bp
-from app.ml.google_vision_detector import GoogleVisionDetector
+from app.ml.google_vision_detector import GoogleVisionDetector, VisionBackend
+from app.ml.detector_backends import DetectorUnavailable, GuardedBackend, StubBackend
+from app.ml.annotation_cache import AnnotationCache
+from app.ml.near_duplicates import NearDuplicateIndex
+from app.ml.preprocess import ImagePreprocessor
+from app.services.unmapped_labels import unmapped_label_counter
+from app.utils.uploads import MULTIPART_OVERHEAD, UploadTooLarge, max_content_length, read_upload
 
 logger = logging.getLogger(__name__)
 
@@ -24,9 +31,34 @@ def get_vision_detector():
             # Get the backend directory (parent of app directory)
             backend_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
             credentials_path = os.path.join(backend_dir, credentials_path)
-        logger.debug(f"Loading Google Vision credentials from: {credentials_path}")
-        vision_detector = GoogleVisionDetector(credentials_path=credentials_path)
-        logger.debug(f"Google Vision available: {vision_detector.available}")
+        config = current_app.config
+        backend_name = config.get('DETECTION_BACKEND', 'vision')
+        if backend_name == 'stub':
+            backend = StubBackend.from_config(config)
+        else:
+            if backend_name != 'vision':
+                logger.warning(f"Unknown DETECTION_BACKEND '{backend_name}', using Google Vision")
+            logger.debug(f"Loading Google Vision credentials from: {credentials_path}")
+            backend = VisionBackend(credentials_path)
+        recorder = None
+        if config.get('DETECTION_STORE_ANNOTATIONS', True):
+            recorder = functools.partial(DetectionAnnotation.record_many, backend=backend.name)
+        counter = None
+        if config.get('DETECTION_TRACK_UNMAPPED', True):
+            counter = unmapped_label_counter
+            counter.configure(
+                flush_size=config.get('DETECTION_UNMAPPED_FLUSH_SIZE', 200),
+                flush_interval=config.get('DETECTION_UNMAPPED_FLUSH_INTERVAL', 60)
+            )
+        vision_detector = GoogleVisionDetector(
+            backend=GuardedBackend.from_config(backend, config),
+            annotation_recorder=recorder,
+            unmapped_counter=counter,
+            annotation_cache=AnnotationCache.from_config(current_app.config),
+            near_duplicates=NearDuplicateIndex.from_config(current_app.config),
+            preprocessor=ImagePreprocessor.from_config(current_app.config)
+        )
+        logger.debug(f"Detection backend '{backend.name}' available: {vision_detector.available}")
     return vision_detector
 
 
@@ -74,6 +106,55 @@ def get_ingredient(ingredient_id):
     return jsonify({'ingredient': ingredient.to_dict()}), 200
 
 
+ALLOWED_IMAGE_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'bmp'}
+MAX_IMAGE_SIZE = 10 * 1024 * 1024  # 10MB
+DETECTOR_UNAVAILABLE_MESSAGE = 'Ingredient detection is busy or temporarily unavailable. Please try again shortly.'
+
+
+def _validate_image_file(file):
+    """Return an error message for an unusable upload, or None"""
+    if file.filename == '':
+        return 'No selected file'
+    if '.' not in file.filename or file.filename.rsplit('.', 1)[1].lower() not in ALLOWED_IMAGE_EXTENSIONS:
+        return 'Invalid file type. Allowed: png, jpg, jpeg, gif, bmp'
+    return None
+
+
+def _detection_response(all_detections, detection_source, vision_det, **extra):
+    """Build the detection response body shared by /detect and /detect/batch"""
+    # Extract ingredient names (filter None values)
+    ingredient_names = list(set([d['name'] for d in all_detections if d.get('name')]))
+
+    # Get high-confidence ingredients
+    high_confidence = [
+        d['name'] for d in all_detections
+        if d.get('name') and d.get('confidence', 0) >= 0.7
+    ]
+    high_confidence = list(set(high_confidence))
+
+    # Query database for detected ingredients
+    detected_ingredients = []
+    if ingredient_names:
+        ingredients = Ingredient.query.filter(
+            Ingredient.name.in_(ingredient_names)
+        ).all()
+        detected_ingredients = [ing.to_dict() for ing in ingredients]
+
+    return {
+        'message': 'Ingredient detection successful',
+        'detections': all_detections,
+        'ingredient_names': ingredient_names,
+        'high_confidence_ingredients': high_confidence,
+        'detected_ingredients': detected_ingredients,
+        'total_detected': len(all_detections),
+        **extra,
+        'debug_info': {
+            'detection_source': detection_source,
+            'vision_available': vision_det.available if vision_det is not None else False
+        }
+    }
+
+
 @ingredients_bp.route('/detect', methods=['POST'])
 @jwt_required()
 def detect_ingredients():
@@ -83,18 +164,15 @@ def detect_ingredients():
 
     file = request.files['image']
 
-    if file.filename == '':
-        return jsonify({'error': 'No selected file'}), 400
-
-    # Validate file extension
-    allowed_extensions = {'png', 'jpg', 'jpeg', 'gif', 'bmp'}
-    if '.' not in file.filename or file.filename.rsplit('.', 1)[1].lower() not in allowed_extensions:
-        return jsonify({'error': 'Invalid file type. Allowed: png, jpg, jpeg, gif, bmp'}), 400
+    error = _validate_image_file(file)
+    if error:
+        return jsonify({'error': error}), 400
 
     try:
-        # Read image bytes and validate size (max 10MB)
-        image_bytes = file.read()
-        if len(image_bytes) > 10 * 1024 * 1024:
+        # Read image bytes, rejecting anything over 10MB before it is loaded
+        try:
+            image_bytes = read_upload(file, MAX_IMAGE_SIZE)
+        except UploadTooLarge:
             return jsonify({'error': 'Image too large. Maximum size is 10MB.'}), 400
 
         all_detections = []
@@ -103,44 +181,96 @@ def detect_ingredients():
         # Detect ingredients using Google Vision API
         vision_det = get_vision_detector()
         if vision_det is not None and vision_det.available:
-            vision_detections = vision_det.detect_from_bytes(image_bytes)
+            vision_detections = vision_det.detect_from_bytes(image_bytes, scope=get_jwt_identity())
             if vision_detections:
                 all_detections.extend(vision_detections)
                 detection_source = 'google_vision'
 
-        # Extract ingredient names (filter None values)
-        ingredient_names = list(set([d['name'] for d in all_detections if d.get('name')]))
-
-        # Get high-confidence ingredients
-        high_confidence = [
-            d['name'] for d in all_detections
-            if d.get('name') and d.get('confidence', 0) >= 0.7
-        ]
-        high_confidence = list(set(high_confidence))
+        return jsonify(_detection_response(all_detections, detection_source, vision_det)), 200
 
-        # Query database for detected ingredients
-        detected_ingredients = []
-        if ingredient_names:
-            ingredients = Ingredient.query.filter(
-                Ingredient.name.in_(ingredient_names)
-            ).all()
-            detected_ingredients = [ing.to_dict() for ing in ingredients]
+    except DetectorUnavailable as e:
+        logger.warning(f'Ingredient detection unavailable: {e}')
+        return jsonify({'error': DETECTOR_UNAVAILABLE_MESSAGE}), 503
 
+    except Exception:
+        logger.exception('Ingredient detection failed')
         return jsonify({
-            'message': 'Ingredient detection successful',
-            'detections': all_detections,
-            'ingredient_names': ingredient_names,
-            'high_confidence_ingredients': high_confidence,
-            'detected_ingredients': detected_ingredients,
-            'total_detected': len(all_detections),
-            'debug_info': {
-                'detection_source': detection_source,
-                'vision_available': vision_det.available if vision_det is not None else False
+            'error': 'Ingredient detection failed. Please try again.'
+        }), 500
+
+
+def _batch_max_content_length(config):
+    """Body limit for /detect/batch: a full batch of maximum-size images"""
+    return config.get('DETECTION_BATCH_MAX_IMAGES', 10) * MAX_IMAGE_SIZE + MULTIPART_OVERHEAD
+
+
+@ingredients_bp.route('/detect/batch', methods=['POST'])
+@max_content_length(_batch_max_content_length)
+@jwt_required()
+def detect_ingredients_batch():
+    """
+    Detect ingredients across several photos (e.g. a whole pantry) at once.
+
+    Accepts multipart form data with repeated `images` files. The photos are
+    annotated with batched Vision calls and their detections are merged, so
+    an ingredient seen in several photos is reported once.
+
+    Each image may be up to 10MB. The request body may be up to
+    DETECTION_BATCH_MAX_IMAGES * 10MB plus 1MB of multipart overhead (101MB
+    by default) instead of the app-wide MAX_CONTENT_LENGTH; larger bodies
+    get a 413.
+    """
+    files = request.files.getlist('images')
+    if not files:
+        return jsonify({'error': 'No image files provided'}), 400
+
+    max_images = current_app.config.get('DETECTION_BATCH_MAX_IMAGES', 10)
+    if len(files) > max_images:
+        return jsonify({'error': f'Too many images. Maximum is {max_images} per request.'}), 400
+
+    for file in files:
+        error = _validate_image_file(file)
+        if error:
+            return jsonify({'error': f'{file.filename or "image"}: {error}'}), 400
+
+    try:
+        images = []
+        for file in files:
+            try:
+                images.append(read_upload(file, MAX_IMAGE_SIZE))
+            except UploadTooLarge:
+                return jsonify({'error': f'{file.filename}: Image too large. Maximum size is 10MB.'}), 400
+
+        detections_per_image = [[] for _ in images]
+        detection_source = 'none'
+
+        vision_det = get_vision_detector()
+        if vision_det is not None and vision_det.available:
+            detections_per_image = vision_det.detect_batch_from_bytes(images, scope=get_jwt_identity())
+            if any(detections_per_image):
+                detection_source = 'google_vision'
+
+        all_detections = GoogleVisionDetector.merge_detections(detections_per_image)
+        per_image = [
+            {
+                'filename': file.filename,
+                'ingredient_names': sorted({d['name'] for d in detections if d.get('name')}),
+                'total_detected': len(detections)
             }
-        }), 200
+            for file, detections in zip(files, detections_per_image)
+        ]
+
+        return jsonify(_detection_response(
+            all_detections, detection_source, vision_det,
+            images=per_image, total_images=len(images)
+        )), 200
+
+    except DetectorUnavailable as e:
+        logger.warning(f'Batch ingredient detection unavailable: {e}')
+        return jsonify({'error': DETECTOR_UNAVAILABLE_MESSAGE}), 503
 
     except Exception:
-        logger.exception('Ingredient detection failed')
+        logger.exception('Batch ingredient detection failed')
         return jsonify({
             'error': 'Ingredient detection failed. Please try again.'
         }), 500
@@ -207,7 +337,28 @@ def submit_detection_feedback():
     corrections = data.get('corrections', [])
     user_id = get_jwt_identity()
 
+    valid = [c for c in corrections if c.get('detected_label') and c.get('correct_ingredient')]
+
+    # Look up ingredient IDs for every correction in one query
+    names = {correction['correct_ingredient'] for correction in valid}
+    ingredient_ids = dict(
+        db.session.query(Ingredient.name, Ingredient.id).filter(Ingredient.name.in_(names)).all()
+    ) if names else {}
+
+    # Add or update all feedback in one transaction
+    saved = DetectionFeedback.upsert_many([
+        {
+            'detected_label': correction['detected_label'],
+            'correct_ingredient': correction['correct_ingredient'],
+            'ai_mapped': correction.get('ai_mapped'),
+            'ingredient_id': ingredient_ids.get(correction['correct_ingredient']),
+            'user_id': user_id
+        }
+        for correction in valid
+    ])
+
     results = []
+    saved_iter = iter(saved)
     for correction in corrections:
         detected_label = correction.get('detected_label')
         correct_ingredient = correction.get('correct_ingredient')
@@ -219,27 +370,15 @@ def submit_detection_feedback():
             })
             continue
 
-        # Look up ingredient ID if it exists in database
-        ingredient = Ingredient.query.filter_by(name=correct_ingredient).first()
-        ingredient_id = ingredient.id if ingredient else None
-
-        # Add or update feedback
-        feedback = DetectionFeedback.add_or_update_feedback(
-            detected_label=detected_label,
-            correct_ingredient=correct_ingredient,
-            ai_mapped=correction.get('ai_mapped'),
-            ingredient_id=ingredient_id,
-            user_id=user_id
-        )
-
+        feedback = next(saved_iter)
         results.append({
             'success': True,
-            'feedback': feedback.to_dict(),
+            'feedback': DetectionFeedback.row_to_dict(feedback),
             'message': f"Learned: '{detected_label}' -> '{correct_ingredient}'"
         })
 
-    # Clear the learned mappings cache to pick up new corrections immediately
-    GoogleVisionDetector._cache_timestamp = None
+    # Apply the corrections to the learned mappings immediately
+    GoogleVisionDetector.apply_feedback(saved)
 
     return jsonify({
         'message': f'Processed {len(results)} corrections',
@@ -265,3 +404,32 @@ def get_learned_mappings():
             for label, data in mappings.items()
         ]
     }), 200
+
+
+@ingredients_bp.route('/detect/unmapped-labels', methods=['GET'])
+@jwt_required()
+def get_unmapped_labels():
+    """
+    Vision labels that no mapping turns into an ingredient, most frequent first.
+    Use this to decide which labels to add to VISION_TO_INGREDIENT.
+
+    Query params:
+        limit: Labels to return (1-200, default 50)
+        min_count: Only labels seen at least this often (default 1)
+    """
+    try:
+        limit = int(request.args.get('limit', 50))
+        min_count = int(request.args.get('min_count', 1))
+    except ValueError:
+        return jsonify({'error': 'limit and min_count must be integers'}), 400
+    if not 1 <= limit <= 200:
+        return jsonify({'error': 'limit must be between 1 and 200'}), 400
+
+    # Include this worker's buffered counts
+    unmapped_label_counter.flush()
+    labels = UnmappedLabel.get_ranked(limit=limit, min_count=min_count)
+
+    return jsonify({
+        'total_labels': len(labels),
+        'labels': [label.to_dict() for label in labels]
+    }), 200
@@ -1,33 +1,45 @@
-from flask import request, jsonify
+import logging
+import math
+from datetime import datetime
+
+from flask import request, jsonify, current_app, send_file
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from sqlalchemy.orm import joinedload
 from app import db
 from app.models import Recipe, RecipeIngredient, Ingredient
 from app.api import recipes_bp
 from app.ml import RecipeRecommender
+from app.services.catalog_cache import CatalogCache, search_cache, facets_cache
+from app.services.recipe_serializer import serialize_recipes
+
+logger = logging.getLogger(__name__)
 
 # Initialize recommender
 recommender = RecipeRecommender()
 
+# Upper bound on page size for ingredient search
+MAX_SEARCH_PER_PAGE = 100
 
-@recipes_bp.route('/', methods=['GET'])
-def get_recipes():
-    """Get all recipes with optional filters"""
-    # Query parameters for filtering
-    cuisine_type = request.args.get('cuisine_type')
-    meal_type = request.args.get('meal_type')
-    difficulty = request.args.get('difficulty')
-    is_vegetarian = request.args.get('is_vegetarian')
-    is_vegan = request.args.get('is_vegan')
-    is_gluten_free = request.args.get('is_gluten_free')
-    max_time = request.args.get('max_time', type=int)
+# Upper bound on recipes accepted by a single bulk import request
+MAX_BULK_RECIPES = 5000
 
-    # Pagination
-    page = request.args.get('page', 1, type=int)
-    per_page = request.args.get('per_page', 20, type=int)
+# Attempts at replacing a re-rated meal plan's rating under concurrent updates
+RATE_RETRIES = 3
+
+# Facet buckets for total_time (upper bound in minutes, label)
+TIME_BUCKETS = [(15, '0-15'), (30, '16-30'), (60, '31-60')]
+TIME_BUCKET_OVERFLOW = '60+'
+DIETARY_FLAGS = ('is_vegetarian', 'is_vegan', 'is_gluten_free', 'is_dairy_free')
 
-    # Build query
-    query = Recipe.query
+
+def _apply_recipe_filters(query, args):
+    """Apply the browse filters shared by the recipe list and facet endpoints"""
+    cuisine_type = args.get('cuisine_type')
+    meal_type = args.get('meal_type')
+    difficulty = args.get('difficulty')
+    is_vegetarian = args.get('is_vegetarian')
+    is_vegan = args.get('is_vegan')
+    is_gluten_free = args.get('is_gluten_free')
+    max_time = args.get('max_time', type=int)
 
     if cuisine_type:
         query = query.filter_by(cuisine_type=cuisine_type)
@@ -44,13 +56,26 @@ def get_recipes():
     if max_time:
         query = query.filter(Recipe.total_time <= max_time)
 
+    return query
+
+
+@recipes_bp.route('/', methods=['GET'])
+def get_recipes():
+    """Get all recipes with optional filters"""
+    # Pagination
+    page = request.args.get('page', 1, type=int)
+    per_page = request.args.get('per_page', 20, type=int)
+
+    # Build query
+    query = _apply_recipe_filters(Recipe.query, request.args)
+
     # Execute query with pagination
     paginated = query.order_by(Recipe.rating.desc()).paginate(
         page=page, per_page=per_page, error_out=False
     )
 
     return jsonify({
-        'recipes': [recipe.to_dict(include_ingredients=False) for recipe in paginated.items],
+        'recipes': serialize_recipes(paginated.items, include_ingredients=False),
         'total': paginated.total,
         'page': page,
         'per_page': per_page,
@@ -58,6 +83,70 @@ def get_recipes():
     }), 200
 
 
+@recipes_bp.route('/facets', methods=['GET'])
+def get_recipe_facets():
+    """
+    Get recipe counts per cuisine, meal type, difficulty, dietary flag and
+    total time bucket for the current filter set (same filters as GET /).
+    """
+    filter_keys = ('cuisine_type', 'meal_type', 'difficulty', 'is_vegetarian',
+                   'is_vegan', 'is_gluten_free', 'max_time')
+    cache_key = (CatalogCache.version(),) + tuple(request.args.get(key) for key in filter_keys)
+    cached = facets_cache.get(cache_key)
+    if cached is not None:
+        return jsonify(cached), 200
+
+    time_bucket = db.case(
+        *[(Recipe.total_time <= upper, label) for upper, label in TIME_BUCKETS],
+        else_=db.case((Recipe.total_time.isnot(None), TIME_BUCKET_OVERFLOW), else_=None)
+    ).label('time_bucket')
+
+    dimensions = (
+        Recipe.cuisine_type,
+        Recipe.meal_type,
+        Recipe.difficulty_level,
+        Recipe.is_vegetarian,
+        Recipe.is_vegan,
+        Recipe.is_gluten_free,
+        Recipe.is_dairy_free,
+        time_bucket
+    )
+
+    # One grouped query over every facet dimension; roll up per facet below
+    query = db.session.query(*dimensions, db.func.count(Recipe.id))
+    query = _apply_recipe_filters(query.select_from(Recipe), request.args)
+    rows = query.group_by(*dimensions).all()
+
+    total = 0
+    facets = {
+        'cuisine_type': {},
+        'meal_type': {},
+        'difficulty_level': {},
+        'dietary': {flag: 0 for flag in DIETARY_FLAGS},
+        'total_time': {label: 0 for _, label in TIME_BUCKETS}
+    }
+    facets['total_time'][TIME_BUCKET_OVERFLOW] = 0
+
+    for (cuisine_type, meal_type, difficulty, is_vegetarian, is_vegan,
+         is_gluten_free, is_dairy_free, bucket, count) in rows:
+        total += count
+        for facet, value in (('cuisine_type', cuisine_type),
+                             ('meal_type', meal_type),
+                             ('difficulty_level', difficulty)):
+            if value is not None:
+                facets[facet][value] = facets[facet].get(value, 0) + count
+        for flag, value in zip(DIETARY_FLAGS, (is_vegetarian, is_vegan, is_gluten_free, is_dairy_free)):
+            if value:
+                facets['dietary'][flag] += count
+        if bucket is not None:
+            facets['total_time'][bucket] += count
+
+    payload = {'total': total, 'facets': facets}
+    facets_cache.set(cache_key, payload)
+
+    return jsonify(payload), 200
+
+
 @recipes_bp.route('/<int:recipe_id>', methods=['GET'])
 def get_recipe(recipe_id):
     """Get a specific recipe by ID"""
@@ -75,60 +164,191 @@ def get_recipe(recipe_id):
 
 @recipes_bp.route('/search', methods=['POST'])
 def search_recipes():
-    """Search recipes by available ingredients"""
+    """Search recipes by available ingredients, ranked by match percentage"""
     data = request.get_json()
 
     if not data or not data.get('ingredients'):
         return jsonify({'error': 'Ingredients list is required'}), 400
 
-    ingredient_names = [ing.lower() for ing in data['ingredients']]
+    ingredient_names = sorted({ing.lower().strip() for ing in data['ingredients']})
+    prefs = data.get('dietary_preferences') or {}
 
-    # Find ingredient IDs
-    ingredients = Ingredient.query.filter(
-        db.func.lower(Ingredient.name).in_(ingredient_names)
-    ).all()
+    # Pagination
+    try:
+        page = max(int(data.get('page', 1)), 1)
+        per_page = min(max(int(data.get('per_page', 20)), 1), MAX_SEARCH_PER_PAGE)
+    except (TypeError, ValueError):
+        return jsonify({'error': 'page and per_page must be integers'}), 400
+
+    # Serve repeated queries (same ingredient set and filters) from cache
+    cache_key = (
+        tuple(ingredient_names),
+        bool(prefs.get('is_vegetarian')),
+        bool(prefs.get('is_vegan')),
+        bool(prefs.get('is_gluten_free')),
+        page,
+        per_page
+    )
+    cached = search_cache.get(cache_key)
+    if cached is not None:
+        return jsonify(cached), 200
 
-    ingredient_ids = [ing.id for ing in ingredients]
+    # Find ingredient IDs
+    ingredient_ids = [
+        row[0] for row in db.session.query(Ingredient.id).filter(
+            db.func.lower(Ingredient.name).in_(ingredient_names)
+        ).all()
+    ]
 
     if not ingredient_ids:
-        return jsonify({'recipes': []}), 200
-
-    # Find recipes that use these ingredients (eager load ingredients to avoid N+1)
-    recipes_query = db.session.query(Recipe).join(RecipeIngredient).filter(
+        payload = {
+            'recipes': [],
+            'total': 0,
+            'page': page,
+            'per_page': per_page,
+            'pages': 0
+        }
+        search_cache.set(cache_key, payload)
+        return jsonify(payload), 200
+
+    # Count matching ingredients per recipe (only recipes with at least one match)
+    matched = db.session.query(
+        RecipeIngredient.recipe_id.label('recipe_id'),
+        db.func.count(db.distinct(RecipeIngredient.ingredient_id)).label('matching')
+    ).filter(
         RecipeIngredient.ingredient_id.in_(ingredient_ids)
-    ).options(joinedload(Recipe.ingredients)).distinct(Recipe.id)
+    ).group_by(RecipeIngredient.recipe_id).subquery()
+
+    # Total ingredient lines per matched recipe
+    totals = db.session.query(
+        RecipeIngredient.recipe_id.label('recipe_id'),
+        db.func.count(RecipeIngredient.id).label('total')
+    ).filter(
+        RecipeIngredient.recipe_id.in_(db.select(matched.c.recipe_id))
+    ).group_by(RecipeIngredient.recipe_id).subquery()
+
+    match_ratio = matched.c.matching * 1.0 / totals.c.total
+
+    recipes_query = db.session.query(
+        Recipe, matched.c.matching, totals.c.total
+    ).join(
+        matched, matched.c.recipe_id == Recipe.id
+    ).join(
+        totals, totals.c.recipe_id == Recipe.id
+    )
 
     # Apply additional filters if provided
-    if data.get('dietary_preferences'):
-        prefs = data['dietary_preferences']
-        if prefs.get('is_vegetarian'):
-            recipes_query = recipes_query.filter_by(is_vegetarian=True)
-        if prefs.get('is_vegan'):
-            recipes_query = recipes_query.filter_by(is_vegan=True)
-        if prefs.get('is_gluten_free'):
-            recipes_query = recipes_query.filter_by(is_gluten_free=True)
-
-    recipes = recipes_query.all()
-
-    # Calculate match percentage for each recipe
+    if prefs.get('is_vegetarian'):
+        recipes_query = recipes_query.filter(Recipe.is_vegetarian.is_(True))
+    if prefs.get('is_vegan'):
+        recipes_query = recipes_query.filter(Recipe.is_vegan.is_(True))
+    if prefs.get('is_gluten_free'):
+        recipes_query = recipes_query.filter(Recipe.is_gluten_free.is_(True))
+
+    total_results = recipes_query.order_by(None).count()
+
+    rows = recipes_query.order_by(
+        match_ratio.desc(), Recipe.rating.desc(), Recipe.id
+    ).limit(per_page).offset((page - 1) * per_page).all()
+
+    recipe_dicts = serialize_recipes([row[0] for row in rows])
+
     results = []
-    for recipe in recipes:
-        recipe_ingredient_ids = [ri.ingredient_id for ri in recipe.ingredients]
-        matching = len(set(ingredient_ids) & set(recipe_ingredient_ids))
-        total = len(recipe_ingredient_ids)
-        match_percentage = (matching / total * 100) if total > 0 else 0
-
-        recipe_dict = recipe.to_dict()
-        recipe_dict['match_percentage'] = round(match_percentage, 2)
+    for recipe_dict, (_, matching, total) in zip(recipe_dicts, rows):
+        recipe_dict['match_percentage'] = round(matching / total * 100, 2)
         recipe_dict['matching_ingredients'] = matching
         recipe_dict['total_ingredients'] = total
-
         results.append(recipe_dict)
 
-    # Sort by match percentage
-    results.sort(key=lambda x: x['match_percentage'], reverse=True)
-
-    return jsonify({'recipes': results}), 200
+    payload = {
+        'recipes': results,
+        'total': total_results,
+        'page': page,
+        'per_page': per_page,
+        'pages': math.ceil(total_results / per_page)
+    }
+    search_cache.set(cache_key, payload)
+
+    return jsonify(payload), 200
+
+
+# Expected JSON types of recipe fields in create payloads (None is allowed
+# for all but name); string lengths come from the column definitions
+RECIPE_FIELD_TYPES = {
+    'name': str,
+    'description': str,
+    'cuisine_type': str,
+    'meal_type': str,
+    'difficulty_level': str,
+    'image_url': str,
+    'prep_time': int,
+    'cook_time': int,
+    'total_time': int,
+    'servings': int,
+    'calories': float,
+    'protein': float,
+    'carbohydrates': float,
+    'fat': float,
+    'fiber': float,
+    'is_vegetarian': bool,
+    'is_vegan': bool,
+    'is_gluten_free': bool,
+    'is_dairy_free': bool,
+    'instructions': list
+}
+TYPE_NAMES = {str: 'a string', int: 'an integer', float: 'a number', bool: 'a boolean', list: 'a list'}
+
+
+def _recipe_field_error(fields):
+    """
+    Check recipe column values against RECIPE_FIELD_TYPES.
+
+    Returns:
+        An error message for the first invalid field, or None
+    """
+    for field, value in fields.items():
+        if value is None:
+            continue
+        expected = RECIPE_FIELD_TYPES[field]
+        accepted = (int, float) if expected is float else expected
+        # bool is an int subclass; only accept it for boolean fields
+        if not isinstance(value, accepted) or (isinstance(value, bool) and expected is not bool):
+            return f"'{field}' must be {TYPE_NAMES[expected]}"
+        if expected is str:
+            length = Recipe.__table__.c[field].type.length
+            if length and len(value) > length:
+                return f"'{field}' must be at most {length} characters"
+    return None
+
+
+def _is_id(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _recipe_fields(data):
+    """Extract recipe column values from a create payload"""
+    return {
+        'name': data['name'],
+        'description': data.get('description'),
+        'cuisine_type': data.get('cuisine_type'),
+        'meal_type': data.get('meal_type'),
+        'difficulty_level': data.get('difficulty_level'),
+        'prep_time': data.get('prep_time'),
+        'cook_time': data.get('cook_time'),
+        'total_time': data.get('total_time'),
+        'servings': data.get('servings', 1),
+        'instructions': data.get('instructions'),
+        'calories': data.get('calories'),
+        'protein': data.get('protein'),
+        'carbohydrates': data.get('carbohydrates'),
+        'fat': data.get('fat'),
+        'fiber': data.get('fiber'),
+        'is_vegetarian': data.get('is_vegetarian', False),
+        'is_vegan': data.get('is_vegan', False),
+        'is_gluten_free': data.get('is_gluten_free', False),
+        'is_dairy_free': data.get('is_dairy_free', False),
+        'image_url': data.get('image_url')
+    }
 
 
 @recipes_bp.route('/', methods=['POST'])
@@ -140,28 +360,7 @@ def create_recipe():
     if not data or not data.get('name'):
         return jsonify({'error': 'Recipe name is required'}), 400
 
-    recipe = Recipe(
-        name=data['name'],
-        description=data.get('description'),
-        cuisine_type=data.get('cuisine_type'),
-        meal_type=data.get('meal_type'),
-        difficulty_level=data.get('difficulty_level'),
-        prep_time=data.get('prep_time'),
-        cook_time=data.get('cook_time'),
-        total_time=data.get('total_time'),
-        servings=data.get('servings', 1),
-        instructions=data.get('instructions'),
-        calories=data.get('calories'),
-        protein=data.get('protein'),
-        carbohydrates=data.get('carbohydrates'),
-        fat=data.get('fat'),
-        fiber=data.get('fiber'),
-        is_vegetarian=data.get('is_vegetarian', False),
-        is_vegan=data.get('is_vegan', False),
-        is_gluten_free=data.get('is_gluten_free', False),
-        is_dairy_free=data.get('is_dairy_free', False),
-        image_url=data.get('image_url')
-    )
+    recipe = Recipe(**_recipe_fields(data))
 
     db.session.add(recipe)
     db.session.commit()
@@ -172,6 +371,192 @@ def create_recipe():
     }), 201
 
 
+@recipes_bp.route('/bulk', methods=['POST'])
+@jwt_required()
+def bulk_create_recipes():
+    """
+    Import many recipes with nested ingredient lines in one transaction.
+
+    Expected JSON body:
+    {
+        "recipes": [
+            {
+                "name": "Chicken Adobo",
+                ... other recipe fields as in POST /api/recipes/ ...
+                "ingredients": [
+                    {"ingredient_id": 3, "quantity": 500, "unit": "g"},
+                    {"name": "Garlic", "quantity": 6, "unit": "cloves", "preparation": "minced"}
+                ]
+            }
+        ]
+    }
+
+    Invalid items are skipped and reported in "errors" by index; valid
+    items are inserted together.
+    """
+    data = request.get_json()
+
+    if not data or not isinstance(data.get('recipes'), list) or not data['recipes']:
+        return jsonify({'error': 'Recipes array is required'}), 400
+
+    items = data['recipes']
+    if len(items) > MAX_BULK_RECIPES:
+        return jsonify({'error': f'At most {MAX_BULK_RECIPES} recipes per request'}), 400
+
+    # Resolve every referenced ingredient (by id or name) with one IN query
+    ref_ids = set()
+    ref_names = set()
+    for item in items:
+        if not isinstance(item, dict) or not isinstance(item.get('ingredients'), list):
+            continue
+        for line in item['ingredients']:
+            if not isinstance(line, dict):
+                continue
+            if _is_id(line.get('ingredient_id')):
+                ref_ids.add(line['ingredient_id'])
+            elif line.get('name'):
+                ref_names.add(str(line['name']).lower().strip())
+
+    ids_by_id = set()
+    ids_by_name = {}
+    if ref_ids or ref_names:
+        rows = db.session.query(Ingredient.id, Ingredient.name).filter(
+            db.or_(
+                Ingredient.id.in_(ref_ids),
+                db.func.lower(Ingredient.name).in_(ref_names)
+            )
+        ).all()
+        for ing_id, ing_name in rows:
+            ids_by_id.add(ing_id)
+            ids_by_name.setdefault(ing_name.lower(), ing_id)
+
+    # Validate items and build insert rows
+    errors = []
+    recipe_rows = []
+    line_rows = []  # Per valid recipe: list of recipe ingredient rows
+    indexes = []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict) or not item.get('name'):
+            errors.append({'index': index, 'error': 'Recipe name is required'})
+            continue
+
+        fields = _recipe_fields(item)
+        error = _recipe_field_error(fields)
+        if not error and not isinstance(item.get('ingredients') or [], list):
+            error = "'ingredients' must be a list"
+        if not error:
+            lines, error = _resolve_ingredient_lines(item.get('ingredients') or [], ids_by_id, ids_by_name)
+        if error:
+            errors.append({'index': index, 'name': item['name'], 'error': error})
+            continue
+
+        recipe_rows.append(fields)
+        line_rows.append(lines)
+        indexes.append(index)
+
+    if not recipe_rows:
+        return jsonify({
+            'error': 'No valid recipes to import',
+            'errors': errors
+        }), 400
+
+    # Insert recipes and their ingredient lines with executemany in one transaction
+    now = datetime.utcnow()
+    for row in recipe_rows:
+        row['created_at'] = now
+        row['updated_at'] = now
+
+    try:
+        recipe_ids = db.session.scalars(
+            db.insert(Recipe).returning(Recipe.id, sort_by_parameter_order=True),
+            recipe_rows
+        ).all()
+
+        ingredient_rows = []
+        for recipe_id, lines in zip(recipe_ids, line_rows):
+            for line in lines:
+                line['recipe_id'] = recipe_id
+                line['created_at'] = now
+                ingredient_rows.append(line)
+
+        if ingredient_rows:
+            db.session.execute(db.insert(RecipeIngredient), ingredient_rows)
+
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        logger.exception('Bulk recipe import failed')
+        return jsonify({'error': 'Bulk import failed; no recipes were created'}), 500
+
+    created = [
+        {'index': index, 'id': recipe_id, 'name': row['name']}
+        for index, recipe_id, row in zip(indexes, recipe_ids, recipe_rows)
+    ]
+
+    return jsonify({
+        'message': f'Imported {len(created)} recipes, {len(errors)} failed',
+        'created_count': len(created),
+        'created': created,
+        'errors': errors if errors else None
+    }), 201
+
+
+def _resolve_ingredient_lines(lines, ids_by_id, ids_by_name):
+    """
+    Turn nested ingredient lines into recipe_ingredients rows.
+
+    Returns:
+        (rows, None) on success or (None, error message) for the first invalid line
+    """
+    rows = []
+    for position, line in enumerate(lines):
+        if not isinstance(line, dict):
+            return None, f'Ingredient line {position} must be an object'
+
+        if line.get('ingredient_id') is not None:
+            ingredient_id = line['ingredient_id']
+            if not _is_id(ingredient_id):
+                return None, f'Ingredient line {position} needs an integer ingredient_id'
+            if ingredient_id not in ids_by_id:
+                return None, f'Ingredient {ingredient_id} not found'
+        elif line.get('name'):
+            ingredient_id = ids_by_name.get(str(line['name']).lower().strip())
+            if ingredient_id is None:
+                return None, f"Ingredient '{line['name']}' not found"
+        else:
+            return None, f'Ingredient line {position} needs an ingredient_id or name'
+
+        try:
+            quantity = float(line.get('quantity'))
+        except (TypeError, ValueError):
+            return None, f'Ingredient line {position} needs a numeric quantity'
+        if not math.isfinite(quantity):
+            return None, f'Ingredient line {position} needs a finite quantity'
+
+        unit = line.get('unit')
+        max_unit = RecipeIngredient.__table__.c.unit.type.length
+        if not isinstance(unit, str) or not unit.strip():
+            return None, f'Ingredient line {position} needs a unit'
+        if len(unit) > max_unit:
+            return None, f'Ingredient line {position} unit must be at most {max_unit} characters'
+
+        preparation = line.get('preparation')
+        max_preparation = RecipeIngredient.__table__.c.preparation.type.length
+        if preparation is not None and not isinstance(preparation, str):
+            return None, f'Ingredient line {position} preparation must be a string'
+        if preparation is not None and len(preparation) > max_preparation:
+            return None, f'Ingredient line {position} preparation must be at most {max_preparation} characters'
+
+        rows.append({
+            'ingredient_id': ingredient_id,
+            'quantity': quantity,
+            'unit': unit,
+            'preparation': preparation,
+            'is_optional': bool(line.get('is_optional', False))
+        })
+    return rows, None
+
+
 @recipes_bp.route('/<int:recipe_id>', methods=['PUT'])
 @jwt_required()
 def update_recipe(recipe_id):
@@ -254,7 +639,6 @@ def delete_recipe(recipe_id):
 def rate_recipe(recipe_id):
     """Rate a recipe (1-5 stars)"""
     from app.models import MealPlan
-    from datetime import datetime
 
     user_id = int(get_jwt_identity())
     data = request.get_json()
@@ -277,10 +661,19 @@ def rate_recipe(recipe_id):
     ).order_by(MealPlan.created_at.desc()).first()
 
     if meal_plan:
-        meal_plan.user_rating = rating
-        if 'notes' in data:
-            meal_plan.user_notes = data['notes']
+        # Replace the rating only if no concurrent request changed it since
+        # it was read; otherwise re-read it so the delta is applied once
+        values = {'user_notes': data['notes']} if 'notes' in data else {}
+        for _ in range(RATE_RETRIES):
+            previous_rating = meal_plan.user_rating
+            if MealPlan.replace_rating(meal_plan.id, previous_rating, rating, **values):
+                break
+            db.session.refresh(meal_plan)
+        else:
+            db.session.rollback()
+            return jsonify({'error': 'Rating changed concurrently, please retry'}), 409
     else:
+        previous_rating = None
         # Create a meal plan entry for the rating
         meal_plan = MealPlan(
             user_id=user_id,
@@ -294,16 +687,11 @@ def rate_recipe(recipe_id):
         )
         db.session.add(meal_plan)
 
-    # Update recipe's average rating
-    all_ratings = db.session.query(MealPlan.user_rating).filter(
-        MealPlan.recipe_id == recipe_id,
-        MealPlan.user_rating.isnot(None)
-    ).all()
-
-    if all_ratings:
-        total_rating = sum([r[0] for r in all_ratings])
-        recipe.rating = round(total_rating / len(all_ratings), 2)
-        recipe.rating_count = len(all_ratings)
+    # Update recipe's average rating incrementally (re-ratings apply as deltas)
+    if previous_rating is None:
+        Recipe.apply_rating_delta(recipe_id, rating, 1)
+    else:
+        Recipe.apply_rating_delta(recipe_id, rating - previous_rating, 0)
 
     db.session.commit()
 
@@ -418,34 +806,73 @@ def get_recipe_image(recipe_id):
     return jsonify({'error': 'No image found', 'image_url': None}), 200
 
 
+@recipes_bp.route('/<int:recipe_id>/image/thumb', methods=['GET'])
+def get_recipe_thumbnail(recipe_id):
+    """Serve a WebP thumbnail of the recipe image at the nearest fixed width (?w=)"""
+    from app.services.thumbnail_service import thumbnail_service, ThumbnailError
+    from app.utils.images import PIL_AVAILABLE
+
+    if not PIL_AVAILABLE:
+        return jsonify({'error': 'Thumbnail generation is not available'}), 503
+
+    width = request.args.get('w', type=int)
+    if 'w' in request.args and (width is None or width <= 0):
+        return jsonify({'error': 'w must be a positive integer'}), 400
+
+    recipe = db.session.get(Recipe, recipe_id)
+    if not recipe:
+        return jsonify({'error': 'Recipe not found'}), 404
+    if not recipe.image_url:
+        return jsonify({'error': 'Recipe has no image'}), 404
+
+    try:
+        path, etag = thumbnail_service.get_thumbnail(recipe.image_url, thumbnail_service.pick_width(width))
+    except ThumbnailError as e:
+        logger.warning(f"Thumbnail for recipe {recipe_id} failed: {e}")
+        return jsonify({'error': 'Could not load recipe image'}), 502
+
+    response = send_file(
+        path,
+        mimetype='image/webp',
+        etag=etag,
+        max_age=current_app.config.get('THUMBNAIL_MAX_AGE', 7 * 24 * 3600),
+        conditional=True
+    )
+    response.cache_control.public = True
+    return response
+
+
 @recipes_bp.route('/fetch-images', methods=['POST'])
 @jwt_required()
 def fetch_recipe_images():
-    """Fetch images for multiple recipes that don't have images"""
-    from app.services.image_search_service import image_search_service
+    """Start a background job fetching images for recipes that don't have images"""
+    from app.services.image_fetch_jobs import image_fetch_runner
 
     data = request.get_json() or {}
     limit = data.get('limit', 10)
+    max_limit = current_app.config.get('IMAGE_FETCH_MAX_LIMIT', 500)
+    if isinstance(limit, bool) or not isinstance(limit, int) or not 1 <= limit <= max_limit:
+        return jsonify({'error': f'limit must be an integer between 1 and {max_limit}'}), 400
 
-    # Get recipes without images
-    recipes_without_images = Recipe.query.filter(
-        (Recipe.image_url.is_(None)) | (Recipe.image_url == '')
-    ).limit(limit).all()
+    job = image_fetch_runner.create_job(limit, user_id=int(get_jwt_identity()))
+    image_fetch_runner.submit(current_app._get_current_object(), job.id)
 
-    updated_count = 0
-    for recipe in recipes_without_images:
-        image_url = image_search_service.search_food_image(
-            recipe.name,
-            cuisine_type=recipe.cuisine_type
-        )
-        if image_url:
-            recipe.image_url = image_url
-            updated_count += 1
+    return jsonify({
+        'message': f'Image fetch job started for {job.total} recipes',
+        'job_id': job.id,
+        'status_url': f'/api/recipes/fetch-images/{job.id}',
+        'job': job.to_dict()
+    }), 202
 
-    db.session.commit()
 
-    return jsonify({
-        'message': f'Updated {updated_count} recipes with images',
-        'updated_count': updated_count,
-        'total_processed': len(recipes_without_images)
-    }), 200
+@recipes_bp.route('/fetch-images/<int:job_id>', methods=['GET'])
+@jwt_required()
+def get_fetch_images_job(job_id):
+    """Get progress of an image fetch job"""
+    from app.models import ImageFetchJob
+
+    job = db.session.get(ImageFetchJob, job_id)
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+
+    return jsonify({'job': job.to_dict()}), 200
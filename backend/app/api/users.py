@@ -1,9 +1,18 @@
-from flask import request, jsonify, send_file
+from flask import request, jsonify, send_file, redirect
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy.orm import joinedload
 import os
 from app import db
-from app.models import User, UserPreference, MealPlan, ShoppingList, UserPantry, Ingredient
+from app.models import User, UserPreference, MealPlan, ShoppingList, UserPantry, Ingredient, Recipe
 from app.api import users_bp
+from app.services.recipe_serializer import serialize_meal_plans, load_ingredient_lines
+from app.services.profile_photos import (
+    profile_photo_service, is_photo_digest, photo_url, PROFILE_PHOTO_SIZES, DEFAULT_PHOTO_SIZE
+)
+from app.utils.images import PIL_AVAILABLE
+
+# Stored photo files never change, so clients may cache them for a year
+PHOTO_MAX_AGE = 365 * 24 * 3600
 
 
 @users_bp.route('/profile', methods=['GET'])
@@ -72,31 +81,29 @@ def upload_profile_photo():
        file.filename.rsplit('.', 1)[1].lower() not in allowed_extensions:
         return jsonify({'error': 'Invalid file type. Allowed: png, jpg, jpeg, gif, webp'}), 400
 
-    # Create uploads directory if it doesn't exist
-    base_dir = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
-    upload_folder = os.path.join(base_dir, 'uploads', 'profile_photos')
-    os.makedirs(upload_folder, exist_ok=True)
-
-    # Generate secure filename with user ID
-    ext = file.filename.rsplit('.', 1)[1].lower()
-    filename = f"user_{user_id}.{ext}"
-    filepath = os.path.join(upload_folder, filename)
-
-    # Delete old photo if exists
-    if user.profile_photo and os.path.exists(user.profile_photo):
-        try:
-            os.remove(user.profile_photo)
-        except Exception:
-            pass  # Ignore errors when deleting old photo
-
-    # Save new photo
-    file.save(filepath)
+    if not PIL_AVAILABLE:
+        return jsonify({'error': 'Photo processing is not available'}), 503
 
-    # Update user profile
-    user.profile_photo = filepath
+    try:
+        digest = profile_photo_service.save(file.read())
+    except ValueError:
+        return jsonify({'error': 'Invalid image file'}), 400
 
+    previous = user.profile_photo
+    user.profile_photo = digest
     db.session.commit()
 
+    # Delete the old photo unless another account uses the same content
+    if previous and previous != digest:
+        if is_photo_digest(previous):
+            if not User.query.filter_by(profile_photo=previous).first():
+                profile_photo_service.delete(previous)
+        elif os.path.exists(previous):
+            try:
+                os.remove(previous)
+            except Exception:
+                pass  # Ignore errors when deleting old photo
+
     return jsonify({
         'message': 'Profile photo uploaded successfully',
         'user': user.to_dict()
@@ -105,17 +112,43 @@ def upload_profile_photo():
 
 @users_bp.route('/profile/photo/<int:user_id>', methods=['GET'])
 def get_profile_photo(user_id):
-    """Get profile photo"""
+    """Redirect to the user's content-addressed profile photo (?size=sm|md|lg)"""
     user = User.query.get(user_id)
 
     if not user or not user.profile_photo:
         # Return default avatar
         return jsonify({'error': 'No profile photo found'}), 404
 
+    if is_photo_digest(user.profile_photo):
+        size = request.args.get('size', DEFAULT_PHOTO_SIZE)
+        if size not in PROFILE_PHOTO_SIZES:
+            return jsonify({'error': f"size must be one of: {', '.join(PROFILE_PHOTO_SIZES)}"}), 400
+        return redirect(photo_url(user.profile_photo, size))
+
+    # Photos uploaded before resizing was introduced are stored as file paths
     if not os.path.exists(user.profile_photo):
         return jsonify({'error': 'Photo file not found'}), 404
 
-    return send_file(user.profile_photo, mimetype='image/jpeg')
+    return send_file(user.profile_photo)
+
+
+@users_bp.route('/profile/photo/<digest>/<size>', methods=['GET'])
+def get_profile_photo_file(digest, size):
+    """Serve a stored profile photo size; content-addressed, so cached forever"""
+    path = profile_photo_service.path_for(digest, size)
+    if not path:
+        return jsonify({'error': 'Photo file not found'}), 404
+
+    response = send_file(
+        path,
+        mimetype='image/webp',
+        etag=f'{digest}-{size}',
+        max_age=PHOTO_MAX_AGE,
+        conditional=True
+    )
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
 
 
 @users_bp.route('/preferences', methods=['GET'])
@@ -216,10 +249,10 @@ def get_meal_plans():
     if end_date:
         query = query.filter(MealPlan.planned_date <= end_date)
 
-    meal_plans = query.order_by(MealPlan.planned_date).all()
+    meal_plans = query.options(joinedload(MealPlan.recipe)).order_by(MealPlan.planned_date).all()
 
     return jsonify({
-        'meal_plans': [mp.to_dict() for mp in meal_plans]
+        'meal_plans': serialize_meal_plans(meal_plans)
     }), 200
 
 
@@ -234,7 +267,6 @@ def create_meal_plan():
         return jsonify({'error': 'Recipe ID and planned date are required'}), 400
 
     # Verify recipe exists
-    from app.models import Recipe
     recipe = Recipe.query.get(data['recipe_id'])
     if not recipe:
         return jsonify({'error': 'Recipe not found'}), 404
@@ -267,6 +299,9 @@ def update_meal_plan(meal_plan_id):
 
     data = request.get_json()
 
+    previous_recipe_id = meal_plan.recipe_id
+    previous_rating = meal_plan.user_rating
+
     if 'recipe_id' in data:
         meal_plan.recipe_id = data['recipe_id']
     if 'planned_date' in data:
@@ -283,6 +318,13 @@ def update_meal_plan(meal_plan_id):
     if 'user_notes' in data:
         meal_plan.user_notes = data['user_notes']
 
+    # Keep recipe rating aggregates in sync with the rating history
+    if meal_plan.recipe_id != previous_recipe_id or meal_plan.user_rating != previous_rating:
+        if previous_rating is not None:
+            Recipe.apply_rating_delta(previous_recipe_id, -previous_rating, -1)
+        if meal_plan.user_rating is not None:
+            Recipe.apply_rating_delta(meal_plan.recipe_id, meal_plan.user_rating, 1)
+
     db.session.commit()
 
     return jsonify({
@@ -301,6 +343,9 @@ def delete_meal_plan(meal_plan_id):
     if not meal_plan:
         return jsonify({'error': 'Meal plan not found'}), 404
 
+    if meal_plan.user_rating is not None:
+        Recipe.apply_rating_delta(meal_plan.recipe_id, -meal_plan.user_rating, -1)
+
     db.session.delete(meal_plan)
     db.session.commit()
 
@@ -380,24 +425,24 @@ def generate_shopping_list():
     if not meal_plans:
         return jsonify({'error': 'No meal plans found for the specified dates'}), 404
 
-    # Aggregate ingredients from all recipes
+    # Aggregate ingredients from all recipes (lines batch-loaded in one query)
     ingredient_map = {}
+    lines_by_recipe = load_ingredient_lines(mp.recipe_id for mp in meal_plans)
 
     for meal_plan in meal_plans:
-        recipe = meal_plan.recipe
-        for recipe_ing in recipe.ingredients.all():
-            ing_id = recipe_ing.ingredient_id
-            ing_name = recipe_ing.ingredient.name
+        for recipe_ing in lines_by_recipe.get(meal_plan.recipe_id, []):
+            ing_id = recipe_ing['ingredient_id']
+            ing_name = recipe_ing['ingredient_name']
 
             if ing_id in ingredient_map:
                 # Same ingredient, add quantity (simple addition for now)
-                ingredient_map[ing_id]['quantity'] += recipe_ing.quantity
+                ingredient_map[ing_id]['quantity'] += recipe_ing['quantity']
             else:
                 ingredient_map[ing_id] = {
                     'ingredient_id': ing_id,
                     'ingredient_name': ing_name,
-                    'quantity': recipe_ing.quantity,
-                    'unit': recipe_ing.unit,
+                    'quantity': recipe_ing['quantity'],
+                    'unit': recipe_ing['unit'],
                     'is_purchased': False
                 }
 
@@ -0,0 +1,73 @@
+"""
+Flask CLI commands for EatEase maintenance tasks
+Run with: flask <group> <command>
+"""
+
+import click
+from flask.cli import AppGroup
+
+recipes_cli = AppGroup('recipes', help='Recipe catalog maintenance commands.')
+detection_cli = AppGroup('detection', help='Ingredient detection maintenance commands.')
+
+
+@recipes_cli.command('reconcile-ratings')
+def reconcile_ratings():
+    """Rebuild recipe rating aggregates from meal plan rating history."""
+    from app.models import Recipe
+
+    updated = Recipe.reconcile_rating_aggregates()
+    click.echo(f'Reconciled rating aggregates for {updated} recipes')
+
+
+@recipes_cli.command('resume-image-jobs')
+def resume_image_jobs():
+    """Re-run image fetch jobs left pending, or running with an expired lease."""
+    from flask import current_app
+    from app.services.image_fetch_jobs import image_fetch_runner
+
+    resumed = image_fetch_runner.resume_incomplete(current_app._get_current_object())
+    click.echo(f'Resumed {resumed} image fetch jobs')
+    image_fetch_runner.shutdown(wait=True)
+
+
+@detection_cli.command('remap')
+@click.option('--apply', is_flag=True, help='Store the new mappings (default: report only).')
+@click.option('--since', type=click.DateTime(), default=None, help='Only annotations created at or after this time.')
+@click.option('--batch-size', type=click.IntRange(1), default=500, show_default=True)
+@click.option('--top', type=click.IntRange(1), default=20, show_default=True, help='Label changes to list.')
+@click.option('--json', 'as_json', is_flag=True, help='Print the report as JSON.')
+def remap_annotations(apply, since, batch_size, top, as_json):
+    """Re-map stored Vision annotations with the current label mappings.
+
+    Run after changing VISION_TO_INGREDIENT or when learned feedback has
+    accumulated; no Vision API calls are made.
+    """
+    import json
+    from app.ml.detector_backends import AnnotationBackend
+    from app.ml.google_vision_detector import GoogleVisionDetector
+    from app.services.detection_remap import remap_detection_annotations
+
+    detector = GoogleVisionDetector(backend=AnnotationBackend())
+    report = remap_detection_annotations(detector, apply=apply, since=since, batch_size=batch_size)
+
+    if as_json:
+        click.echo(json.dumps(report.to_dict(top=top), indent=2))
+        return
+
+    click.echo(f'Scanned {report.scanned} annotations ({report.distinct_labels} distinct labels)')
+    if apply:
+        click.echo(f'{report.changed} changed, {report.updated} updated')
+    else:
+        click.echo(f'{report.changed} would change (dry run; use --apply to store)')
+    for change in report.to_dict(top=top)['label_changes']:
+        click.echo(f"  {change['label']}: {change['old']} -> {change['new']} ({change['images']} images)")
+    if report.gained:
+        click.echo('Gained: ' + ', '.join(f'{name} ({count})' for name, count in report.gained.most_common(top)))
+    if report.lost:
+        click.echo('Lost: ' + ', '.join(f'{name} ({count})' for name, count in report.lost.most_common(top)))
+
+
+def register_commands(app):
+    """Attach CLI command groups to the app"""
+    app.cli.add_command(recipes_cli)
+    app.cli.add_command(detection_cli)
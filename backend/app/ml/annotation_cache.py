@@ -0,0 +1,68 @@
+"""
+Cache of raw Google Vision annotations keyed by image content hash
+An in-memory LRU sits in front of an optional on-disk store with a TTL, so a
+re-submitted photo skips the paid Vision call even after a restart
+"""
+
+import logging
+from typing import Dict, Optional
+
+from app.utils.disk_cache import DiskCache, MISSING
+from app.utils.lru_cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+
+class AnnotationCache:
+    """Two-level (memory, disk) cache of raw annotation dicts"""
+
+    def __init__(self, maxsize: int = 256, ttl: float = None, path: str = None):
+        """
+        Args:
+            maxsize: Entries kept in memory
+            ttl: Time-to-live in seconds for both levels
+            path: SQLite file for the disk level (None keeps memory only)
+        """
+        self._memory = LRUCache(maxsize=maxsize, ttl=ttl)
+        self._disk = DiskCache(path, ttl=ttl, table='vision_annotations') if path else None
+
+    @classmethod
+    def from_config(cls, config) -> 'AnnotationCache':
+        return cls(
+            maxsize=config.get('DETECTION_CACHE_SIZE', 256),
+            ttl=config.get('DETECTION_CACHE_TTL', 7 * 24 * 3600),
+            path=config.get('DETECTION_CACHE_PATH') or None
+        )
+
+    def get(self, digest: str) -> Optional[Dict]:
+        """Cached annotations for an image hash, or None"""
+        annotations = self._memory.get(digest)
+        if annotations is not None:
+            return annotations
+        if self._disk is None:
+            return None
+        try:
+            annotations = self._disk.get(digest)
+        except Exception as e:
+            logger.warning(f"Annotation cache read failed: {e}")
+            return None
+        if annotations is MISSING:
+            return None
+        self._memory.set(digest, annotations)
+        return annotations
+
+    def set(self, digest: str, annotations: Dict):
+        self._memory.set(digest, annotations)
+        if self._disk is not None:
+            try:
+                self._disk.set(digest, annotations)
+            except Exception as e:
+                logger.warning(f"Annotation cache write failed: {e}")
+
+    def clear(self):
+        self._memory.clear()
+        if self._disk is not None:
+            self._disk.clear()
+
+    def __len__(self):
+        return len(self._memory)
@@ -0,0 +1,205 @@
+"""
+Annotation backends for ingredient detection
+A backend turns image bytes into raw annotations
+({'labels': [...], 'objects': [...]}); GoogleVisionDetector maps those to
+ingredients. The Google Vision backend lives next to the detector; this
+module holds the interface, a deterministic offline stub for load tests, and
+a guard that bounds concurrency, applies timeouts and trips a circuit breaker
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Dict, List, Optional
+
+from app.utils.circuit_breaker import CircuitBreaker
+
+logger = logging.getLogger(__name__)
+
+
+class DetectorUnavailable(Exception):
+    """The detection backend is overloaded, timed out or switched off by the circuit breaker"""
+
+
+class AnnotationBackend:
+    """Interface for producing raw annotations from image bytes"""
+
+    name = 'base'
+    available = True
+
+    def annotate(self, image_bytes: bytes) -> Dict:
+        """
+        Annotate one image
+
+        Returns:
+            {'labels': [{'description', 'score'}], 'objects': [{'name', 'score', 'bbox'}]}
+        """
+        raise NotImplementedError
+
+    def batch_annotate(self, images: List[bytes]) -> List[Optional[Dict]]:
+        """
+        Annotate several images in one round trip where the backend allows
+
+        Returns:
+            Annotations for each image, None where that image failed
+        """
+        return [self.annotate(image_bytes) for image_bytes in images]
+
+
+def _label(description, score):
+    return {'description': description, 'score': score}
+
+
+# Pantry scenes returned by the stub when no fixture file is configured
+DEFAULT_STUB_FIXTURES = [
+    {'labels': [_label('Food', 0.97), _label('Chicken', 0.93), _label('Garlic', 0.81)], 'objects': []},
+    {'labels': [_label('Vegetable', 0.95), _label('Tomato', 0.92), _label('Onion', 0.84)],
+     'objects': [{'name': 'Tomato', 'score': 0.88, 'bbox': [0.1, 0.2, 0.4, 0.6]}]},
+    {'labels': [_label('Fruit', 0.96), _label('Pineapple', 0.9), _label('Banana', 0.78)], 'objects': []},
+    {'labels': [_label('Ingredient', 0.94), _label('Egg', 0.91), _label('Rice', 0.75)], 'objects': []},
+    {'labels': [_label('Tableware', 0.9), _label('Cuisine', 0.85)], 'objects': []},
+]
+
+
+class StubBackend(AnnotationBackend):
+    """
+    Deterministic offline backend: each image gets one of the fixture
+    annotation sets, chosen by its SHA-256, after an optional fixed delay
+    """
+
+    name = 'stub'
+
+    def __init__(self, fixtures: List[Dict] = None, latency: float = 0.0):
+        """
+        Args:
+            fixtures: Annotation sets to choose from (default: DEFAULT_STUB_FIXTURES)
+            latency: Seconds each call (single or batch) takes
+        """
+        self.fixtures = fixtures or DEFAULT_STUB_FIXTURES
+        self.latency = latency
+
+    @classmethod
+    def from_config(cls, config) -> 'StubBackend':
+        """Load fixtures from DETECTION_STUB_FIXTURES (a JSON list of annotation sets)"""
+        fixtures = None
+        path = config.get('DETECTION_STUB_FIXTURES')
+        if path:
+            with open(path) as f:
+                fixtures = json.load(f)
+        return cls(fixtures=fixtures, latency=config.get('DETECTION_STUB_LATENCY', 0.0))
+
+    def _fixture_for(self, image_bytes: bytes) -> Dict:
+        index = int.from_bytes(hashlib.sha256(image_bytes).digest()[:8], 'big') % len(self.fixtures)
+        return self.fixtures[index]
+
+    def annotate(self, image_bytes: bytes) -> Dict:
+        if self.latency:
+            time.sleep(self.latency)
+        return self._fixture_for(image_bytes)
+
+    def batch_annotate(self, images: List[bytes]) -> List[Optional[Dict]]:
+        if self.latency:
+            time.sleep(self.latency)
+        return [self._fixture_for(image_bytes) for image_bytes in images]
+
+
+class GuardedBackend(AnnotationBackend):
+    """
+    Run another backend's calls on a bounded thread pool
+
+    A request thread waits at most `timeout` seconds for a result. Calls are
+    rejected immediately when `max_workers + max_pending` calls are already in
+    flight, or while the circuit breaker is open after repeated failures, so
+    a slow upstream can't tie up every web worker.
+    """
+
+    def __init__(self, backend: AnnotationBackend, max_workers: int = 4, max_pending: int = 8,
+                 timeout: float = 10.0, breaker: CircuitBreaker = None):
+        """
+        Args:
+            backend: Backend doing the actual annotation
+            max_workers: Concurrent backend calls
+            max_pending: Calls allowed to queue behind running ones
+            timeout: Seconds a caller waits for its result
+            breaker: Circuit breaker (default: 5 failures, 30s reset)
+        """
+        self.backend = backend
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.breaker = breaker or CircuitBreaker()
+        self._slots = threading.BoundedSemaphore(max_workers + max_pending)
+        self._executor = None
+        self._executor_lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, backend: AnnotationBackend, config) -> 'GuardedBackend':
+        return cls(
+            backend,
+            max_workers=config.get('DETECTION_MAX_WORKERS', 4),
+            max_pending=config.get('DETECTION_MAX_PENDING', 8),
+            timeout=config.get('DETECTION_TIMEOUT', 10.0),
+            breaker=CircuitBreaker(
+                failure_threshold=config.get('DETECTION_BREAKER_THRESHOLD', 5),
+                reset_timeout=config.get('DETECTION_BREAKER_RESET', 30.0)
+            )
+        )
+
+    @property
+    def name(self):
+        return self.backend.name
+
+    @property
+    def available(self):
+        return self.backend.available
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix='detector-backend'
+                )
+            return self._executor
+
+    def _call(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise DetectorUnavailable(f'{self.name} backend is at capacity')
+        if not self.breaker.allow():
+            self._slots.release()
+            raise DetectorUnavailable(f'{self.name} backend circuit is open')
+
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            self.breaker.record_failure()
+            raise
+        # The slot is held until the call really finishes, even after a timeout
+        future.add_done_callback(lambda _: self._slots.release())
+
+        try:
+            result = future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            self.breaker.record_failure()
+            logger.warning(f"{self.name} backend call timed out after {self.timeout}s")
+            raise DetectorUnavailable(f'{self.name} backend timed out')
+        except Exception:
+            self.breaker.record_failure()
+            raise
+        self.breaker.record_success()
+        return result
+
+    def annotate(self, image_bytes: bytes) -> Dict:
+        return self._call(self.backend.annotate, image_bytes)
+
+    def batch_annotate(self, images: List[bytes]) -> List[Optional[Dict]]:
+        return self._call(self.backend.batch_annotate, images)
+
+    def shutdown(self, wait: bool = True):
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
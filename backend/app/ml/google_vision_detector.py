@@ -4,10 +4,19 @@ Uses Google Cloud Vision for accurate food/ingredient detection
 Includes machine learning from user corrections
 """
 
+import hashlib
 import logging
 import os
+import re
+import threading
+from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import List, Dict, Optional
 
+from app.ml.detector_backends import AnnotationBackend, DetectorUnavailable
+from app.ml.label_matcher import LabelMatcher
+from app.ml.near_duplicates import dhash
+
 logger = logging.getLogger(__name__)
 try:
     from google.cloud import vision
@@ -16,6 +25,128 @@ except ImportError:
     VISION_AVAILABLE = False
 
 
+@lru_cache(maxsize=1024)
+def _word_pattern(word: str):
+    """Compiled whole-word pattern for a partial match candidate"""
+    return re.compile(r'\b' + re.escape(word) + r'\b')
+
+
+def _batch_chunks(sizes: List[int], max_items: int, max_bytes: int) -> List[List[int]]:
+    """
+    Group item indexes into consecutive chunks within an item count and a
+    total size; an item larger than max_bytes gets a chunk of its own
+    """
+    chunks = []
+    current, current_bytes = [], 0
+    for i, size in enumerate(sizes):
+        if current and (len(current) >= max_items or current_bytes + size > max_bytes):
+            chunks.append(current)
+            current, current_bytes = [], 0
+        current.append(i)
+        current_bytes += size
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+class VisionBackend(AnnotationBackend):
+    """Annotation backend calling Google Cloud Vision"""
+
+    name = 'google_vision'
+
+    def __init__(self, credentials_path: Optional[str] = None, client=None):
+        """
+        Args:
+            credentials_path: Path to Google Cloud credentials JSON file
+            client: Existing ImageAnnotatorClient (skips credential setup)
+        """
+        self.client = client
+        self.available = VISION_AVAILABLE and client is not None
+        if client is not None:
+            return
+
+        if not VISION_AVAILABLE:
+            logger.warning("Google Cloud Vision not available. Install with: pip install google-cloud-vision")
+            return
+
+        # Try to initialize client
+        try:
+            # Priority 1: Base64-encoded credentials from env var (for cloud deployments like Render)
+            credentials_json_b64 = os.environ.get('GOOGLE_VISION_CREDENTIALS_JSON')
+            if credentials_json_b64:
+                import base64
+                import tempfile
+                credentials_data = base64.b64decode(credentials_json_b64)
+                tmp = tempfile.NamedTemporaryFile(mode='wb', suffix='.json', delete=False)
+                tmp.write(credentials_data)
+                tmp.close()
+                os.environ['GOOGLE_APPLICATION_CREDENTIALS'] = tmp.name
+                logger.info("Using Google Vision credentials from GOOGLE_VISION_CREDENTIALS_JSON env var")
+
+            # Priority 2: File path credentials (for local development)
+            elif credentials_path and os.path.exists(credentials_path):
+                os.environ['GOOGLE_APPLICATION_CREDENTIALS'] = credentials_path
+                logger.info(f"Using Google Vision credentials from file: {credentials_path}")
+
+            self.client = vision.ImageAnnotatorClient()
+            self.available = True
+            logger.info("Google Vision API initialized successfully")
+        except Exception as e:
+            logger.warning(f"Could not initialize Google Vision API: {e}. Detector will work in fallback mode.")
+
+    def annotate(self, image_bytes: bytes) -> Dict:
+        """Run label detection and object localization in a single Vision call"""
+        response = self.client.annotate_image(request=self._build_request(image_bytes))
+        return annotations_from_response(response)
+
+    def batch_annotate(self, images: List[bytes]) -> List[Optional[Dict]]:
+        """Annotate up to 16 images with one batch_annotate_images call"""
+        response = self.client.batch_annotate_images(
+            requests=[self._build_request(image_bytes) for image_bytes in images]
+        )
+        results = []
+        for image_response in response.responses:
+            if image_response.error.message:
+                logger.warning(f"Vision could not annotate image: {image_response.error.message}")
+                results.append(None)
+            else:
+                results.append(annotations_from_response(image_response))
+        return results
+
+    @staticmethod
+    def _build_request(image_bytes: bytes):
+        """Label detection + object localization request for one image"""
+        # Create Vision API image object
+        image = vision.Image(content=image_bytes)
+
+        # Perform label detection + object localization in a single API call
+        features = [
+            vision.Feature(type_=vision.Feature.Type.LABEL_DETECTION),
+            vision.Feature(type_=vision.Feature.Type.OBJECT_LOCALIZATION),
+        ]
+        return vision.AnnotateImageRequest(image=image, features=features)
+
+
+def annotations_from_response(response) -> Dict:
+    """Convert a Vision AnnotateImageResponse into cacheable plain data"""
+    objects = []
+    for obj in response.localized_object_annotations:
+        vertices = obj.bounding_poly.normalized_vertices
+        bbox = [
+            vertices[0].x, vertices[0].y,
+            vertices[2].x, vertices[2].y
+        ] if len(vertices) >= 3 else []
+        objects.append({'name': obj.name, 'score': obj.score, 'bbox': bbox})
+
+    return {
+        'labels': [
+            {'description': label.description, 'score': label.score}
+            for label in response.label_annotations
+        ],
+        'objects': objects
+    }
+
+
 class GoogleVisionDetector:
     """Handles ingredient detection using Google Cloud Vision API"""
 
@@ -494,166 +625,462 @@ class GoogleVisionDetector:
     }
 
     # Cache for learned mappings from database
+    # (_cache_timestamp is the last sync time; None forces a full reload)
     _learned_mappings_cache = {}
     _cache_timestamp = None
 
-    def __init__(self, credentials_path: Optional[str] = None):
+    # Incremental sync state: label -> {ingredient: (correction_count, row id)}
+    # (the winner per label after a full load, plus rows seen since) and the
+    # newest updated_at applied from the database
+    _learned_candidates = {}
+    _sync_watermark = None
+    _sync_lock = threading.Lock()
+
+    # How often to poll for rows changed by other workers, and how far back to
+    # re-read so rows committed late with an older updated_at are not missed
+    LEARNED_SYNC_INTERVAL = timedelta(seconds=30)
+    LEARNED_SYNC_OVERLAP = timedelta(seconds=60)
+
+    # Compiled matchers (static built once; learned recompiled at most once per
+    # LEARNED_SYNC_INTERVAL when labels are added or removed)
+    _static_matcher = None
+    _learned_matcher = None
+    _learned_matcher_compiled_at = None
+
+    # Vision batch_annotate_images limits: images per request and request size
+    BATCH_MAX_IMAGES = 16
+    BATCH_MAX_BYTES = 10 * 1024 * 1024
+
+    def __init__(self, credentials_path: Optional[str] = None, annotation_cache=None, near_duplicates=None,
+                 preprocessor=None, backend: Optional[AnnotationBackend] = None, annotation_recorder=None,
+                 unmapped_counter=None):
         """
         Initialize Google Vision detector
 
         Args:
             credentials_path: Path to Google Cloud credentials JSON file
+            annotation_cache: Optional AnnotationCache for raw Vision results
+            near_duplicates: Optional NearDuplicateIndex for re-shot photos
+            preprocessor: Optional ImagePreprocessor applied before annotation
+            backend: Annotation backend (default: Google Vision with credentials_path)
+            annotation_recorder: Optional callable storing raw annotations of
+                each detected image (e.g. DetectionAnnotation.record_many)
+            unmapped_counter: Optional UnmappedLabelCounter for labels no
+                mapping covers
         """
-        self.client = None
-        self.available = VISION_AVAILABLE
-
-        if not VISION_AVAILABLE:
-            logger.warning("Google Cloud Vision not available. Install with: pip install google-cloud-vision")
-            return
-
-        # Try to initialize client
-        try:
-            # Priority 1: Base64-encoded credentials from env var (for cloud deployments like Render)
-            credentials_json_b64 = os.environ.get('GOOGLE_VISION_CREDENTIALS_JSON')
-            if credentials_json_b64:
-                import base64
-                import tempfile
-                credentials_data = base64.b64decode(credentials_json_b64)
-                tmp = tempfile.NamedTemporaryFile(mode='wb', suffix='.json', delete=False)
-                tmp.write(credentials_data)
-                tmp.close()
-                os.environ['GOOGLE_APPLICATION_CREDENTIALS'] = tmp.name
-                logger.info("Using Google Vision credentials from GOOGLE_VISION_CREDENTIALS_JSON env var")
-
-            # Priority 2: File path credentials (for local development)
-            elif credentials_path and os.path.exists(credentials_path):
-                os.environ['GOOGLE_APPLICATION_CREDENTIALS'] = credentials_path
-                logger.info(f"Using Google Vision credentials from file: {credentials_path}")
-
-            self.client = vision.ImageAnnotatorClient()
-            logger.info("Google Vision API initialized successfully")
-        except Exception as e:
-            logger.warning(f"Could not initialize Google Vision API: {e}. Detector will work in fallback mode.")
-            self.available = False
+        self.backend = backend if backend is not None else VisionBackend(credentials_path)
+        self.available = self.backend.available
+        self.annotation_cache = annotation_cache
+        self.near_duplicates = near_duplicates
+        self.preprocessor = preprocessor
+        self.annotation_recorder = annotation_recorder
+        self.unmapped_counter = unmapped_counter
 
     def _get_learned_mappings(self) -> Dict[str, str]:
         """
         Get learned mappings from database (with caching).
         Learned mappings take priority over static mappings.
-        """
-        from datetime import datetime, timedelta
 
-        # Refresh cache every 5 minutes
+        The first call loads the winning feedback row of each label; later
+        calls only fetch rows whose updated_at changed since the last sync, so
+        a refresh costs in proportion to the number of new corrections.
+        """
         now = datetime.utcnow()
-        if (GoogleVisionDetector._cache_timestamp is None or
-                now - GoogleVisionDetector._cache_timestamp > timedelta(minutes=5)):
+        full = GoogleVisionDetector._cache_timestamp is None
+        if full or now - GoogleVisionDetector._cache_timestamp > self.LEARNED_SYNC_INTERVAL:
             try:
-                from app.models import DetectionFeedback
-                # Get all learned mappings with at least 1 correction
-                learned = DetectionFeedback.get_all_learned_mappings(min_corrections=1)
-                GoogleVisionDetector._learned_mappings_cache = {
-                    label: data['ingredient']
-                    for label, data in learned.items()
-                }
+                changed = GoogleVisionDetector._sync_learned_mappings(full=full)
                 GoogleVisionDetector._cache_timestamp = now
-                cache_size = len(GoogleVisionDetector._learned_mappings_cache)
-                logger.debug(f"Refreshed learned mappings cache: {cache_size} entries")
+                if changed:
+                    cache_size = len(GoogleVisionDetector._learned_mappings_cache)
+                    logger.debug(f"Synced learned mappings: {changed} changed, {cache_size} entries")
             except Exception as e:
                 logger.warning(f"Could not load learned mappings: {e}")
-                GoogleVisionDetector._learned_mappings_cache = {}
+                if full:
+                    GoogleVisionDetector._learned_mappings_cache = {}
 
         return GoogleVisionDetector._learned_mappings_cache
 
-    def detect_from_bytes(self, image_bytes: bytes) -> List[Dict]:
+    @classmethod
+    def _sync_learned_mappings(cls, full: bool = False) -> int:
+        """
+        Pull feedback rows from the database into the learned mappings
+
+        Args:
+            full: Reload every row instead of only recently updated ones
+
+        Returns:
+            Number of labels whose mapping changed
+        """
+        from app.models import DetectionFeedback
+
+        with cls._sync_lock:
+            full = full or cls._sync_watermark is None
+            if not full:
+                rows = DetectionFeedback.get_changed_rows(since=cls._sync_watermark - cls.LEARNED_SYNC_OVERLAP)
+                if not rows:
+                    return 0
+                # Candidates only hold each label's winner after a full load,
+                # which is enough while counts only grow; a dropped row needs
+                # the runners-up, so reload
+                full = any(row[3] is None or row[3] < 1 for row in rows)
+
+            if full:
+                # Winners only: the database picks one row per label
+                watermark = DetectionFeedback.get_latest_update()
+                rows = DetectionFeedback.get_winner_rows()
+                mappings, candidates = {}, {}
+            else:
+                # Copy on write: readers (and the compiled matcher) keep using
+                # the previous dict until the new one is swapped in
+                mappings, candidates = dict(cls._learned_mappings_cache), cls._learned_candidates
+                watermark = max((row[4] for row in rows if row[4] is not None), default=None)
+
+            changed = cls._merge_feedback_rows(rows, mappings, candidates)
+
+            if watermark is not None and (cls._sync_watermark is None or watermark > cls._sync_watermark):
+                cls._sync_watermark = watermark
+
+            if full:
+                cls._learned_candidates = candidates
+                cls._learned_mappings_cache = mappings
+            elif changed:
+                cls._learned_mappings_cache = mappings
+            return changed
+
+    @staticmethod
+    def _merge_feedback_rows(rows, mappings: Dict[str, str], candidates: Dict[str, dict]) -> int:
+        """
+        Fold (id, label, ingredient, count, updated_at) rows into the mapping.
+        Each label maps to its ingredient with the most corrections (ties go
+        to the earliest row), matching DetectionFeedback.get_all_learned_mappings.
+        """
+        changed = 0
+        for row_id, label, ingredient, count, _ in rows:
+            label_candidates = candidates.setdefault(label, {})
+            if count is None or count < 1:
+                label_candidates.pop(ingredient, None)
+            else:
+                label_candidates[ingredient] = (count, row_id)
+
+            if label_candidates:
+                winner = min(label_candidates.items(), key=lambda item: (-item[1][0], item[1][1]))[0]
+                if label not in mappings or mappings[label] != winner:
+                    mappings[label] = winner
+                    changed += 1
+            else:
+                candidates.pop(label, None)
+                if mappings.pop(label, None) is not None:
+                    changed += 1
+        return changed
+
+    @classmethod
+    def reset_learned_mappings(cls):
+        """Drop all learned-mapping state so the next lookup does a full load"""
+        with cls._sync_lock:
+            cls._learned_mappings_cache = {}
+            cls._learned_candidates = {}
+            cls._sync_watermark = None
+            cls._cache_timestamp = None
+            cls._learned_matcher = None
+
+    @classmethod
+    def apply_feedback(cls, feedbacks: list) -> int:
+        """
+        Apply just-saved DetectionFeedback rows (model instances or the
+        SavedFeedback tuples from upsert_many) to the in-memory mappings so
+        corrections take effect immediately without a reload. Other workers
+        pick them up on their next incremental sync.
+
+        Returns:
+            Number of labels whose mapping changed
+        """
+        if cls._cache_timestamp is None:
+            return 0  # Not loaded yet; the first lookup does a full load
+
+        rows = [
+            (fb.id, fb.detected_label, fb.correct_ingredient, fb.correction_count, fb.updated_at)
+            for fb in feedbacks
+        ]
+        with cls._sync_lock:
+            mappings = dict(cls._learned_mappings_cache)
+            changed = cls._merge_feedback_rows(rows, mappings, cls._learned_candidates)
+            if changed:
+                cls._learned_mappings_cache = mappings
+            return changed
+
+    def detect_from_bytes(self, image_bytes: bytes, scope=None) -> List[Dict]:
         """
         Detect ingredients from image bytes using Google Vision
 
+        Raw annotations are cached by the SHA-256 of the image, so a repeated
+        upload is re-mapped with the current mappings without calling Vision.
+        A near-identical re-shot (by perceptual hash) within the configured
+        window reuses the earlier annotations as well.
+
         Args:
             image_bytes: Image data as bytes
+            scope: Near-duplicates are only reused within the same scope
+                (e.g. the uploading user's ID)
 
         Returns:
             List of detected ingredients with confidence scores
+
+        Raises:
+            DetectorUnavailable: If the backend is overloaded, timed out or
+                switched off by its circuit breaker
         """
-        if not self.available or self.client is None:
+        if not self.available:
             return []
 
         try:
-            # Create Vision API image object
-            image = vision.Image(content=image_bytes)
-
-            # Perform label detection + object localization in a single API call
-            features = [
-                vision.Feature(type_=vision.Feature.Type.LABEL_DETECTION),
-                vision.Feature(type_=vision.Feature.Type.OBJECT_LOCALIZATION),
-            ]
-            request = vision.AnnotateImageRequest(image=image, features=features)
-            response = self.client.annotate_image(request=request)
-            labels = response.label_annotations
-            objects = response.localized_object_annotations
-
-            detections = []
-
-            # Process labels
-            for label in labels:
-                label_name = label.description.lower()
-                confidence = label.score
-
-                # Map to ingredient
-                ingredient_name = self._map_to_ingredient(label_name)
-                if ingredient_name:
-                    detections.append({
-                        'name': ingredient_name,
-                        'confidence': confidence,
-                        'bbox': [],  # Labels don't have bounding boxes
-                        'google_label': label.description,
-                        'source': 'label'
-                    })
-
-            # Process objects (they have locations)
-            for obj in objects:
-                obj_name = obj.name.lower()
-                confidence = obj.score
-
-                # Map to ingredient
-                ingredient_name = self._map_to_ingredient(obj_name)
-                if ingredient_name:
-                    # Get bounding box
-                    vertices = obj.bounding_poly.normalized_vertices
-                    bbox = [
-                        vertices[0].x, vertices[0].y,
-                        vertices[2].x, vertices[2].y
-                    ] if len(vertices) >= 3 else []
-
-                    detections.append({
-                        'name': ingredient_name,
-                        'confidence': confidence,
-                        'bbox': bbox,
-                        'google_label': obj.name,
-                        'source': 'object'
-                    })
-
-            # Remove duplicates (keep highest confidence)
-            detections = self._remove_duplicates(detections)
-
-            # Also include raw labels for debugging (not mapped to ingredients)
-            # These help users understand what Vision API detected
-            if not detections:
-                # If no mapped ingredients found, include top raw labels for feedback
-                for label in labels[:5]:  # Top 5 labels
-                    detections.append({
-                        'name': None,  # Not a known ingredient
-                        'confidence': label.score,
-                        'bbox': [],
-                        'google_label': label.description,
-                        'source': 'label_raw'
-                    })
+            digest, phash, annotations = self._lookup_annotations(image_bytes, scope)
+            if annotations is None:
+                annotations = self.annotate(self._prepare(image_bytes))
+                self._store_annotations(digest, phash, annotations, scope)
 
+            detections = self.map_annotations(annotations)
+            self._record_annotations([(digest, annotations)], scope)
             return detections
 
+        except DetectorUnavailable:
+            raise
         except Exception as e:
             logger.error(f"Error in Google Vision detection: {e}")
             return []
 
+    def detect_batch_from_bytes(self, images: List[bytes], scope=None) -> List[List[Dict]]:
+        """
+        Detect ingredients in several images with batched Vision calls
+
+        Cached and near-duplicate images are resolved locally; the rest are
+        sent in as few batch_annotate_images requests as the API limits allow.
+        An image whose annotation fails yields an empty list.
+
+        Raises:
+            DetectorUnavailable: If the backend is overloaded, timed out or
+                switched off by its circuit breaker
+
+        Args:
+            images: Image data for each photo
+            scope: Near-duplicates are only reused within the same scope
+
+        Returns:
+            Detections for each image, in input order
+        """
+        if not self.available:
+            return [[] for _ in images]
+
+        results = [None] * len(images)
+        digests = [None] * len(images)
+        pending = {}  # digest -> (prepared image bytes, phash, [indexes])
+        for i, image_bytes in enumerate(images):
+            digest, phash, annotations = self._lookup_annotations(image_bytes, scope)
+            digests[i] = digest
+            if annotations is not None:
+                results[i] = annotations
+            elif digest in pending:
+                pending[digest][2].append(i)
+            else:
+                pending[digest] = (self._prepare(image_bytes), phash, [i])
+
+        pending_digests = list(pending)
+        for chunk in _batch_chunks([len(pending[d][0]) for d in pending_digests],
+                                   self.BATCH_MAX_IMAGES, self.BATCH_MAX_BYTES):
+            chunk_digests = [pending_digests[j] for j in chunk]
+            try:
+                chunk_annotations = self.backend.batch_annotate([pending[d][0] for d in chunk_digests])
+            except DetectorUnavailable:
+                raise
+            except Exception as e:
+                logger.error(f"Error in Google Vision batch detection: {e}")
+                continue
+
+            for digest, annotations in zip(chunk_digests, chunk_annotations):
+                if annotations is None:
+                    continue
+                _, phash, indexes = pending[digest]
+                self._store_annotations(digest, phash, annotations, scope)
+                for i in indexes:
+                    results[i] = annotations
+
+        detections = []
+        for annotations in results:
+            try:
+                detections.append(self.map_annotations(annotations) if annotations is not None else [])
+            except Exception as e:
+                logger.error(f"Error mapping Vision annotations: {e}")
+                detections.append([])
+
+        self._record_annotations(
+            [(digest, annotations) for digest, annotations in zip(digests, results) if annotations is not None],
+            scope
+        )
+        return detections
+
+    def label_mappings(self, annotations: Dict) -> Dict[str, Optional[str]]:
+        """Current ingredient mapping of every label and object name in an annotation"""
+        from app.models import DetectionAnnotation
+
+        names = DetectionAnnotation.annotation_labels(annotations.get('labels'), annotations.get('objects'))
+        return {name: self._map_to_ingredient(name) for name in names}
+
+    def _unmapped_labels(self, annotations: Dict, mappings: Dict[str, Optional[str]]):
+        """
+        (label, score) pairs no static or learned mapping covers; labels
+        deliberately mapped to None (e.g. 'food') are left out
+        """
+        learned = self._get_learned_mappings()
+        scored = [(label['description'], label['score']) for label in annotations.get('labels', [])]
+        scored.extend((obj['name'], obj['score']) for obj in annotations.get('objects', []))
+        unmapped = []
+        for name, score in scored:
+            name = name.lower().strip()
+            if mappings.get(name) is None and name not in self.VISION_TO_INGREDIENT and name not in learned:
+                unmapped.append((name, score))
+        return unmapped
+
+    def _record_annotations(self, entries, scope=None):
+        """Pass (digest, annotations) pairs to the annotation recorder and unmapped-label counter"""
+        recorder = self.annotation_recorder
+        counter = self.unmapped_counter
+        if not entries or (recorder is None and counter is None):
+            return
+        mapped = [(digest, annotations, self.label_mappings(annotations)) for digest, annotations in entries]
+
+        if recorder is not None:
+            try:
+                recorder([
+                    {
+                        'image_hash': digest,
+                        'annotations': annotations,
+                        'label_mappings': mappings,
+                        'scope': scope
+                    }
+                    for digest, annotations, mappings in mapped
+                ])
+            except Exception as e:
+                logger.warning(f"Could not record detection annotations: {e}")
+
+        if counter is not None:
+            try:
+                for _, annotations, mappings in mapped:
+                    counter.add(self._unmapped_labels(annotations, mappings))
+            except Exception as e:
+                logger.warning(f"Could not count unmapped labels: {e}")
+
+    def _prepare(self, image_bytes: bytes) -> bytes:
+        """Downscale/strip an image for Vision when a preprocessor is configured"""
+        if self.preprocessor is None:
+            return image_bytes
+        return self.preprocessor(image_bytes)
+
+    def _lookup_annotations(self, image_bytes: bytes, scope=None):
+        """
+        Find annotations for an image without calling Vision
+
+        Returns:
+            (digest, phash, annotations) - annotations is None on a miss; phash
+            is set when the result should be added to the near-duplicate index
+        """
+        digest = hashlib.sha256(image_bytes).hexdigest()
+        cache = self.annotation_cache
+        if cache is not None:
+            annotations = cache.get(digest)
+            if annotations is not None:
+                logger.debug(f"Using cached Vision annotations for image {digest[:12]}")
+                return digest, None, annotations
+
+        index = self.near_duplicates
+        phash = dhash(image_bytes) if index is not None else None
+        if phash is not None:
+            annotations = index.find(phash, scope=scope)
+            if annotations is not None:
+                if cache is not None:
+                    cache.set(digest, annotations)
+                return digest, None, annotations
+
+        return digest, phash, None
+
+    def _store_annotations(self, digest: str, phash: Optional[int], annotations: Dict, scope=None):
+        """Remember freshly annotated results for exact and near-duplicate reuse"""
+        if self.annotation_cache is not None:
+            self.annotation_cache.set(digest, annotations)
+        if phash is not None:
+            self.near_duplicates.add(phash, annotations, scope=scope)
+
+    def annotate(self, image_bytes: bytes) -> Dict:
+        """
+        Annotate one image with the configured backend
+
+        Args:
+            image_bytes: Image data as bytes
+
+        Returns:
+            Raw annotations as plain data:
+            {'labels': [{'description', 'score'}], 'objects': [{'name', 'score', 'bbox'}]}
+        """
+        return self.backend.annotate(image_bytes)
+
+    def map_annotations(self, annotations: Dict) -> List[Dict]:
+        """
+        Map raw Vision annotations to ingredient detections
+
+        Args:
+            annotations: Output of annotate()
+
+        Returns:
+            List of detected ingredients with confidence scores
+        """
+        labels = annotations.get('labels', [])
+        objects = annotations.get('objects', [])
+
+        detections = []
+
+        # Process labels
+        for label in labels:
+            # Map to ingredient
+            ingredient_name = self._map_to_ingredient(label['description'].lower())
+            if ingredient_name:
+                detections.append({
+                    'name': ingredient_name,
+                    'confidence': label['score'],
+                    'bbox': [],  # Labels don't have bounding boxes
+                    'google_label': label['description'],
+                    'source': 'label'
+                })
+
+        # Process objects (they have locations)
+        for obj in objects:
+            # Map to ingredient
+            ingredient_name = self._map_to_ingredient(obj['name'].lower())
+            if ingredient_name:
+                detections.append({
+                    'name': ingredient_name,
+                    'confidence': obj['score'],
+                    'bbox': obj['bbox'],
+                    'google_label': obj['name'],
+                    'source': 'object'
+                })
+
+        # Remove duplicates (keep highest confidence)
+        detections = self._remove_duplicates(detections)
+
+        # Also include raw labels for debugging (not mapped to ingredients)
+        # These help users understand what Vision API detected
+        if not detections:
+            # If no mapped ingredients found, include top raw labels for feedback
+            for label in labels[:5]:  # Top 5 labels
+                detections.append({
+                    'name': None,  # Not a known ingredient
+                    'confidence': label['score'],
+                    'bbox': [],
+                    'google_label': label['description'],
+                    'source': 'label_raw'
+                })
+
+        return detections
+
     @staticmethod
     def _is_valid_partial_match(key: str, label: str) -> bool:
         """
@@ -668,8 +1095,7 @@ class GoogleVisionDetector:
         shorter, longer = (key, label) if len(key) <= len(label) else (label, key)
 
         # Check whole-word boundary: shorter appears as a complete word in longer
-        import re
-        if re.search(r'\b' + re.escape(shorter) + r'\b', longer):
+        if _word_pattern(shorter).search(longer):
             return True
 
         # Length ratio check: avoid tiny substrings matching long keys
@@ -678,11 +1104,46 @@ class GoogleVisionDetector:
 
         return False
 
+    @classmethod
+    def _get_static_matcher(cls) -> LabelMatcher:
+        if cls._static_matcher is None or cls._static_matcher.mapping is not cls.VISION_TO_INGREDIENT:
+            cls._static_matcher = LabelMatcher(cls.VISION_TO_INGREDIENT, skip_none_partials=True)
+        return cls._static_matcher
+
+    def _get_learned_matcher(self) -> LabelMatcher:
+        """
+        Matcher for the current learned mappings. A changed mappings dict is
+        rebound to the compiled tables at once; the tables are recompiled at
+        most once per LEARNED_SYNC_INTERVAL, and only if labels were added
+        or removed, so a feedback POST does not cost a rebuild over every
+        learned label.
+        """
+        learned_mappings = self._get_learned_mappings()
+        matcher = GoogleVisionDetector._learned_matcher
+        if matcher is None:
+            matcher = LabelMatcher(learned_mappings)
+            GoogleVisionDetector._learned_matcher_compiled_at = datetime.utcnow()
+        else:
+            if matcher.mapping is not learned_mappings:
+                matcher = matcher.rebind(learned_mappings)
+            if matcher.outdated:
+                now = datetime.utcnow()
+                if now - GoogleVisionDetector._learned_matcher_compiled_at >= self.LEARNED_SYNC_INTERVAL:
+                    matcher = matcher.recompile()
+                    GoogleVisionDetector._learned_matcher_compiled_at = now
+        GoogleVisionDetector._learned_matcher = matcher
+        return matcher
+
     def _map_to_ingredient(self, label: str) -> Optional[str]:
         """
         Map Google Vision label to ingredient name.
         Priority: Learned mappings > Static mappings
 
+        Each source is checked for an exact match, then for the first key
+        (in mapping order) that contains or is contained in the label and
+        passes _is_valid_partial_match. Static keys mapped to None block an
+        exact label but are skipped for partial matches.
+
         Args:
             label: Label from Google Vision
 
@@ -692,31 +1153,18 @@ class GoogleVisionDetector:
         label = label.lower().strip()
 
         # First, check learned mappings (user corrections take priority)
-        learned_mappings = self._get_learned_mappings()
-        if label in learned_mappings:
-            logger.debug(f"Using learned mapping: {label} -> {learned_mappings[label]}")
-            return learned_mappings[label]
-
-        # Check partial matches in learned mappings (with guards)
-        for key, value in learned_mappings.items():
-            if (key in label or label in key) and self._is_valid_partial_match(key, label):
-                logger.debug(f"Using learned partial mapping: {label} -> {value}")
-                return value
-
-        # Then check static mappings - Direct match
-        if label in self.VISION_TO_INGREDIENT:
-            return self.VISION_TO_INGREDIENT[label]
-
-        # Partial match with guards (e.g., "fresh carrot" -> "carrot")
-        for key, value in self.VISION_TO_INGREDIENT.items():
-            if value is None:
-                continue
-            if (key in label or label in key) and self._is_valid_partial_match(key, label):
-                return value
+        found, value = self._get_learned_matcher().match(label)
+        if found:
+            logger.debug(f"Using learned mapping: {label} -> {value}")
+            return value
 
-        return None
+        # Then check static mappings (direct, then guarded partial match,
+        # e.g. "fresh carrot" -> "carrot")
+        found, value = self._get_static_matcher().match(label)
+        return value if found else None
 
-    def _remove_duplicates(self, detections: List[Dict]) -> List[Dict]:
+    @staticmethod
+    def _remove_duplicates(detections: List[Dict]) -> List[Dict]:
         """
         Remove duplicate detections, keeping highest confidence for each ingredient
 
@@ -738,6 +1186,26 @@ class GoogleVisionDetector:
 
         return list(seen.values()) + unmapped
 
+    @classmethod
+    def merge_detections(cls, detections_per_image: List[List[Dict]]) -> List[Dict]:
+        """
+        Merge detections from several images of the same pantry
+
+        Mapped ingredients are deduplicated as in _remove_duplicates (highest
+        confidence wins). Raw unmapped labels are only kept when no image
+        produced a mapped ingredient, as for a single image.
+
+        Args:
+            detections_per_image: Output of detect_batch_from_bytes()
+
+        Returns:
+            Merged list of detections
+        """
+        merged = cls._remove_duplicates([d for detections in detections_per_image for d in detections])
+        if any(d['name'] is not None for d in merged):
+            merged = [d for d in merged if d['name'] is not None]
+        return merged
+
     def get_ingredient_names(self, detections: List[Dict]) -> List[str]:
         """
         Extract ingredient names from detections
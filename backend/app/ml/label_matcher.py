@@ -0,0 +1,206 @@
+"""
+Compiled label -> ingredient matcher
+Reproduces the exact and guarded partial matching of a label mapping without
+scanning every key per label: an exact dict, an Aho-Corasick automaton for
+keys contained in the label and a 4-gram index for keys containing the label
+"""
+
+import copy
+from collections import deque
+from typing import Dict, Optional, Tuple
+
+# Both strings must be at least this long for a partial match
+MIN_PARTIAL_LENGTH = 4
+
+# Shorter/longer length ratio accepted when there is no whole-word match
+MIN_LENGTH_RATIO = 0.7
+
+
+def _is_word_char(ch: str) -> bool:
+    # Same definition as the \w class of str regex patterns
+    return ch.isalnum() or ch == '_'
+
+
+def _at_boundary(text: str, pos: int) -> bool:
+    """True if regex \\b would match at text[pos]"""
+    before = pos > 0 and _is_word_char(text[pos - 1])
+    after = pos < len(text) and _is_word_char(text[pos])
+    return before != after
+
+
+def _is_whole_word(longer: str, start: int, length: int) -> bool:
+    return _at_boundary(longer, start) and _at_boundary(longer, start + length)
+
+
+class LabelMatcher:
+    """
+    Matches labels against a mapping the same way a linear scan would:
+    exact key first, then the first key (in mapping order) that contains or
+    is contained in the label and passes the partial match guards
+    """
+
+    def __init__(self, mapping: Dict[str, Optional[str]], skip_none_partials: bool = False):
+        """
+        Args:
+            mapping: Label -> ingredient name (order defines partial match priority)
+            skip_none_partials: Ignore keys mapped to None for partial matches
+        """
+        self.mapping = mapping
+        self._skip_none_partials = skip_none_partials
+        # Mapping the partial-match tables were compiled from
+        self._compiled_from = mapping
+
+        # Only keys that can pass the length guard take part in partial
+        # matching; their values are read from self.mapping when matching
+        self._keys = [
+            key for key, value in mapping.items()
+            if len(key) >= MIN_PARTIAL_LENGTH and not (skip_none_partials and value is None)
+        ]
+
+        self._build_automaton()
+        self._build_gram_index()
+
+    def rebind(self, mapping: Dict[str, Optional[str]]) -> 'LabelMatcher':
+        """
+        A matcher for an updated mapping that reuses these compiled tables.
+        Exact matches and changed values take effect at once; keys removed
+        since compilation are skipped, and keys added since only take part
+        in partial matching after recompile().
+        """
+        matcher = copy.copy(self)
+        matcher.mapping = mapping
+        return matcher
+
+    @property
+    def outdated(self) -> bool:
+        """Whether the mapping changed since the tables were compiled"""
+        return self.mapping is not self._compiled_from
+
+    def recompile(self) -> 'LabelMatcher':
+        """This matcher if its keys are unchanged since compilation, else a freshly compiled one"""
+        if not self.outdated:
+            return self
+        if self.mapping.keys() == self._compiled_from.keys() and not self._skip_none_partials:
+            self._compiled_from = self.mapping
+            return self
+        return LabelMatcher(self.mapping, skip_none_partials=self._skip_none_partials)
+
+    def _build_automaton(self):
+        """Aho-Corasick goto/fail/output tables over the partial keys"""
+        goto = [{}]
+        outputs = [[]]
+        for index, key in enumerate(self._keys):
+            node = 0
+            for ch in key:
+                child = goto[node].get(ch)
+                if child is None:
+                    goto.append({})
+                    outputs.append([])
+                    child = len(goto) - 1
+                    goto[node][ch] = child
+                node = child
+            outputs[node].append(index)
+
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in goto[node].items():
+                queue.append(child)
+                state = fail[node]
+                while state and ch not in goto[state]:
+                    state = fail[state]
+                target = goto[state].get(ch, 0)
+                fail[child] = target if target != child else 0
+                outputs[child] = outputs[child] + outputs[fail[child]]
+
+        self._goto = goto
+        self._fail = fail
+        self._outputs = outputs
+
+    def _build_gram_index(self):
+        """Map each 4-character substring to the keys containing it"""
+        grams = {}
+        for index, key in enumerate(self._keys):
+            for gram in {key[i:i + MIN_PARTIAL_LENGTH] for i in range(len(key) - MIN_PARTIAL_LENGTH + 1)}:
+                grams.setdefault(gram, []).append(index)
+        self._grams = grams
+
+    def _contained_keys(self, label: str) -> Dict[int, list]:
+        """Key index -> start offsets of every key occurring in label"""
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        hits = {}
+        node = 0
+        for end, ch in enumerate(label):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for index in outputs[node]:
+                hits.setdefault(index, []).append(end - len(self._keys[index]) + 1)
+        return hits
+
+    def _containing_keys(self, label: str) -> list:
+        """Indexes of keys strictly longer than label that contain it"""
+        candidates = self._grams.get(label[:MIN_PARTIAL_LENGTH], ())
+        return [i for i in candidates if len(self._keys[i]) > len(label) and label in self._keys[i]]
+
+    def _valid_contained(self, index: int, label: str, starts: list) -> bool:
+        """Guard for a key found inside the label (the key is the shorter string)"""
+        key = self._keys[index]
+        if any(_is_whole_word(label, start, len(key)) for start in starts):
+            return True
+        return len(key) / len(label) >= MIN_LENGTH_RATIO
+
+    def _valid_containing(self, index: int, label: str) -> bool:
+        """Guard for a key containing the label (the label is the shorter string)"""
+        key = self._keys[index]
+        start = key.find(label)
+        while start != -1:
+            if _is_whole_word(key, start, len(label)):
+                return True
+            start = key.find(label, start + 1)
+        return len(label) / len(key) >= MIN_LENGTH_RATIO
+
+    def partial(self, label: str) -> Tuple[bool, Optional[str]]:
+        """
+        First guarded partial match in mapping order
+
+        Returns:
+            (found, value)
+        """
+        if len(label) < MIN_PARTIAL_LENGTH:
+            return False, None
+
+        contained = self._contained_keys(label)
+        containing = self._containing_keys(label)
+        if not contained and not containing:
+            return False, None
+
+        mapping = self.mapping
+        for index in sorted(set(contained).union(containing)):
+            key = self._keys[index]
+            if key not in mapping:
+                continue  # Removed since compilation
+            if index in contained:
+                if self._valid_contained(index, label, contained[index]):
+                    return True, mapping[key]
+            elif self._valid_containing(index, label):
+                return True, mapping[key]
+        return False, None
+
+    def match(self, label: str) -> Tuple[bool, Optional[str]]:
+        """
+        Exact match, falling back to the first guarded partial match
+
+        Args:
+            label: Normalized (lowercased, stripped) label
+
+        Returns:
+            (found, value); value may be None for keys explicitly mapped to None
+        """
+        if label in self.mapping:
+            return True, self.mapping[label]
+        return self.partial(label)
+
+    def __len__(self):
+        return len(self.mapping)
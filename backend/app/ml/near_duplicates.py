@@ -0,0 +1,133 @@
+"""
+Near-duplicate detection image reuse
+A difference hash (dHash) of each annotated photo is kept in a BK-tree for a
+short window, so a re-shot of the same shelf can reuse the earlier Vision
+annotations instead of making another paid call
+"""
+
+import io
+import logging
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+
+from app.utils.bktree import BKTree
+from app.utils.images import PIL_AVAILABLE
+
+if PIL_AVAILABLE:
+    from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+HASH_SIZE = 8  # 8x8 comparisons -> 64-bit hash
+
+
+def dhash(image_bytes: bytes, hash_size: int = HASH_SIZE) -> Optional[int]:
+    """
+    Difference hash of an image: compares horizontally adjacent pixels of a
+    (hash_size+1)x hash_size grayscale thumbnail
+
+    Returns:
+        Integer hash, or None if Pillow is unavailable or the image can't be decoded
+    """
+    if not PIL_AVAILABLE:
+        return None
+    try:
+        image = Image.open(io.BytesIO(image_bytes))
+        # Let the JPEG decoder downscale while decoding (up to 8x cheaper)
+        image.draft('L', (hash_size * 8, hash_size * 8))
+        pixels = list(image.convert('L').resize((hash_size + 1, hash_size), Image.BILINEAR).getdata())
+    except Exception as e:
+        logger.debug(f"Could not hash image: {e}")
+        return None
+
+    value = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return value
+
+
+class _Entry:
+    __slots__ = ('phash', 'scope', 'created', 'annotations', 'alive')
+
+    def __init__(self, phash, scope, created, annotations):
+        self.phash = phash
+        self.scope = scope
+        self.created = created
+        self.annotations = annotations
+        self.alive = True
+
+
+class NearDuplicateIndex:
+    """Recently annotated images, searchable by Hamming distance of their dHash"""
+
+    def __init__(self, window: float = 600, max_distance: int = 6, maxsize: int = 1024):
+        """
+        Args:
+            window: Seconds an annotated image stays reusable
+            max_distance: Largest Hamming distance (of 64 bits) treated as the same photo
+            maxsize: Maximum live entries kept
+        """
+        self.window = window
+        self.max_distance = max_distance
+        self.maxsize = maxsize
+        self._tree = BKTree()
+        self._entries = deque()
+        self._dead = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config) -> Optional['NearDuplicateIndex']:
+        """Build from app config; None when disabled (window of 0)"""
+        window = config.get('DETECTION_NEAR_DUPLICATE_WINDOW', 600)
+        if not window:
+            return None
+        return cls(
+            window=window,
+            max_distance=config.get('DETECTION_NEAR_DUPLICATE_DISTANCE', 6),
+            maxsize=config.get('DETECTION_NEAR_DUPLICATE_SIZE', 1024)
+        )
+
+    def _expire(self, now):
+        """Retire entries past the window or over maxsize; rebuild when mostly dead"""
+        entries = self._entries
+        while entries and (now - entries[0].created > self.window or len(entries) > self.maxsize):
+            entries.popleft().alive = False
+            self._dead += 1
+        if self._dead > len(entries):
+            tree = BKTree()
+            for entry in entries:
+                tree.add(entry.phash, entry)
+            self._tree = tree
+            self._dead = 0
+
+    def add(self, phash: int, annotations: Dict, scope=None):
+        """Remember the annotations of a freshly annotated image"""
+        if phash is None:
+            return
+        now = time.monotonic()
+        with self._lock:
+            entry = _Entry(phash, scope, now, annotations)
+            self._entries.append(entry)
+            self._tree.add(phash, entry)
+            self._expire(now)
+
+    def find(self, phash: int, scope=None) -> Optional[Dict]:
+        """Annotations of the closest live image within max_distance in the same scope"""
+        if phash is None:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            for distance, _, entry in self._tree.search(phash, self.max_distance):
+                if entry.alive and entry.scope == scope:
+                    logger.debug(f"Near-duplicate image found (distance {distance})")
+                    return entry.annotations
+        return None
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
@@ -0,0 +1,87 @@
+"""
+Image preprocessing before Vision annotation
+Phone photos arrive as multi-megabyte JPEGs with EXIF data; Vision only needs
+~1600px to label a shelf, so uploads are oriented, stripped of metadata and
+downscaled before they are sent
+"""
+
+import io
+import logging
+from typing import Optional
+
+from app.utils.images import PIL_AVAILABLE
+
+if PIL_AVAILABLE:
+    from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+EXIF_ORIENTATION = 0x0112
+
+
+class ImagePreprocessor:
+    """Orient, strip and downscale images to a maximum dimension as JPEG"""
+
+    def __init__(self, max_dimension: int = 1600, quality: int = 85):
+        """
+        Args:
+            max_dimension: Longest side in pixels after preprocessing
+            quality: JPEG quality of the re-encoded image
+        """
+        self.max_dimension = max_dimension
+        self.quality = quality
+
+    @classmethod
+    def from_config(cls, config) -> Optional['ImagePreprocessor']:
+        """Build from app config; None when disabled or Pillow is missing"""
+        max_dimension = config.get('DETECTION_MAX_DIMENSION', 1600)
+        if not max_dimension or not PIL_AVAILABLE:
+            return None
+        return cls(max_dimension=max_dimension, quality=config.get('DETECTION_JPEG_QUALITY', 85))
+
+    def __call__(self, image_bytes: bytes) -> bytes:
+        """
+        Prepare an image for annotation
+
+        Images that are already small, upright and free of metadata are
+        returned unchanged, as are bytes Pillow cannot decode (Vision reports
+        those itself).
+
+        Args:
+            image_bytes: Uploaded image data
+
+        Returns:
+            JPEG bytes no larger than max_dimension on either side
+        """
+        try:
+            image = Image.open(io.BytesIO(image_bytes))
+            width, height = image.size
+            scale = min(1.0, self.max_dimension / max(width, height))
+            exif = image.getexif()
+            orientation = exif.get(EXIF_ORIENTATION, 1)
+            if scale == 1.0 and orientation == 1 and not exif and 'icc_profile' not in image.info:
+                return image_bytes
+
+            target = (max(1, round(width * scale)), max(1, round(height * scale)))
+            # Let the JPEG decoder downscale by a power of two while decoding
+            image.draft('RGB', target)
+            image = ImageOps.exif_transpose(image)
+            if orientation in (5, 6, 7, 8):
+                target = target[::-1]
+            if image.size != target:
+                image = image.resize(target, Image.BICUBIC)
+
+            if image.mode in ('RGBA', 'LA', 'P'):
+                image = image.convert('RGBA')
+                background = Image.new('RGB', image.size, (255, 255, 255))
+                background.paste(image, mask=image.getchannel('A'))
+                image = background
+            elif image.mode != 'RGB':
+                image = image.convert('RGB')
+
+            out = io.BytesIO()
+            image.save(out, format='JPEG', quality=self.quality, optimize=True)
+            return out.getvalue()
+        except Exception as e:
+            logger.debug(f"Could not preprocess image, sending original: {e}")
+            return image_bytes
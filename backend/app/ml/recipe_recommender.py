@@ -6,6 +6,7 @@ Provides intelligent recipe recommendations based on user preferences and histor
 from typing import List, Dict, Optional
 from datetime import datetime, timedelta
 from app.models import Recipe, UserPreference, MealPlan, RecipeIngredient, Ingredient, UserPantry
+from app.services.recipe_serializer import load_ingredient_lines, serialize_recipes
 from app import db
 
 
@@ -65,11 +66,23 @@ class RecipeRecommender:
 
         recipes = query.all()
 
+        # Load every recipe's ingredient lines in one query (shared by scoring and serialization)
+        lines_by_recipe = load_ingredient_lines(recipe.id for recipe in recipes)
+
         # Score each recipe
-        scored_recipes = []
+        scored = []
         for recipe in recipes:
+            recipe_lines = lines_by_recipe.get(recipe.id, [])
+
             # Calculate ingredient match details
-            match_info = self._calculate_ingredient_match_details(recipe, available_ingredients)
+            match_info = self._calculate_ingredient_match_details(
+                recipe, available_ingredients, recipe_lines=recipe_lines
+            )
+
+            # Filter out recipes below minimum ingredient match threshold
+            if available_ingredients and min_match_percentage > 0 and \
+               match_info['match_percentage'] < min_match_percentage:
+                continue
 
             score = self._calculate_recipe_score(
                 recipe=recipe,
@@ -77,37 +90,37 @@ class RecipeRecommender:
                 available_ingredients=available_ingredients,
                 recent_meals=recent_meals,
                 favorite_recipes=favorite_recipes,
-                preferences=preferences
+                preferences=preferences,
+                recipe_lines=recipe_lines
             )
+            scored.append((recipe, score, match_info))
+
+        # Sort by score (highest first) and keep the top N
+        scored.sort(key=lambda x: x[1], reverse=True)
+        scored = scored[:limit]
+
+        # Serialize only the recipes being returned
+        recipe_dicts = serialize_recipes([recipe for recipe, _, _ in scored], lines=lines_by_recipe)
 
-            recipe_dict = recipe.to_dict()
+        results = []
+        for (recipe, score, match_info), recipe_dict in zip(scored, recipe_dicts):
             # Add match info to recipe
             recipe_dict['match_percentage'] = match_info['match_percentage']
             recipe_dict['matching_ingredients'] = match_info['matching_count']
             recipe_dict['total_ingredients'] = match_info['total_count']
             recipe_dict['missing_ingredients'] = match_info['missing_ingredients']
 
-            scored_recipes.append({
+            results.append({
                 'recipe': recipe_dict,
                 'score': score,
                 'match_info': match_info,
                 'reasoning': self._get_recommendation_reasoning(
-                    recipe, score, available_ingredients, recent_meals
+                    recipe, score, available_ingredients, recent_meals,
+                    recipe_lines=lines_by_recipe.get(recipe.id, [])
                 )
             })
 
-        # Filter out recipes below minimum ingredient match threshold
-        if available_ingredients and min_match_percentage > 0:
-            scored_recipes = [
-                sr for sr in scored_recipes
-                if sr['match_info']['match_percentage'] >= min_match_percentage
-            ]
-
-        # Sort by score (highest first)
-        scored_recipes.sort(key=lambda x: x['score'], reverse=True)
-
-        # Return top N
-        return scored_recipes[:limit]
+        return results
 
     def _get_pantry_ingredients(self, user_id: int) -> List[str]:
         """
@@ -141,7 +154,8 @@ class RecipeRecommender:
     def _calculate_ingredient_match_details(
         self,
         recipe: Recipe,
-        available_ingredients: Optional[List[str]]
+        available_ingredients: Optional[List[str]],
+        recipe_lines: Optional[List[Dict]] = None
     ) -> Dict:
         """
         Calculate detailed ingredient match information
@@ -149,20 +163,27 @@ class RecipeRecommender:
         Args:
             recipe: Recipe object
             available_ingredients: List of ingredient names
+            recipe_lines: Preloaded serialized ingredient lines (queried if omitted)
 
         Returns:
             Dict with match details
         """
         # Get recipe ingredients
-        recipe_ingredients = db.session.query(
-            Ingredient.id,
-            Ingredient.name,
-            RecipeIngredient.is_optional
-        ).join(
-            RecipeIngredient
-        ).filter(
-            RecipeIngredient.recipe_id == recipe.id
-        ).all()
+        if recipe_lines is not None:
+            recipe_ingredients = [
+                (line['ingredient_id'], line['ingredient_name'], line['is_optional'])
+                for line in recipe_lines if line['ingredient'] is not None
+            ]
+        else:
+            recipe_ingredients = db.session.query(
+                Ingredient.id,
+                Ingredient.name,
+                RecipeIngredient.is_optional
+            ).join(
+                RecipeIngredient
+            ).filter(
+                RecipeIngredient.recipe_id == recipe.id
+            ).all()
 
         if not available_ingredients:
             return {
@@ -206,7 +227,8 @@ class RecipeRecommender:
         available_ingredients: Optional[List[str]],
         recent_meals: List[int],
         favorite_recipes: List[int],
-        preferences: Optional[UserPreference]
+        preferences: Optional[UserPreference],
+        recipe_lines: Optional[List[Dict]] = None
     ) -> float:
         """
         Calculate recommendation score for a recipe
@@ -225,6 +247,7 @@ class RecipeRecommender:
             recent_meals: List of recently eaten recipe IDs
             favorite_recipes: List of favorite recipe IDs
             preferences: User preferences
+            recipe_lines: Preloaded serialized ingredient lines (queried if omitted)
 
         Returns:
             Score between 0-100
@@ -233,7 +256,9 @@ class RecipeRecommender:
 
         # 1. Ingredient Match (0-70 points)
         if available_ingredients:
-            match_score = self._calculate_ingredient_match(recipe, available_ingredients)
+            match_score = self._calculate_ingredient_match(
+                recipe, available_ingredients, recipe_lines=recipe_lines
+            )
             score += match_score * 70
 
         # 2. Recipe Rating (0-10 points)
@@ -273,7 +298,8 @@ class RecipeRecommender:
     def _calculate_ingredient_match(
         self,
         recipe: Recipe,
-        available_ingredients: List[str]
+        available_ingredients: List[str],
+        recipe_lines: Optional[List[Dict]] = None
     ) -> float:
         """
         Calculate how well recipe matches available ingredients
@@ -281,18 +307,25 @@ class RecipeRecommender:
         Args:
             recipe: Recipe object
             available_ingredients: List of ingredient names
+            recipe_lines: Preloaded serialized ingredient lines (queried if omitted)
 
         Returns:
             Match percentage (0.0 to 1.0)
         """
         # Get recipe ingredients
-        recipe_ingredients = db.session.query(Ingredient.name).join(
-            RecipeIngredient
-        ).filter(
-            RecipeIngredient.recipe_id == recipe.id
-        ).all()
+        if recipe_lines is not None:
+            recipe_ingredient_names = {
+                line['ingredient_name'].lower()
+                for line in recipe_lines if line['ingredient'] is not None
+            }
+        else:
+            recipe_ingredients = db.session.query(Ingredient.name).join(
+                RecipeIngredient
+            ).filter(
+                RecipeIngredient.recipe_id == recipe.id
+            ).all()
+            recipe_ingredient_names = {ing[0].lower() for ing in recipe_ingredients}
 
-        recipe_ingredient_names = {ing[0].lower() for ing in recipe_ingredients}
         available_set = {ing.lower() for ing in available_ingredients}
 
         if len(recipe_ingredient_names) == 0:
@@ -351,7 +384,8 @@ class RecipeRecommender:
         recipe: Recipe,
         score: float,
         available_ingredients: Optional[List[str]],
-        recent_meals: List[int]
+        recent_meals: List[int],
+        recipe_lines: Optional[List[Dict]] = None
     ) -> str:
         """
         Generate human-readable reasoning for recommendation
@@ -361,6 +395,7 @@ class RecipeRecommender:
             score: Recommendation score
             available_ingredients: Available ingredients
             recent_meals: Recent meal IDs
+            recipe_lines: Preloaded serialized ingredient lines (queried if omitted)
 
         Returns:
             Reasoning string
@@ -369,7 +404,9 @@ class RecipeRecommender:
 
         # Ingredient match
         if available_ingredients:
-            match_pct = self._calculate_ingredient_match(recipe, available_ingredients)
+            match_pct = self._calculate_ingredient_match(
+                recipe, available_ingredients, recipe_lines=recipe_lines
+            )
             if match_pct >= 0.8:
                 reasons.append(f"Great match with your ingredients ({int(match_pct * 100)}%)")
             elif match_pct >= 0.5:
@@ -431,7 +468,7 @@ class RecipeRecommender:
 
         recipes = query.limit(limit).all()
 
-        return [{'recipe': recipe.to_dict(), 'score': 80.0} for recipe in recipes]
+        return [{'recipe': recipe_dict, 'score': 80.0} for recipe_dict in serialize_recipes(recipes)]
 
     def recommend_quick_recipes(
         self,
@@ -454,4 +491,4 @@ class RecipeRecommender:
             Recipe.rating.desc()
         ).limit(limit).all()
 
-        return [{'recipe': recipe.to_dict(), 'score': 75.0} for recipe in recipes]
+        return [{'recipe': recipe_dict, 'score': 75.0} for recipe_dict in serialize_recipes(recipes)]
@@ -5,7 +5,10 @@ from .user_preference import UserPreference
 from .meal_plan import MealPlan
 from .shopping_list import ShoppingList
 from .detection_feedback import DetectionFeedback
+from .detection_annotation import DetectionAnnotation
+from .unmapped_label import UnmappedLabel
 from .user_pantry import UserPantry
+from .image_fetch_job import ImageFetchJob
 
 __all__ = [
     'User',
@@ -16,5 +19,8 @@ __all__ = [
     'MealPlan',
     'ShoppingList',
     'DetectionFeedback',
-    'UserPantry'
+    'DetectionAnnotation',
+    'UnmappedLabel',
+    'UserPantry',
+    'ImageFetchJob'
 ]
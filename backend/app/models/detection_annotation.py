@@ -0,0 +1,94 @@
+"""
+Detection Annotation Model
+Keeps the raw Vision labels and objects of every detected image so mappings
+can be re-evaluated later without calling the API again
+"""
+
+from datetime import datetime
+from app import db
+
+
+class DetectionAnnotation(db.Model):
+    """
+    Raw annotations of one detected image, with the label -> ingredient
+    mapping that was in effect when it was detected (or last remapped).
+    """
+    __tablename__ = 'detection_annotations'
+
+    id = db.Column(db.Integer, primary_key=True)
+
+    # User who uploaded the image (if authenticated)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True, index=True)
+
+    # SHA-256 of the uploaded image
+    image_hash = db.Column(db.String(64), nullable=False, index=True)
+
+    # Backend that produced the annotations (e.g. google_vision, stub)
+    backend = db.Column(db.String(30), nullable=True)
+
+    # Raw annotations: [{description, score}] and [{name, score, bbox}]
+    labels = db.Column(db.JSON, nullable=False, default=list)
+    objects = db.Column(db.JSON, nullable=False, default=list)
+
+    # Lowercased label/object name -> mapped ingredient (or null)
+    label_mappings = db.Column(db.JSON, nullable=False, default=dict)
+
+    # Timestamps
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    remapped_at = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f'<DetectionAnnotation {self.id} {self.image_hash[:12]}>'
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'user_id': self.user_id,
+            'image_hash': self.image_hash,
+            'backend': self.backend,
+            'labels': self.labels,
+            'objects': self.objects,
+            'label_mappings': self.label_mappings,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'remapped_at': self.remapped_at.isoformat() if self.remapped_at else None
+        }
+
+    @staticmethod
+    def annotation_labels(labels, objects):
+        """Lowercased label descriptions and object names of an annotation"""
+        names = [label['description'] for label in labels or []]
+        names.extend(obj['name'] for obj in objects or [])
+        return [name.lower().strip() for name in names]
+
+    @classmethod
+    def record_many(cls, records, backend=None):
+        """
+        Store annotations of detected images in one commit
+
+        Args:
+            records: Dicts with image_hash, annotations, label_mappings and
+                scope (the uploading user's ID, if any)
+            backend: Name of the annotation backend
+        """
+        try:
+            for record in records:
+                annotations = record['annotations']
+                db.session.add(cls(
+                    user_id=_user_id(record.get('scope')),
+                    image_hash=record['image_hash'],
+                    backend=backend,
+                    labels=annotations.get('labels', []),
+                    objects=annotations.get('objects', []),
+                    label_mappings=record['label_mappings']
+                ))
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+
+def _user_id(scope):
+    try:
+        return int(scope)
+    except (TypeError, ValueError):
+        return None
@@ -3,8 +3,10 @@ Detection Feedback Model
 Stores user corrections to improve ingredient detection accuracy over time
 """
 
+from collections import namedtuple
 from datetime import datetime
 from app import db
+from app.utils.upsert import dialect_insert
 
 
 class DetectionFeedback(db.Model):
@@ -39,7 +41,14 @@ class DetectionFeedback(db.Model):
 
     # Timestamps
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
+
+    # One row per correction; repeats increment correction_count. The
+    # label/count index serves the per-label winner lookup.
+    __table_args__ = (
+        db.UniqueConstraint('detected_label', 'correct_ingredient', name='unique_label_correction'),
+        db.Index('ix_detection_feedback_label_count', 'detected_label', 'correction_count', 'id'),
+    )
 
     # Relationships
     ingredient = db.relationship('Ingredient', backref='detection_feedbacks')
@@ -49,16 +58,21 @@ class DetectionFeedback(db.Model):
         return f'<DetectionFeedback {self.detected_label} -> {self.correct_ingredient}>'
 
     def to_dict(self):
+        return self.row_to_dict(self)
+
+    @staticmethod
+    def row_to_dict(row):
+        """to_dict for a model instance or a SavedFeedback tuple"""
         return {
-            'id': self.id,
-            'detected_label': self.detected_label,
-            'ai_mapped_ingredient': self.ai_mapped_ingredient,
-            'correct_ingredient': self.correct_ingredient,
-            'correct_ingredient_id': self.correct_ingredient_id,
-            'correction_count': self.correction_count,
-            'learned_confidence': self.learned_confidence,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+            'id': row.id,
+            'detected_label': row.detected_label,
+            'ai_mapped_ingredient': row.ai_mapped_ingredient,
+            'correct_ingredient': row.correct_ingredient,
+            'correct_ingredient_id': row.correct_ingredient_id,
+            'correction_count': row.correction_count,
+            'learned_confidence': row.learned_confidence,
+            'created_at': row.created_at.isoformat() if row.created_at else None,
+            'updated_at': row.updated_at.isoformat() if row.updated_at else None
         }
 
     @classmethod
@@ -68,46 +82,220 @@ class DetectionFeedback(db.Model):
         Returns the mapping with highest correction count.
         """
         feedback = cls.query.filter_by(detected_label=detected_label.lower()) \
-            .order_by(cls.correction_count.desc()) \
+            .order_by(cls.correction_count.desc(), cls.id) \
             .first()
         return feedback
 
+    @staticmethod
+    def confidence_for(correction_count):
+        """Confidence grows with corrections: 1st=0.5, 2nd=0.7, 3rd=0.8, capped at 0.99"""
+        if correction_count <= 1:
+            return 0.5
+        return min(0.99, 0.5 + correction_count * 0.1)
+
     @classmethod
     def add_or_update_feedback(cls, detected_label, correct_ingredient,
                                ai_mapped=None, ingredient_id=None, user_id=None):
         """
         Add new feedback or increment existing correction count.
         """
-        detected_label = detected_label.lower().strip()
-
-        # Check if this correction already exists
-        existing = cls.query.filter_by(
-            detected_label=detected_label,
-            correct_ingredient=correct_ingredient
-        ).first()
-
-        if existing:
-            # Increment correction count and boost confidence
-            existing.correction_count += 1
-            # Confidence increases with more corrections (max 0.99)
-            existing.learned_confidence = min(0.99, 0.5 + (existing.correction_count * 0.1))
-            existing.updated_at = datetime.utcnow()
+        return cls.upsert_many([{
+            'detected_label': detected_label,
+            'correct_ingredient': correct_ingredient,
+            'ai_mapped': ai_mapped,
+            'ingredient_id': ingredient_id,
+            'user_id': user_id
+        }])[0]
+
+    @classmethod
+    def upsert_many(cls, corrections):
+        """
+        Record corrections with one INSERT ... ON CONFLICT upsert and commit.
+        Concurrent submissions of the same correction add to one row instead
+        of racing to create duplicates.
+
+        Args:
+            corrections: Dicts with detected_label, correct_ingredient and
+                optionally ai_mapped, ingredient_id and user_id
+
+        Returns:
+            A SavedFeedback tuple of the saved row for each correction, in
+            order. Unlike model instances these are not expired by the
+            commit, so reading them costs no further queries.
+        """
+        now = datetime.utcnow()
+        rows = {}
+        keys = []
+        for correction in corrections:
+            key = (correction['detected_label'].lower().strip(), correction['correct_ingredient'])
+            keys.append(key)
+            row = rows.get(key)
+            if row is None:
+                rows[key] = {
+                    'detected_label': key[0],
+                    'ai_mapped_ingredient': correction.get('ai_mapped'),
+                    'correct_ingredient': key[1],
+                    'correct_ingredient_id': correction.get('ingredient_id'),
+                    'user_id': correction.get('user_id'),
+                    'correction_count': 1,
+                    'learned_confidence': 0.5,
+                    'created_at': now,
+                    'updated_at': now
+                }
+            else:
+                row['correction_count'] += 1
+                row['learned_confidence'] = cls.confidence_for(row['correction_count'])
+        if not rows:
+            return []
+
+        try:
+            insert = dialect_insert(db.session.get_bind())
+            if insert is not None:
+                saved = cls._upsert_rows(insert, list(rows.values()))
+            else:
+                saved = cls._merge_rows(list(rows.values()))
             db.session.commit()
-            return existing
-        else:
-            # Create new feedback entry
-            feedback = cls(
-                detected_label=detected_label,
-                ai_mapped_ingredient=ai_mapped,
-                correct_ingredient=correct_ingredient,
-                correct_ingredient_id=ingredient_id,
-                user_id=user_id,
-                correction_count=1,
-                learned_confidence=0.5
+        except Exception:
+            db.session.rollback()
+            raise
+        return [saved[key] for key in keys]
+
+    @classmethod
+    def _upsert_rows(cls, insert, rows):
+        table = cls.__table__
+        stmt = insert(cls).values(rows)
+        count = table.c.correction_count + stmt.excluded.correction_count
+        confidence = 0.5 + count * 0.1
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.detected_label, table.c.correct_ingredient],
+            set_={
+                'correction_count': count,
+                'learned_confidence': db.case((confidence > 0.99, 0.99), else_=confidence),
+                'correct_ingredient_id': db.func.coalesce(
+                    table.c.correct_ingredient_id, stmt.excluded.correct_ingredient_id
+                ),
+                'updated_at': stmt.excluded.updated_at
+            }
+        ).returning(*table.c)
+        saved = [SavedFeedback(*row) for row in db.session.execute(stmt)]
+        return {(fb.detected_label, fb.correct_ingredient): fb for fb in saved}
+
+    @classmethod
+    def _merge_rows(cls, rows):
+        """Read-modify-write fallback for databases without ON CONFLICT"""
+        saved = {}
+        for row in rows:
+            feedback = cls.query.filter_by(
+                detected_label=row['detected_label'],
+                correct_ingredient=row['correct_ingredient']
+            ).with_for_update().first()
+            if feedback is None:
+                feedback = cls(**row)
+                db.session.add(feedback)
+            else:
+                feedback.correction_count += row['correction_count']
+                feedback.learned_confidence = cls.confidence_for(feedback.correction_count)
+                if feedback.correct_ingredient_id is None:
+                    feedback.correct_ingredient_id = row['correct_ingredient_id']
+                feedback.updated_at = row['updated_at']
+            saved[(row['detected_label'], row['correct_ingredient'])] = feedback
+        db.session.flush()
+        return {
+            key: SavedFeedback(*(getattr(feedback, name) for name in SavedFeedback._fields))
+            for key, feedback in saved.items()
+        }
+
+    @classmethod
+    def get_changed_rows(cls, since=None):
+        """
+        Get the columns needed to rebuild learned mappings, optionally only
+        for rows updated at or after `since`.
+
+        Returns:
+            List of (id, detected_label, correct_ingredient, correction_count,
+            updated_at) tuples in id order
+        """
+        query = db.session.query(
+            cls.id, cls.detected_label, cls.correct_ingredient,
+            cls.correction_count, cls.updated_at
+        )
+        if since is not None:
+            query = query.filter(cls.updated_at >= since)
+        return query.order_by(cls.id).all()
+
+    @staticmethod
+    def _winner_strategy(dialect):
+        """How the database picks one row per label: DISTINCT ON, a window
+        function, or (SQLite before 3.25) an anti-join"""
+        if dialect.name == 'postgresql':
+            return 'distinct_on'
+        if dialect.name == 'sqlite' and dialect.dbapi.sqlite_version_info < (3, 25):
+            return 'anti_join'
+        return 'window'
+
+    @classmethod
+    def winners_query(cls, *columns, min_corrections=1, dialect=None):
+        """
+        Select the winning row for every detected_label: the correction with
+        the most corrections, ties going to the earliest row. This is the rule
+        GoogleVisionDetector._merge_feedback_rows applies incrementally.
+
+        Args:
+            columns: Columns to select
+            min_corrections: Ignore rows with fewer corrections
+            dialect: SQL dialect to build for (defaults to the session's)
+
+        Returns:
+            A Select yielding one row per label
+        """
+        if dialect is None:
+            dialect = db.session.get_bind().dialect
+        counted = cls.correction_count >= min_corrections
+        strategy = cls._winner_strategy(dialect)
+
+        if strategy == 'distinct_on':
+            return db.select(*columns).where(counted) \
+                .distinct(cls.detected_label) \
+                .order_by(cls.detected_label, cls.correction_count.desc(), cls.id)
+
+        if strategy == 'window':
+            rank = db.func.row_number().over(
+                partition_by=cls.detected_label,
+                order_by=(cls.correction_count.desc(), cls.id)
             )
-            db.session.add(feedback)
-            db.session.commit()
-            return feedback
+            ranked = db.select(cls.id, rank.label('rank')).where(counted).subquery()
+            return db.select(*columns).join(ranked, ranked.c.id == cls.id).where(ranked.c.rank == 1)
+
+        better = db.aliased(cls)
+        outranked = db.select(better.id).where(
+            better.detected_label == cls.detected_label,
+            better.correction_count >= min_corrections,
+            db.or_(
+                better.correction_count > cls.correction_count,
+                db.and_(better.correction_count == cls.correction_count, better.id < cls.id)
+            )
+        ).exists()
+        return db.select(*columns).where(counted, ~outranked)
+
+    @classmethod
+    def get_winner_rows(cls):
+        """
+        Get the winning row per label in the shape of get_changed_rows
+
+        Returns:
+            List of (id, detected_label, correct_ingredient, correction_count,
+            updated_at) tuples
+        """
+        stmt = cls.winners_query(
+            cls.id, cls.detected_label, cls.correct_ingredient,
+            cls.correction_count, cls.updated_at
+        )
+        return [tuple(row) for row in db.session.execute(stmt)]
+
+    @classmethod
+    def get_latest_update(cls):
+        """Newest updated_at across all feedback rows"""
+        return db.session.query(db.func.max(cls.updated_at)).scalar()
 
     @classmethod
     def get_all_learned_mappings(cls, min_corrections=1):
@@ -115,15 +303,19 @@ class DetectionFeedback(db.Model):
         Get all learned mappings with at least min_corrections.
         Returns a dictionary of detected_label -> correct_ingredient.
         """
-        feedbacks = cls.query.filter(cls.correction_count >= min_corrections).all()
-        mappings = {}
-        for feedback in feedbacks:
-            # Only use the mapping with highest correction count for each label
-            if feedback.detected_label not in mappings or \
-               feedback.correction_count > mappings[feedback.detected_label]['count']:
-                mappings[feedback.detected_label] = {
-                    'ingredient': feedback.correct_ingredient,
-                    'count': feedback.correction_count,
-                    'confidence': feedback.learned_confidence
-                }
-        return mappings
+        stmt = cls.winners_query(
+            cls.detected_label, cls.correct_ingredient, cls.correction_count, cls.learned_confidence,
+            min_corrections=min_corrections
+        )
+        return {
+            label: {
+                'ingredient': ingredient,
+                'count': count,
+                'confidence': confidence
+            }
+            for label, ingredient, count, confidence in db.session.execute(stmt)
+        }
+
+
+# Column values of a saved detection_feedback row, as returned by upsert_many
+SavedFeedback = namedtuple('SavedFeedback', [column.name for column in DetectionFeedback.__table__.columns])
@@ -0,0 +1,67 @@
+"""
+Image Fetch Job Model
+Persists background jobs that look up images for recipes without one
+"""
+
+from datetime import datetime
+from app import db
+
+
+class ImageFetchJob(db.Model):
+    """
+    A background job fetching recipe images via Google Custom Search.
+    Progress is written as the job runs so clients can poll its status.
+    """
+    __tablename__ = 'image_fetch_jobs'
+
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_COMPLETED = 'completed'
+    STATUS_FAILED = 'failed'
+
+    id = db.Column(db.Integer, primary_key=True)
+    status = db.Column(db.String(20), nullable=False, default=STATUS_PENDING, index=True)
+
+    # Recipes selected when the job was created (array of recipe IDs)
+    recipe_ids = db.Column(db.JSON, nullable=False)
+
+    # Progress
+    total = db.Column(db.Integer, default=0)
+    processed = db.Column(db.Integer, default=0)
+    updated_count = db.Column(db.Integer, default=0)
+    error = db.Column(db.Text)
+
+    # Refreshed by the runner after each recipe; a running job whose
+    # heartbeat is older than the lease may be claimed by another process
+    heartbeat_at = db.Column(db.DateTime)
+
+    # User who started the job
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
+
+    # Timestamps
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    @property
+    def is_finished(self):
+        return self.status in (self.STATUS_COMPLETED, self.STATUS_FAILED)
+
+    def to_dict(self):
+        """Convert job to dictionary"""
+        return {
+            'id': self.id,
+            'status': self.status,
+            'total': self.total,
+            'processed': self.processed,
+            'updated_count': self.updated_count,
+            'progress': round(self.processed / self.total * 100, 1) if self.total else 100.0,
+            'error': self.error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+
+    def __repr__(self):
+        return f'<ImageFetchJob {self.id} {self.status}>'
@@ -24,6 +24,11 @@ class Ingredient(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    # Case-insensitive name lookups (search, bulk import) use lower(name)
+    __table_args__ = (
+        db.Index('ix_ingredients_name_lower', db.func.lower(name)),
+    )
+
     # Relationships
     recipe_ingredients = db.relationship(
         'RecipeIngredient',
@@ -70,6 +75,12 @@ class RecipeIngredient(db.Model):
 
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    # Lines are loaded per recipe and matched per ingredient (ingredient search)
+    __table_args__ = (
+        db.Index('ix_recipe_ingredients_recipe_id', 'recipe_id'),
+        db.Index('ix_recipe_ingredients_ingredient_recipe', 'ingredient_id', 'recipe_id'),
+    )
+
     def to_dict(self):
         """Convert recipe ingredient to dictionary"""
         ingredient_dict = self.ingredient.to_dict() if self.ingredient else None
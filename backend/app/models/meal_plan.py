@@ -28,20 +28,31 @@ class MealPlan(db.Model):
     # Relationships
     recipe = db.relationship('Recipe', backref='meal_plans')
 
+    # Per-user date range listings and per-recipe rating aggregation
+    __table_args__ = (
+        db.Index('ix_meal_plans_user_planned_date', 'user_id', 'planned_date'),
+        db.Index('ix_meal_plans_recipe_rating', 'recipe_id', 'user_rating'),
+    )
+
+    @classmethod
+    def replace_rating(cls, meal_plan_id, expected_rating, rating, **values):
+        """
+        Set user_rating only if it still equals expected_rating, so two
+        concurrent re-ratings cannot both apply a delta against the same
+        old value. Extra column values are written in the same UPDATE.
+
+        Returns:
+            1 if the rating was replaced, 0 if it changed in the meantime
+        """
+        return cls.query.filter(
+            cls.id == meal_plan_id,
+            cls.user_rating.is_not_distinct_from(expected_rating)
+        ).update(dict(values, user_rating=rating), synchronize_session=False)
+
     def to_dict(self):
         """Convert meal plan to dictionary"""
-        return {
-            'id': self.id,
-            'user_id': self.user_id,
-            'recipe': self.recipe.to_dict(include_ingredients=False) if self.recipe else None,
-            'planned_date': self.planned_date.isoformat(),
-            'meal_type': self.meal_type,
-            'is_completed': self.is_completed,
-            'completed_at': self.completed_at.isoformat() if self.completed_at else None,
-            'user_rating': self.user_rating,
-            'user_notes': self.user_notes,
-            'created_at': self.created_at.isoformat()
-        }
+        from app.services.recipe_serializer import serialize_meal_plans
+        return serialize_meal_plans([self])[0]
 
     def __repr__(self):
         return f'<MealPlan {self.planned_date} - {self.meal_type}>'
@@ -45,6 +45,7 @@ class Recipe(db.Model):
     # Rating and popularity
     rating = db.Column(db.Float, default=0.0)
     rating_count = db.Column(db.Integer, default=0)
+    rating_sum = db.Column(db.Float, default=0.0, server_default='0')  # Running total for O(1) averages
     view_count = db.Column(db.Integer, default=0)
 
     # Timestamps
@@ -54,47 +55,63 @@ class Recipe(db.Model):
     # Relationships
     ingredients = db.relationship('RecipeIngredient', backref='recipe', lazy='dynamic', cascade='all, delete-orphan')
 
+    # Browse/recommendation queries filter by cuisine or time and order by rating
+    __table_args__ = (
+        db.Index('ix_recipes_cuisine_rating', 'cuisine_type', 'rating'),
+        db.Index('ix_recipes_time_rating', 'total_time', 'rating'),
+    )
+
     def to_dict(self, include_ingredients=True):
         """Convert recipe to dictionary"""
-        data = {
-            'id': self.id,
-            'name': self.name,
-            'description': self.description,
-            'cuisine_type': self.cuisine_type,
-            'meal_type': self.meal_type,
-            'difficulty_level': self.difficulty_level,
-            'time': {
-                'prep_time': self.prep_time,
-                'cook_time': self.cook_time,
-                'total_time': self.total_time
-            },
-            'servings': self.servings,
-            'instructions': self.instructions,
-            'nutrition': {
-                'calories': self.calories,
-                'protein': self.protein,
-                'carbohydrates': self.carbohydrates,
-                'fat': self.fat,
-                'fiber': self.fiber
-            },
-            'dietary': {
-                'is_vegetarian': self.is_vegetarian,
-                'is_vegan': self.is_vegan,
-                'is_gluten_free': self.is_gluten_free,
-                'is_dairy_free': self.is_dairy_free
-            },
-            'image_url': self.image_url,
-            'video_url': self.video_url,
-            'rating': self.rating,
-            'rating_count': self.rating_count,
-            'view_count': self.view_count,
-            'created_at': self.created_at.isoformat()
-        }
-
-        if include_ingredients:
-            data['ingredients'] = [ri.to_dict() for ri in self.ingredients.all()]
-
-        return data
+        from app.services.recipe_serializer import serialize_recipe
+        return serialize_recipe(self, include_ingredients=include_ingredients)
+
+    @staticmethod
+    def _average_expr(total, count):
+        """SQL expression for a rounded average that is 0 when there are no ratings"""
+        return db.case(
+            (count > 0, db.func.round(db.cast(total * 1.0 / count, db.Numeric), 2)),
+            else_=0.0
+        )
+
+    @classmethod
+    def apply_rating_delta(cls, recipe_id, sum_delta, count_delta):
+        """
+        Atomically adjust a recipe's rating aggregates with a single UPDATE.
+
+        A new rating is (rating, +1), a re-rating is (new - old, 0) and a
+        removed rating is (-old, -1). Cost is constant regardless of how
+        many ratings the recipe has.
+        """
+        new_sum = db.func.coalesce(cls.rating_sum, 0) + sum_delta
+        new_count = db.func.coalesce(cls.rating_count, 0) + count_delta
+
+        return cls.query.filter(cls.id == recipe_id).update({
+            cls.rating_sum: new_sum,
+            cls.rating_count: new_count,
+            cls.rating: cls._average_expr(new_sum, new_count)
+        }, synchronize_session=False)
+
+    @classmethod
+    def reconcile_rating_aggregates(cls):
+        """
+        Rebuild rating_sum, rating_count and rating for every recipe from
+        the MealPlan rating history. Returns the number of recipes updated.
+        """
+        from app.models.meal_plan import MealPlan
+
+        rated = db.and_(MealPlan.recipe_id == cls.id, MealPlan.user_rating.isnot(None))
+        total = db.select(db.func.coalesce(db.func.sum(MealPlan.user_rating), 0)) \
+            .where(rated).scalar_subquery()
+        count = db.select(db.func.count(MealPlan.id)).where(rated).scalar_subquery()
+
+        updated = cls.query.update({
+            cls.rating_sum: total,
+            cls.rating_count: count,
+            cls.rating: cls._average_expr(total, count)
+        }, synchronize_session=False)
+        db.session.commit()
+        return updated
 
     def __repr__(self):
         return f'<Recipe {self.name}>'
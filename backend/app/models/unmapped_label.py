@@ -0,0 +1,49 @@
+"""
+Unmapped Label Model
+Counts Vision labels that no static or learned mapping turns into an
+ingredient, so the mapping table can be grown from real traffic
+"""
+
+from datetime import datetime
+from app import db
+
+
+class UnmappedLabel(db.Model):
+    """
+    Running totals for one unmapped Vision label. Rows are written by
+    batched upserts from UnmappedLabelCounter, never per detection.
+    """
+    __tablename__ = 'unmapped_labels'
+
+    id = db.Column(db.Integer, primary_key=True)
+
+    # Lowercased label or object name from Vision
+    label = db.Column(db.String(100), nullable=False, unique=True)
+
+    # Images the label appeared in, and the sum of its scores (for the average)
+    occurrence_count = db.Column(db.Integer, nullable=False, default=0, index=True)
+    score_sum = db.Column(db.Float, nullable=False, default=0.0)
+
+    # Timestamps
+    first_seen_at = db.Column(db.DateTime, default=datetime.utcnow)
+    last_seen_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<UnmappedLabel {self.label} x{self.occurrence_count}>'
+
+    def to_dict(self):
+        return {
+            'label': self.label,
+            'count': self.occurrence_count,
+            'average_score': round(self.score_sum / self.occurrence_count, 3) if self.occurrence_count else None,
+            'first_seen_at': self.first_seen_at.isoformat() if self.first_seen_at else None,
+            'last_seen_at': self.last_seen_at.isoformat() if self.last_seen_at else None
+        }
+
+    @classmethod
+    def get_ranked(cls, limit=50, min_count=1):
+        """Most frequent unmapped labels first"""
+        return cls.query.filter(cls.occurrence_count >= min_count) \
+            .order_by(cls.occurrence_count.desc(), cls.label) \
+            .limit(limit) \
+            .all()
@@ -15,7 +15,7 @@ class User(db.Model):
     first_name = db.Column(db.String(50))
     last_name = db.Column(db.String(50))
     phone = db.Column(db.String(20))
-    profile_photo = db.Column(db.String(255))  # Path to profile photo
+    profile_photo = db.Column(db.String(255))  # Content hash of the processed photo (legacy: file path)
 
     # Subscription
     is_premium = db.Column(db.Boolean, default=False)
@@ -42,6 +42,14 @@ class User(db.Model):
         """Verify password"""
         return check_password_hash(self.password_hash, password)
 
+    def _profile_photo_urls(self):
+        """Content-addressed photo URLs by size, or None"""
+        from app.services.profile_photos import is_photo_digest, photo_url, PROFILE_PHOTO_SIZES
+
+        if not is_photo_digest(self.profile_photo):
+            return None
+        return {size: photo_url(self.profile_photo, size) for size in PROFILE_PHOTO_SIZES}
+
     def to_dict(self):
         """Convert user to dictionary"""
         # Combine first_name and last_name into full_name for Flutter app
@@ -62,6 +70,7 @@ class User(db.Model):
             'full_name': full_name,  # Added for Flutter app compatibility
             'phone': self.phone,
             'profile_photo': self.profile_photo,
+            'profile_photo_urls': self._profile_photo_urls(),
             'is_premium': self.is_premium,
             'subscription_expires': self.subscription_expires.isoformat() if self.subscription_expires else None,
             'created_at': self.created_at.isoformat(),
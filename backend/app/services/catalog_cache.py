@@ -0,0 +1,146 @@
+"""
+Recipe catalog result caching
+Caches read-heavy catalog queries in-process and invalidates them whenever
+recipes, ingredients or recipe ingredient lines are written
+"""
+
+import itertools
+import logging
+import threading
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.utils.lru_cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+# Tables whose writes invalidate cached catalog results
+CATALOG_TABLES = {'recipes', 'ingredients', 'recipe_ingredients'}
+
+# Columns bumped on reads (e.g. view counting) that should not invalidate caches
+VOLATILE_COLUMNS = {'view_count', 'updated_at'}
+
+_SESSION_FLAG = 'catalog_modified'
+
+
+class CatalogCache:
+    """LRU cache of catalog query results, cleared on every catalog write"""
+
+    _registry = []
+    _version = 0
+    _lock = threading.Lock()
+
+    def __init__(self, name: str, maxsize: int = 256, ttl: float = None):
+        self.name = name
+        self._cache = LRUCache(maxsize=maxsize, ttl=ttl)
+        CatalogCache._registry.append(self)
+
+    def configure(self, maxsize: int = None, ttl: float = None):
+        """Resize the cache or change its TTL (drops current entries)"""
+        self._cache = LRUCache(
+            maxsize=maxsize if maxsize is not None else self._cache.maxsize,
+            ttl=ttl if ttl is not None else self._cache.ttl
+        )
+
+    def get(self, key):
+        return self._cache.get(key)
+
+    def set(self, key, value):
+        self._cache.set(key, value)
+
+    def clear(self):
+        self._cache.clear()
+
+    def __len__(self):
+        return len(self._cache)
+
+    @classmethod
+    def version(cls) -> int:
+        """Monotonic counter bumped on every catalog write"""
+        return cls._version
+
+    @classmethod
+    def invalidate_all(cls):
+        """Bump the catalog version and clear every registered cache"""
+        with cls._lock:
+            cls._version += 1
+            for cache in cls._registry:
+                cache.clear()
+        logger.debug(f"Catalog caches invalidated (version {cls._version})")
+
+
+def _is_catalog_object(obj) -> bool:
+    table = getattr(obj, '__tablename__', None)
+    return table in CATALOG_TABLES
+
+
+def _has_catalog_changes(obj) -> bool:
+    """True if a dirty catalog object changed anything besides volatile columns"""
+    state = inspect(obj)
+    for attr in state.mapper.column_attrs:
+        if attr.key in VOLATILE_COLUMNS:
+            continue
+        if state.attrs[attr.key].history.has_changes():
+            return True
+    return False
+
+
+def _after_flush(session, flush_context):
+    if session.info.get(_SESSION_FLAG):
+        return
+    for obj in itertools.chain(session.new, session.deleted):
+        if _is_catalog_object(obj):
+            session.info[_SESSION_FLAG] = True
+            return
+    for obj in session.dirty:
+        if _is_catalog_object(obj) and _has_catalog_changes(obj):
+            session.info[_SESSION_FLAG] = True
+            return
+
+
+def _do_orm_execute(orm_execute_state):
+    # Bulk INSERT/UPDATE/DELETE statements bypass the unit of work
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    table = getattr(orm_execute_state.statement, 'table', None)
+    if table is not None and getattr(table, 'name', None) in CATALOG_TABLES:
+        orm_execute_state.session.info[_SESSION_FLAG] = True
+
+
+def _after_commit(session):
+    if session.info.pop(_SESSION_FLAG, False):
+        CatalogCache.invalidate_all()
+
+
+def _after_rollback(session):
+    session.info.pop(_SESSION_FLAG, None)
+
+
+def init_catalog_cache(app):
+    """Configure cache sizes from app config and install invalidation listeners"""
+    search_cache.configure(
+        maxsize=app.config.get('SEARCH_CACHE_SIZE', 512),
+        ttl=app.config.get('SEARCH_CACHE_TTL', 300)
+    )
+    facets_cache.configure(
+        maxsize=app.config.get('FACETS_CACHE_SIZE', 128),
+        ttl=app.config.get('SEARCH_CACHE_TTL', 300)
+    )
+
+    listeners = [
+        ('after_flush', _after_flush),
+        ('do_orm_execute', _do_orm_execute),
+        ('after_commit', _after_commit),
+        ('after_rollback', _after_rollback),
+    ]
+    for name, fn in listeners:
+        if not event.contains(Session, name, fn):
+            event.listen(Session, name, fn)
+
+
+# Results of POST /api/recipes/search keyed by normalized query
+search_cache = CatalogCache('search')
+
+# Results of GET /api/recipes/facets keyed by catalog version and filters
+facets_cache = CatalogCache('facets')
@@ -0,0 +1,122 @@
+"""
+Bulk remapping of stored detection annotations
+Re-runs label -> ingredient mapping over the detection_annotations table
+after VISION_TO_INGREDIENT or learned feedback changes, and reports what
+would change (or changed) without calling the Vision API
+"""
+
+import logging
+from collections import Counter
+from datetime import datetime
+
+from sqlalchemy import update
+
+from app import db
+
+logger = logging.getLogger(__name__)
+
+
+class RemapReport:
+    """How stored label mappings differ from the current ones"""
+
+    def __init__(self):
+        self.scanned = 0
+        self.changed = 0
+        self.updated = 0
+        self.distinct_labels = 0
+        # (label, old ingredient, new ingredient) -> images affected
+        self.label_changes = Counter()
+        # ingredient -> images where it now is / is no longer detected
+        self.gained = Counter()
+        self.lost = Counter()
+
+    def to_dict(self, top: int = 50):
+        return {
+            'scanned': self.scanned,
+            'changed': self.changed,
+            'updated': self.updated,
+            'distinct_labels': self.distinct_labels,
+            'label_changes': [
+                {'label': label, 'old': old, 'new': new, 'images': count}
+                for (label, old, new), count in self.label_changes.most_common(top)
+            ],
+            'gained': dict(self.gained.most_common(top)),
+            'lost': dict(self.lost.most_common(top))
+        }
+
+
+def remap_detection_annotations(detector, apply: bool = False, since: datetime = None,
+                                batch_size: int = 500) -> RemapReport:
+    """
+    Compare each stored annotation's label mappings with the detector's
+    current ones
+
+    Rows are read in id order in batches; each distinct label is mapped once.
+
+    Args:
+        detector: GoogleVisionDetector whose _map_to_ingredient is applied
+        apply: Store the new mappings on rows that changed
+        since: Only rows created at or after this time
+        batch_size: Rows read (and updated) per round trip
+
+    Returns:
+        RemapReport
+    """
+    from app.models import DetectionAnnotation
+
+    # Start from a full read of the learned feedback
+    detector.reset_learned_mappings()
+
+    report = RemapReport()
+    mapped = {}
+    last_id = 0
+    while True:
+        query = db.session.query(
+            DetectionAnnotation.id, DetectionAnnotation.labels,
+            DetectionAnnotation.objects, DetectionAnnotation.label_mappings
+        ).filter(DetectionAnnotation.id > last_id)
+        if since is not None:
+            query = query.filter(DetectionAnnotation.created_at >= since)
+        rows = query.order_by(DetectionAnnotation.id).limit(batch_size).all()
+        if not rows:
+            break
+
+        updates = []
+        for row_id, labels, objects, old_mappings in rows:
+            old_mappings = old_mappings or {}
+            new_mappings = {}
+            for label in DetectionAnnotation.annotation_labels(labels, objects):
+                if label not in mapped:
+                    mapped[label] = detector._map_to_ingredient(label)
+                new_mappings[label] = mapped[label]
+
+            report.scanned += 1
+            if new_mappings == old_mappings:
+                continue
+
+            report.changed += 1
+            for label, new in new_mappings.items():
+                old = old_mappings.get(label)
+                if old != new:
+                    report.label_changes[(label, old, new)] += 1
+            old_ingredients = {name for name in old_mappings.values() if name}
+            new_ingredients = {name for name in new_mappings.values() if name}
+            report.gained.update(new_ingredients - old_ingredients)
+            report.lost.update(old_ingredients - new_ingredients)
+            updates.append({'id': row_id, 'label_mappings': new_mappings})
+
+        if apply and updates:
+            now = datetime.utcnow()
+            for item in updates:
+                item['remapped_at'] = now
+            db.session.execute(update(DetectionAnnotation), updates)
+            db.session.commit()
+            report.updated += len(updates)
+
+        last_id = rows[-1][0]
+
+    report.distinct_labels = len(mapped)
+    logger.info(
+        f"Remapped {report.scanned} detection annotations: {report.changed} changed, {report.updated} updated"
+    )
+    return report
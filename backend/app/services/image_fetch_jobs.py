@@ -0,0 +1,210 @@
+"""
+Background runner for recipe image fetch jobs
+Jobs are persisted in the image_fetch_jobs table and executed by a bounded
+thread pool so HTTP workers are never blocked on Google Custom Search
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from app import db
+
+logger = logging.getLogger(__name__)
+
+
+class ImageFetchJobRunner:
+    """Runs ImageFetchJob rows on a bounded thread pool"""
+
+    def __init__(self):
+        self._executor = None
+        self._futures = {}
+        self._lock = threading.Lock()
+
+    def _get_executor(self, app):
+        with self._lock:
+            if self._executor is None:
+                max_workers = app.config.get('IMAGE_FETCH_MAX_WORKERS', 2)
+                self._executor = ThreadPoolExecutor(
+                    max_workers=max_workers,
+                    thread_name_prefix='image-fetch'
+                )
+            return self._executor
+
+    def create_job(self, limit: int, user_id: int = None):
+        """
+        Persist a new job for up to `limit` recipes that have no image and
+        are not waiting in another unfinished job
+
+        Returns:
+            The committed ImageFetchJob
+        """
+        from app.models import ImageFetchJob, Recipe
+
+        # Skip recipes a pending or running job has still to process, so
+        # jobs started back to back don't search for the same recipes
+        claimed = set()
+        active = db.session.query(ImageFetchJob.recipe_ids, ImageFetchJob.processed).filter(
+            ImageFetchJob.status.in_([ImageFetchJob.STATUS_PENDING, ImageFetchJob.STATUS_RUNNING])
+        )
+        for ids, processed in active:
+            claimed.update(ids[processed or 0:])
+
+        query = db.session.query(Recipe.id).filter(
+            (Recipe.image_url.is_(None)) | (Recipe.image_url == '')
+        )
+        if claimed:
+            query = query.filter(Recipe.id.notin_(claimed))
+        recipe_ids = [row[0] for row in query.order_by(Recipe.id).limit(limit).all()]
+
+        job = ImageFetchJob(
+            status=ImageFetchJob.STATUS_PENDING,
+            recipe_ids=recipe_ids,
+            total=len(recipe_ids),
+            processed=0,
+            updated_count=0,
+            user_id=user_id
+        )
+        db.session.add(job)
+        db.session.commit()
+        return job
+
+    def submit(self, app, job_id: int):
+        """Schedule a persisted job on the thread pool"""
+        future = self._get_executor(app).submit(self._run, app, job_id)
+        with self._lock:
+            self._futures[job_id] = future
+        future.add_done_callback(lambda _: self._forget(job_id))
+        return future
+
+    def _forget(self, job_id):
+        with self._lock:
+            self._futures.pop(job_id, None)
+
+    def wait(self, job_id: int, timeout: float = None) -> bool:
+        """Block until a submitted job finishes. Returns False if it isn't tracked."""
+        with self._lock:
+            future = self._futures.get(job_id)
+        if future is None:
+            return False
+        future.result(timeout=timeout)
+        return True
+
+    def shutdown(self, wait: bool = True):
+        """Stop the thread pool, optionally waiting for running jobs"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+    def resume_incomplete(self, app) -> int:
+        """
+        Re-submit jobs left pending, or running with an expired lease (e.g.
+        after a restart). Jobs another process is still running are skipped.
+        Not called automatically: operators run it via
+        `flask recipes resume-image-jobs` after a deploy or crash.
+        """
+        from app.models import ImageFetchJob
+
+        with app.app_context():
+            cutoff = self._lease_cutoff(app)
+            job_ids = [
+                row[0] for row in db.session.query(ImageFetchJob.id).filter(
+                    db.or_(
+                        ImageFetchJob.status == ImageFetchJob.STATUS_PENDING,
+                        db.and_(
+                            ImageFetchJob.status == ImageFetchJob.STATUS_RUNNING,
+                            db.or_(ImageFetchJob.heartbeat_at.is_(None), ImageFetchJob.heartbeat_at < cutoff)
+                        )
+                    )
+                ).all()
+            ]
+        for job_id in job_ids:
+            self.submit(app, job_id)
+        return len(job_ids)
+
+    @staticmethod
+    def _lease_cutoff(app):
+        lease = app.config.get('IMAGE_FETCH_LEASE_SECONDS', 300)
+        return datetime.utcnow() - timedelta(seconds=lease)
+
+    def _claim(self, app, job_id: int) -> bool:
+        """
+        Mark a job running with a conditional UPDATE so only one process
+        runs it. Returns False if it is finished or another runner holds a
+        live lease.
+        """
+        from app.models import ImageFetchJob
+
+        now = datetime.utcnow()
+        cutoff = self._lease_cutoff(app)
+        claimed = db.session.execute(
+            db.update(ImageFetchJob)
+            .where(
+                ImageFetchJob.id == job_id,
+                db.or_(
+                    ImageFetchJob.status == ImageFetchJob.STATUS_PENDING,
+                    db.and_(
+                        ImageFetchJob.status == ImageFetchJob.STATUS_RUNNING,
+                        db.or_(ImageFetchJob.heartbeat_at.is_(None), ImageFetchJob.heartbeat_at < cutoff)
+                    )
+                )
+            )
+            .values(
+                status=ImageFetchJob.STATUS_RUNNING,
+                started_at=db.func.coalesce(ImageFetchJob.started_at, now),
+                heartbeat_at=now
+            )
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.session.commit()
+        return claimed == 1
+
+    def _run(self, app, job_id: int):
+        """Process a job inside its own app context and session"""
+        from app.models import ImageFetchJob, Recipe
+        from app.services.image_search_service import image_search_service
+
+        with app.app_context():
+            try:
+                if not self._claim(app, job_id):
+                    logger.info(f"Image fetch job {job_id} is finished or running elsewhere; skipping")
+                    return
+                job = db.session.get(ImageFetchJob, job_id)
+
+                # Resume after already processed recipes
+                for recipe_id in job.recipe_ids[job.processed:]:
+                    recipe = db.session.get(Recipe, recipe_id)
+                    if recipe is not None and not recipe.image_url:
+                        image_url = image_search_service.search_food_image(
+                            recipe.name,
+                            cuisine_type=recipe.cuisine_type
+                        )
+                        if image_url:
+                            recipe.image_url = image_url
+                            job.updated_count += 1
+                    job.processed += 1
+                    job.heartbeat_at = datetime.utcnow()
+                    db.session.commit()
+
+                job.status = ImageFetchJob.STATUS_COMPLETED
+                job.finished_at = datetime.utcnow()
+                db.session.commit()
+                logger.info(f"Image fetch job {job_id} updated {job.updated_count}/{job.total} recipes")
+
+            except Exception as e:
+                logger.exception(f"Image fetch job {job_id} failed")
+                db.session.rollback()
+                job = db.session.get(ImageFetchJob, job_id)
+                if job is not None:
+                    job.status = ImageFetchJob.STATUS_FAILED
+                    job.error = str(e)
+                    job.finished_at = datetime.utcnow()
+                    db.session.commit()
+            finally:
+                db.session.remove()
+
+
+# Singleton instance
+image_fetch_runner = ImageFetchJobRunner()
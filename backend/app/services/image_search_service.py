@@ -1,10 +1,19 @@
 """
 Google Custom Search API Service for fetching food images
 """
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Iterator
+
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from flask import current_app
 import logging
 
+from app.utils.disk_cache import DiskCache, MISSING
+from app.utils.rate_limiter import RateLimiter
+
 logger = logging.getLogger(__name__)
 
 
@@ -13,9 +22,16 @@ class ImageSearchService:
 
     BASE_URL = "https://www.googleapis.com/customsearch/v1"
 
+    # Transient statuses retried with exponential backoff (429 honours Retry-After)
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+
     def __init__(self):
         self.api_key = None
         self.search_engine_id = None
+        self._session = None
+        self._cache = None
+        self._rate_limiter = None
+        self._lock = threading.Lock()
 
     def _get_credentials(self):
         """Get API credentials from config"""
@@ -25,6 +41,64 @@ class ImageSearchService:
             self.search_engine_id = current_app.config.get('GOOGLE_SEARCH_ENGINE_ID', '')
         return bool(self.api_key and self.search_engine_id)
 
+    def _get_session(self) -> requests.Session:
+        """Pooled HTTP session with retries, created on first use"""
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    retries = Retry(
+                        total=current_app.config.get('IMAGE_SEARCH_RETRIES', 3),
+                        backoff_factor=0.5,
+                        status_forcelist=self.RETRY_STATUSES,
+                        allowed_methods=frozenset(['GET']),
+                        raise_on_status=False
+                    )
+                    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=10, max_retries=retries)
+                    session = requests.Session()
+                    session.mount('https://', adapter)
+                    session.mount('http://', adapter)
+                    self._session = session
+        return self._session
+
+    def _get_cache(self) -> DiskCache | None:
+        """Persistent query -> URL cache, or None when disabled"""
+        path = current_app.config.get('IMAGE_SEARCH_CACHE_PATH')
+        if not path:
+            return None
+        if self._cache is None or self._cache.path != path:
+            with self._lock:
+                if self._cache is None or self._cache.path != path:
+                    self._cache = DiskCache(
+                        path,
+                        ttl=current_app.config.get('IMAGE_SEARCH_CACHE_TTL', 30 * 24 * 3600),
+                        table='image_search'
+                    )
+        return self._cache
+
+    def _get_rate_limiter(self) -> RateLimiter:
+        """Shared limiter keeping API calls under the per-minute quota"""
+        if self._rate_limiter is None:
+            with self._lock:
+                if self._rate_limiter is None:
+                    self._rate_limiter = RateLimiter(
+                        rate=current_app.config.get('IMAGE_SEARCH_RATE_LIMIT', 100),
+                        per=60,
+                        burst=current_app.config.get('IMAGE_SEARCH_MAX_WORKERS', 4)
+                    )
+        return self._rate_limiter
+
+    @staticmethod
+    def _build_query(food_name: str, cuisine_type: str = None) -> str:
+        query = f"{food_name} food"
+        if cuisine_type:
+            query = f"{cuisine_type} {query}"
+        return query
+
+    @staticmethod
+    def _cache_key(query: str) -> str:
+        """Normalize case and whitespace so equivalent lookups share an entry"""
+        return ' '.join(query.lower().split())
+
     def search_food_image(self, food_name: str, cuisine_type: str = None) -> str | None:
         """
         Search for a food image using Google Custom Search API
@@ -36,16 +110,21 @@ class ImageSearchService:
         Returns:
             URL of the image or None if not found
         """
+        query = self._build_query(food_name, cuisine_type)
+        cache = self._get_cache()
+        cache_key = self._cache_key(query)
+
+        # Cached answers (including "no result") never touch the API quota
+        if cache is not None:
+            cached = cache.get(cache_key)
+            if cached is not MISSING:
+                return cached
+
         if not self._get_credentials():
             logger.warning("Google Custom Search API credentials not configured")
             return None
 
         try:
-            # Build search query
-            query = f"{food_name} food"
-            if cuisine_type:
-                query = f"{cuisine_type} {query}"
-
             params = {
                 'key': self.api_key,
                 'cx': self.search_engine_id,
@@ -57,18 +136,31 @@ class ImageSearchService:
                 'num': 1,  # Get only the first result
             }
 
-            response = requests.get(self.BASE_URL, params=params, timeout=10)
+            self._get_rate_limiter().acquire()
+            base_url = current_app.config.get('IMAGE_SEARCH_BASE_URL') or self.BASE_URL
+            response = self._get_session().get(base_url, params=params, timeout=10)
             response.raise_for_status()
 
             data = response.json()
 
+            image_url = None
             if 'items' in data and len(data['items']) > 0:
                 image_url = data['items'][0].get('link')
-                logger.info(f"Found image for '{food_name}': {image_url}")
-                return image_url
 
-            logger.info(f"No image found for '{food_name}'")
-            return None
+            if image_url:
+                logger.info(f"Found image for '{food_name}': {image_url}")
+            else:
+                logger.info(f"No image found for '{food_name}'")
+
+            # Errors below are transient and are not cached; empty answers are
+            # cached for a shorter time so new results can still show up
+            if cache is not None:
+                cache.set(
+                    cache_key,
+                    image_url,
+                    ttl=None if image_url else current_app.config.get('IMAGE_SEARCH_NEGATIVE_TTL', 24 * 3600)
+                )
+            return image_url
 
         except requests.exceptions.RequestException as e:
             logger.error(f"Error searching for image: {e}")
@@ -77,6 +169,39 @@ class ImageSearchService:
             logger.error(f"Unexpected error in image search: {e}")
             return None
 
+    def iter_food_images(self, food_names: list, cuisine_type: str = None) -> Iterator[tuple[str, str | None]]:
+        """
+        Search for multiple food images concurrently, yielding as lookups finish
+
+        Lookups run on a bounded thread pool and API calls share the service
+        rate limiter. Closing the generator early cancels pending lookups.
+
+        Args:
+            food_names: List of food/recipe names
+            cuisine_type: Optional cuisine type
+
+        Yields:
+            (food_name, image_url or None) tuples in completion order
+        """
+        names = list(dict.fromkeys(food_names))
+        if not names:
+            return
+
+        app = current_app._get_current_object()
+        max_workers = min(app.config.get('IMAGE_SEARCH_MAX_WORKERS', 4), len(names))
+
+        def lookup(name):
+            with app.app_context():
+                return self.search_food_image(name, cuisine_type)
+
+        executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='image-search')
+        try:
+            futures = {executor.submit(lookup, name): name for name in names}
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
     def search_multiple_food_images(self, food_names: list, cuisine_type: str = None) -> dict:
         """
         Search for multiple food images
@@ -88,12 +213,11 @@ class ImageSearchService:
         Returns:
             Dictionary mapping food names to image URLs
         """
-        results = {}
-        for name in food_names:
-            image_url = self.search_food_image(name, cuisine_type)
-            if image_url:
-                results[name] = image_url
-        return results
+        return {
+            name: image_url
+            for name, image_url in self.iter_food_images(food_names, cuisine_type)
+            if image_url
+        }
 
 
 # Singleton instance
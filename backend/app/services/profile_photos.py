@@ -0,0 +1,98 @@
+"""
+Profile photo processing
+Uploads are re-encoded into a few square WebP sizes and stored by the SHA-256
+of the upload, so every stored file can be served as immutable
+"""
+
+import logging
+import os
+import re
+import shutil
+
+from flask import current_app
+
+from app.utils.images import ContentStore, content_hash, encode_resized, open_image
+
+logger = logging.getLogger(__name__)
+
+# Size name -> square edge in pixels
+PROFILE_PHOTO_SIZES = {'sm': 64, 'md': 256, 'lg': 512}
+DEFAULT_PHOTO_SIZE = 'md'
+
+_DIGEST_RE = re.compile(r'^[0-9a-f]{64}$')
+
+
+def is_photo_digest(value: str) -> bool:
+    """True if a User.profile_photo value is a content hash (not a legacy file path)"""
+    return bool(value) and bool(_DIGEST_RE.match(value))
+
+
+def photo_url(digest: str, size: str = DEFAULT_PHOTO_SIZE) -> str:
+    return f'/api/users/profile/photo/{digest}/{size}'
+
+
+class ProfilePhotoService:
+    """Resizes, stores and locates content-addressed profile photos"""
+
+    def _get_store(self) -> ContentStore:
+        return ContentStore(current_app.config['PROFILE_PHOTO_DIR'])
+
+    @staticmethod
+    def _name(size: str) -> str:
+        return f'{size}.webp'
+
+    def save(self, data: bytes) -> str:
+        """
+        Re-encode an upload into every profile photo size
+
+        Args:
+            data: Raw uploaded image bytes
+
+        Returns:
+            Content hash identifying the stored photo
+
+        Raises:
+            ValueError: If the upload is not a decodable image
+        """
+        digest = content_hash(data)
+        store = self._get_store()
+        missing = [size for size in PROFILE_PHOTO_SIZES if not store.exists(digest, self._name(size))]
+        if not missing:
+            return digest
+
+        image = open_image(data)
+        # Center-crop to a square before scaling so every size is an avatar
+        edge = min(image.width, image.height)
+        left = (image.width - edge) // 2
+        top = (image.height - edge) // 2
+        image = image.crop((left, top, left + edge, top + edge))
+
+        quality = current_app.config.get('PROFILE_PHOTO_QUALITY', 82)
+        for size in missing:
+            store.write(digest, self._name(size), encode_resized(image, PROFILE_PHOTO_SIZES[size], 'WEBP', quality))
+        return digest
+
+    def path_for(self, digest: str, size: str) -> str | None:
+        """Path of a stored size, or None if it doesn't exist"""
+        if not is_photo_digest(digest) or size not in PROFILE_PHOTO_SIZES:
+            return None
+        store = self._get_store()
+        if not store.exists(digest, self._name(size)):
+            return None
+        return store.path_for(digest, self._name(size))
+
+    def delete(self, digest: str):
+        """Remove every stored size of a photo"""
+        if not is_photo_digest(digest):
+            return
+        directory = os.path.dirname(self._get_store().path_for(digest, self._name(DEFAULT_PHOTO_SIZE)))
+        try:
+            shutil.rmtree(directory)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"Could not delete profile photo {digest}: {e}")
+
+
+# Singleton instance
+profile_photo_service = ProfilePhotoService()
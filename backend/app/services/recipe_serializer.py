@@ -0,0 +1,203 @@
+"""
+Batch-loading serializers for recipes, recipe ingredients and meal plans
+Loads all ingredient lines for a list of recipes in one query and builds
+response dicts with precompiled field extractors (no per-row lazy loads)
+"""
+
+from collections import defaultdict
+from operator import attrgetter
+from typing import Dict, Iterable, List
+
+from app import db
+from app.models import Recipe, RecipeIngredient, Ingredient
+
+# Precompiled extractors for flat Recipe columns
+_recipe_values = attrgetter(
+    'id', 'name', 'description', 'cuisine_type', 'meal_type', 'difficulty_level',
+    'prep_time', 'cook_time', 'total_time', 'servings', 'instructions',
+    'calories', 'protein', 'carbohydrates', 'fat', 'fiber',
+    'is_vegetarian', 'is_vegan', 'is_gluten_free', 'is_dairy_free',
+    'image_url', 'video_url', 'rating', 'rating_count', 'view_count', 'created_at'
+)
+
+_meal_plan_values = attrgetter(
+    'id', 'user_id', 'planned_date', 'meal_type', 'is_completed',
+    'completed_at', 'user_rating', 'user_notes', 'created_at'
+)
+
+# Columns selected for ingredient lines, in the order they are unpacked below
+_LINE_COLUMNS = (
+    RecipeIngredient.recipe_id,
+    RecipeIngredient.id,
+    RecipeIngredient.ingredient_id,
+    RecipeIngredient.quantity,
+    RecipeIngredient.unit,
+    RecipeIngredient.preparation,
+    RecipeIngredient.is_optional,
+    Ingredient.id,
+    Ingredient.name,
+    Ingredient.category,
+    Ingredient.calories,
+    Ingredient.protein,
+    Ingredient.carbohydrates,
+    Ingredient.fat,
+    Ingredient.fiber,
+    Ingredient.common_unit,
+    Ingredient.image_url,
+)
+
+
+def load_ingredient_lines(recipe_ids: Iterable[int]) -> Dict[int, List[Dict]]:
+    """
+    Load and serialize the ingredient lines of many recipes with one query
+
+    Args:
+        recipe_ids: Recipe IDs to load lines for
+
+    Returns:
+        Dict of recipe_id -> list of serialized lines (RecipeIngredient.to_dict shape)
+    """
+    recipe_ids = set(recipe_ids)
+    lines = defaultdict(list)
+    if not recipe_ids:
+        return lines
+
+    rows = db.session.query(*_LINE_COLUMNS).outerjoin(
+        Ingredient, Ingredient.id == RecipeIngredient.ingredient_id
+    ).filter(
+        RecipeIngredient.recipe_id.in_(recipe_ids)
+    ).order_by(RecipeIngredient.recipe_id, RecipeIngredient.id).all()
+
+    for (recipe_id, line_id, ingredient_id, quantity, unit, preparation, is_optional,
+         ing_id, ing_name, category, calories, protein, carbohydrates, fat, fiber,
+         common_unit, image_url) in rows:
+        ingredient = None
+        if ing_id is not None:
+            ingredient = {
+                'id': ing_id,
+                'name': ing_name,
+                'category': category,
+                'nutrition': {
+                    'calories': calories,
+                    'protein': protein,
+                    'carbohydrates': carbohydrates,
+                    'fat': fat,
+                    'fiber': fiber
+                },
+                'common_unit': common_unit,
+                'image_url': image_url
+            }
+        lines[recipe_id].append({
+            'id': line_id,
+            'ingredient_id': ingredient_id,
+            'ingredient_name': ing_name,
+            'ingredient': ingredient,
+            'quantity': quantity,
+            'unit': unit,
+            'preparation': preparation,
+            'is_optional': is_optional
+        })
+
+    return lines
+
+
+def _recipe_dict(recipe: Recipe) -> Dict:
+    (recipe_id, name, description, cuisine_type, meal_type, difficulty_level,
+     prep_time, cook_time, total_time, servings, instructions,
+     calories, protein, carbohydrates, fat, fiber,
+     is_vegetarian, is_vegan, is_gluten_free, is_dairy_free,
+     image_url, video_url, rating, rating_count, view_count, created_at) = _recipe_values(recipe)
+
+    return {
+        'id': recipe_id,
+        'name': name,
+        'description': description,
+        'cuisine_type': cuisine_type,
+        'meal_type': meal_type,
+        'difficulty_level': difficulty_level,
+        'time': {
+            'prep_time': prep_time,
+            'cook_time': cook_time,
+            'total_time': total_time
+        },
+        'servings': servings,
+        'instructions': instructions,
+        'nutrition': {
+            'calories': calories,
+            'protein': protein,
+            'carbohydrates': carbohydrates,
+            'fat': fat,
+            'fiber': fiber
+        },
+        'dietary': {
+            'is_vegetarian': is_vegetarian,
+            'is_vegan': is_vegan,
+            'is_gluten_free': is_gluten_free,
+            'is_dairy_free': is_dairy_free
+        },
+        'image_url': image_url,
+        'video_url': video_url,
+        'rating': rating,
+        'rating_count': rating_count,
+        'view_count': view_count,
+        'created_at': created_at.isoformat() if created_at else None
+    }
+
+
+def serialize_recipes(recipes: List[Recipe], include_ingredients: bool = True,
+                      lines: Dict[int, List[Dict]] = None) -> List[Dict]:
+    """
+    Serialize recipes, batch-loading ingredient lines for all of them
+
+    Args:
+        recipes: Recipe objects
+        include_ingredients: Whether to embed ingredient lines
+        lines: Preloaded output of load_ingredient_lines (loaded if omitted)
+
+    Returns:
+        List of recipe dicts in the same order as recipes
+    """
+    if not include_ingredients:
+        return [_recipe_dict(recipe) for recipe in recipes]
+
+    if lines is None:
+        lines = load_ingredient_lines(recipe.id for recipe in recipes)
+
+    results = []
+    for recipe in recipes:
+        data = _recipe_dict(recipe)
+        data['ingredients'] = lines.get(recipe.id, [])
+        results.append(data)
+    return results
+
+
+def serialize_recipe(recipe: Recipe, include_ingredients: bool = True) -> Dict:
+    """Serialize a single recipe"""
+    return serialize_recipes([recipe], include_ingredients=include_ingredients)[0]
+
+
+def serialize_meal_plans(meal_plans: List) -> List[Dict]:
+    """
+    Serialize meal plans with their recipes (without ingredients)
+
+    Recipes should be eager-loaded (e.g. joinedload(MealPlan.recipe)) to
+    avoid one query per meal plan.
+    """
+    results = []
+    for meal_plan in meal_plans:
+        (plan_id, user_id, planned_date, meal_type, is_completed,
+         completed_at, user_rating, user_notes, created_at) = _meal_plan_values(meal_plan)
+        recipe = meal_plan.recipe
+        results.append({
+            'id': plan_id,
+            'user_id': user_id,
+            'recipe': _recipe_dict(recipe) if recipe else None,
+            'planned_date': planned_date.isoformat(),
+            'meal_type': meal_type,
+            'is_completed': is_completed,
+            'completed_at': completed_at.isoformat() if completed_at else None,
+            'user_rating': user_rating,
+            'user_notes': user_notes,
+            'created_at': created_at.isoformat()
+        })
+    return results
@@ -0,0 +1,162 @@
+"""
+Recipe image thumbnails
+Downloads a recipe's image once, renders WebP thumbnails at fixed widths and
+stores them content-addressed on disk so they can be cached aggressively
+"""
+
+import logging
+import os
+import threading
+import zlib
+from urllib.parse import urljoin
+
+import requests
+from flask import current_app
+
+from app.utils.disk_cache import DiskCache, MISSING
+from app.utils.images import ContentStore, content_hash, encode_resized, open_image
+from app.utils.urls import PublicHTTPAdapter, UnsafeURL, check_public_url
+
+logger = logging.getLogger(__name__)
+
+
+class ThumbnailError(Exception):
+    """Raised when a source image cannot be downloaded or decoded"""
+
+
+class ThumbnailService:
+    """Generates and locates WebP thumbnails for remote recipe images"""
+
+    def __init__(self):
+        self._session = None
+        self._sources = None
+        self._lock = threading.Lock()
+        # Striped locks so concurrent requests for one image download it once
+        self._url_locks = [threading.Lock() for _ in range(32)]
+
+    @property
+    def widths(self) -> list:
+        return sorted(current_app.config.get('THUMBNAIL_WIDTHS', [120, 240, 480]))
+
+    def pick_width(self, requested: int = None) -> int:
+        """Snap a requested width to the smallest fixed width that covers it"""
+        widths = self.widths
+        if requested is None:
+            return widths[0]
+        for width in widths:
+            if width >= requested:
+                return width
+        return widths[-1]
+
+    def _get_session(self) -> requests.Session:
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    session = requests.Session()
+                    # Connect only to the public address that was checked
+                    adapter = PublicHTTPAdapter()
+                    session.mount('http://', adapter)
+                    session.mount('https://', adapter)
+                    self._session = session
+        return self._session
+
+    def _get_store(self) -> ContentStore:
+        return ContentStore(current_app.config.get('THUMBNAIL_DIR', 'instance/thumbnails'))
+
+    def _get_sources(self) -> DiskCache:
+        """Maps image URL -> content hash of the downloaded source"""
+        path = os.path.join(current_app.config.get('THUMBNAIL_DIR', 'instance/thumbnails'), 'sources.sqlite')
+        if self._sources is None or self._sources.path != path:
+            with self._lock:
+                if self._sources is None or self._sources.path != path:
+                    self._sources = DiskCache(path, table='thumbnail_sources')
+        return self._sources
+
+    @staticmethod
+    def _name(width: int) -> str:
+        return f'{width}.webp'
+
+    def _open(self, image_url: str) -> requests.Response:
+        """
+        Request the source image, following redirects by hand so every hop
+        is checked against private and internal addresses
+        """
+        allowed_hosts = current_app.config.get('THUMBNAIL_ALLOWED_HOSTS') or None
+        url = image_url
+        for _ in range(current_app.config.get('THUMBNAIL_MAX_REDIRECTS', 3) + 1):
+            try:
+                check_public_url(url, allowed_hosts)
+            except UnsafeURL as e:
+                raise ThumbnailError(f'Refusing to fetch {url}: {e}') from e
+            response = self._get_session().get(url, stream=True, timeout=10, allow_redirects=False)
+            if not response.is_redirect:
+                return response
+            response.close()
+            url = urljoin(url, response.headers['Location'])
+        raise ThumbnailError(f'Too many redirects for {image_url}')
+
+    def _download(self, image_url: str) -> bytes:
+        """Fetch the source image, refusing anything over the configured size"""
+        max_bytes = current_app.config.get('THUMBNAIL_MAX_SOURCE_BYTES', 10 * 1024 * 1024)
+        try:
+            response = self._open(image_url)
+            response.raise_for_status()
+            chunks, size = [], 0
+            for chunk in response.iter_content(64 * 1024):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise ThumbnailError(f'Source image exceeds {max_bytes} bytes')
+                chunks.append(chunk)
+            return b''.join(chunks)
+        except requests.exceptions.RequestException as e:
+            raise ThumbnailError(f'Could not download image: {e}') from e
+
+    def _render(self, image_url: str) -> str:
+        """Download the source and write every thumbnail width. Returns the digest."""
+        data = self._download(image_url)
+        digest = content_hash(data)
+        store = self._get_store()
+
+        missing = [w for w in self.widths if not store.exists(digest, self._name(w))]
+        if missing:
+            try:
+                image = open_image(data)
+            except ValueError as e:
+                raise ThumbnailError(str(e)) from e
+            quality = current_app.config.get('THUMBNAIL_QUALITY', 80)
+            for width in missing:
+                store.write(digest, self._name(width), encode_resized(image, width, 'WEBP', quality))
+            logger.info(f"Rendered {len(missing)} thumbnails for {image_url}")
+        return digest
+
+    def get_thumbnail(self, image_url: str, width: int) -> tuple[str, str]:
+        """
+        Get the on-disk thumbnail for an image URL, generating it on first use
+
+        Args:
+            image_url: Remote source image
+            width: One of the fixed thumbnail widths
+
+        Returns:
+            (file path, etag) of the thumbnail
+
+        Raises:
+            ThumbnailError: If the source cannot be downloaded or decoded
+        """
+        store = self._get_store()
+        sources = self._get_sources()
+        name = self._name(width)
+
+        digest = sources.get(image_url)
+        if digest is MISSING or not store.exists(digest, name):
+            with self._url_locks[zlib.crc32(image_url.encode()) % len(self._url_locks)]:
+                digest = sources.get(image_url)
+                if digest is MISSING or not store.exists(digest, name):
+                    digest = self._render(image_url)
+                    sources.set(image_url, digest)
+
+        return store.path_for(digest, name), f'{digest}-{width}'
+
+
+# Singleton instance
+thumbnail_service = ThumbnailService()
@@ -0,0 +1,174 @@
+"""
+Buffered counting of unmapped Vision labels
+Detections add to an in-process buffer; the buffer is written to the
+unmapped_labels table with one batched upsert once it holds enough labels
+or has been waiting too long, so detection never does a write per label
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Iterable, Tuple
+
+from app import db
+from app.utils.upsert import dialect_insert
+
+logger = logging.getLogger(__name__)
+
+MAX_LABEL_LENGTH = 100
+
+
+class UnmappedLabelCounter:
+    """Thread-safe buffer of unmapped label counts, flushed in batches"""
+
+    def __init__(self, flush_size: int = 200, flush_interval: float = 60.0):
+        """
+        Args:
+            flush_size: Buffered label occurrences that trigger a flush
+            flush_interval: Seconds after which a non-empty buffer is flushed
+        """
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self._buffer = {}  # label -> [count, score_sum, first_seen, last_seen]
+        self._pending = 0
+        self._oldest = None
+        self._lock = threading.Lock()
+
+    def configure(self, flush_size: int = None, flush_interval: float = None):
+        if flush_size is not None:
+            self.flush_size = flush_size
+        if flush_interval is not None:
+            self.flush_interval = flush_interval
+
+    def add(self, labels: Iterable[Tuple[str, float]]):
+        """
+        Count the unmapped labels of one detected image, flushing if due
+
+        Must be called inside an app context when a flush may be triggered.
+
+        Args:
+            labels: (label, score) pairs; a label is counted once per call
+        """
+        now = datetime.utcnow()
+        with self._lock:
+            seen = set()
+            for label, score in labels:
+                label = label.lower().strip()[:MAX_LABEL_LENGTH]
+                if not label or label in seen:
+                    continue
+                seen.add(label)
+                entry = self._buffer.get(label)
+                if entry is None:
+                    self._buffer[label] = [1, score or 0.0, now, now]
+                else:
+                    entry[0] += 1
+                    entry[1] += score or 0.0
+                    entry[3] = now
+                self._pending += 1
+            if not self._pending:
+                return
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+            due = self._pending >= self.flush_size or time.monotonic() - self._oldest >= self.flush_interval
+
+        if due:
+            self.flush()
+
+    def _take(self) -> Dict:
+        with self._lock:
+            buffer, self._buffer = self._buffer, {}
+            self._pending = 0
+            self._oldest = None
+        return buffer
+
+    def _restore(self, buffer: Dict):
+        """Merge counts back after a failed flush so they are retried"""
+        with self._lock:
+            for label, (count, score_sum, first_seen, last_seen) in buffer.items():
+                entry = self._buffer.get(label)
+                if entry is None:
+                    self._buffer[label] = [count, score_sum, first_seen, last_seen]
+                else:
+                    entry[0] += count
+                    entry[1] += score_sum
+                    entry[2] = min(entry[2], first_seen)
+                    entry[3] = max(entry[3], last_seen)
+                self._pending += count
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+
+    def flush(self) -> int:
+        """
+        Write buffered counts with one batched upsert
+
+        Returns:
+            Number of distinct labels written
+        """
+        buffer = self._take()
+        if not buffer:
+            return 0
+
+        from app.models import UnmappedLabel
+
+        rows = [
+            {
+                'label': label,
+                'occurrence_count': count,
+                'score_sum': score_sum,
+                'first_seen_at': first_seen,
+                'last_seen_at': last_seen
+            }
+            for label, (count, score_sum, first_seen, last_seen) in sorted(buffer.items())
+        ]
+        try:
+            insert = dialect_insert(db.session.get_bind())
+            if insert is not None:
+                table = UnmappedLabel.__table__
+                stmt = insert(table)
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[table.c.label],
+                    set_={
+                        'occurrence_count': table.c.occurrence_count + stmt.excluded.occurrence_count,
+                        'score_sum': table.c.score_sum + stmt.excluded.score_sum,
+                        'last_seen_at': stmt.excluded.last_seen_at
+                    }
+                )
+                db.session.execute(stmt, rows)
+            else:
+                self._merge_rows(UnmappedLabel, rows)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logger.warning(f"Could not flush unmapped label counts: {e}")
+            self._restore(buffer)
+            return 0
+        return len(rows)
+
+    @staticmethod
+    def _merge_rows(model, rows):
+        """Read-modify-write fallback for databases without ON CONFLICT"""
+        existing = {
+            row.label: row
+            for row in model.query.filter(model.label.in_([r['label'] for r in rows])).with_for_update()
+        }
+        for r in rows:
+            row = existing.get(r['label'])
+            if row is None:
+                db.session.add(model(**r))
+            else:
+                row.occurrence_count += r['occurrence_count']
+                row.score_sum += r['score_sum']
+                row.last_seen_at = r['last_seen_at']
+
+    def clear(self):
+        """Drop buffered counts without writing them"""
+        self._take()
+
+    def __len__(self):
+        with self._lock:
+            return self._pending
+
+
+# Singleton instance
+unmapped_label_counter = UnmappedLabelCounter()
@@ -0,0 +1,65 @@
+"""
+BK-tree for nearest-neighbour search in a discrete metric space
+(e.g. Hamming distance between perceptual hashes)
+"""
+
+from typing import Any, Callable, List, Tuple
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """Number of differing bits between two integer hashes"""
+    return bin(a ^ b).count('1')
+
+
+class BKTree:
+    """
+    Burkhard-Keller tree: each child edge is labelled with its distance to the
+    parent, so a radius query only descends into edges within
+    [d - radius, d + radius] by the triangle inequality
+    """
+
+    def __init__(self, distance: Callable[[Any, Any], int] = hamming_distance):
+        self.distance = distance
+        self._root = None
+        self._size = 0
+
+    def add(self, key, value=None):
+        """Insert key with an attached value (duplicate keys are kept)"""
+        node = [key, value, {}]
+        self._size += 1
+        if self._root is None:
+            self._root = node
+            return
+        current = self._root
+        while True:
+            d = self.distance(key, current[0])
+            child = current[2].get(d)
+            if child is None:
+                current[2][d] = node
+                return
+            current = child
+
+    def search(self, key, radius: int) -> List[Tuple[int, Any, Any]]:
+        """
+        All entries within `radius` of key
+
+        Returns:
+            (distance, key, value) tuples sorted by distance
+        """
+        if self._root is None:
+            return []
+        results = []
+        stack = [self._root]
+        while stack:
+            node_key, value, children = stack.pop()
+            d = self.distance(key, node_key)
+            if d <= radius:
+                results.append((d, node_key, value))
+            for edge, child in children.items():
+                if d - radius <= edge <= d + radius:
+                    stack.append(child)
+        results.sort(key=lambda item: item[0])
+        return results
+
+    def __len__(self):
+        return self._size
@@ -0,0 +1,95 @@
+"""
+Response compression for large API responses
+Compresses JSON/text responses above a size threshold with brotli (when
+installed) or gzip, based on the client's Accept-Encoding header
+"""
+
+import gzip
+
+from flask import request
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+COMPRESSIBLE_MIMETYPES = {
+    'application/json',
+    'text/html',
+    'text/plain',
+    'text/css',
+    'text/csv',
+    'application/javascript',
+}
+
+
+def _choose_encoding():
+    """Pick the best encoding the client accepts (brotli preferred)"""
+    accepted = request.accept_encodings
+    if BROTLI_AVAILABLE and accepted.quality('br') > 0:
+        return 'br'
+    if accepted.quality('gzip') > 0:
+        return 'gzip'
+    return None
+
+
+def compress_response(response, min_size=1024, gzip_level=6, brotli_quality=4):
+    """
+    Compress a response body in place if it qualifies
+
+    Args:
+        response: Flask response object
+        min_size: Minimum body size in bytes worth compressing
+        gzip_level: gzip compression level (1-9)
+        brotli_quality: brotli quality (0-11)
+
+    Returns:
+        The (possibly compressed) response
+    """
+    if (response.direct_passthrough or response.is_streamed or
+            not 200 <= response.status_code < 300 or
+            response.mimetype not in COMPRESSIBLE_MIMETYPES or
+            'Content-Encoding' in response.headers):
+        return response
+
+    response.vary.add('Accept-Encoding')
+
+    if response.content_length is not None and response.content_length < min_size:
+        return response
+
+    encoding = _choose_encoding()
+    if encoding is None:
+        return response
+
+    body = response.get_data()
+    if len(body) < min_size:
+        return response
+
+    if encoding == 'br':
+        compressed = brotli.compress(body, quality=brotli_quality)
+    else:
+        compressed = gzip.compress(body, compresslevel=gzip_level)
+
+    response.set_data(compressed)
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+
+def init_compression(app):
+    """Register the compression after_request hook"""
+    if not app.config.get('COMPRESS_ENABLED', True):
+        return
+
+    min_size = app.config.get('COMPRESS_MIN_SIZE', 1024)
+    gzip_level = app.config.get('COMPRESS_LEVEL', 6)
+    brotli_quality = app.config.get('COMPRESS_BROTLI_QUALITY', 4)
+
+    @app.after_request
+    def _compress(response):
+        return compress_response(
+            response,
+            min_size=min_size,
+            gzip_level=gzip_level,
+            brotli_quality=brotli_quality
+        )
@@ -0,0 +1,85 @@
+"""
+Persistent key/value cache stored in a local SQLite file
+Entries survive restarts and are shared by every worker process on the host
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# Returned by DiskCache.get when a key is absent or expired, so that a cached
+# None can be told apart from a miss
+MISSING = object()
+
+
+class DiskCache:
+    """JSON values in a SQLite table with per-entry expiry"""
+
+    def __init__(self, path: str, ttl: float = None, table: str = 'cache'):
+        """
+        Args:
+            path: SQLite file path (parent directories are created)
+            ttl: Default time-to-live in seconds (None keeps entries forever)
+            table: Table name, so several caches can share one file
+        """
+        self.path = path
+        self.ttl = ttl
+        self.table = table
+        self._local = threading.local()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._connect().execute(
+            f'CREATE TABLE IF NOT EXISTS {self.table} ('
+            'key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL)'
+        )
+
+    def _connect(self):
+        """One connection per thread; sqlite3 connections are not shareable"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str, default=MISSING):
+        """Return the cached value for key, or default if absent or expired"""
+        row = self._connect().execute(
+            f'SELECT value, expires_at FROM {self.table} WHERE key = ?', (key,)
+        ).fetchone()
+        if row is None:
+            return default
+        value, expires_at = row
+        if expires_at is not None and expires_at < time.time():
+            self.delete(key)
+            return default
+        return json.loads(value)
+
+    def set(self, key: str, value, ttl: float = None):
+        """Store a JSON-serializable value, overriding the default TTL if given"""
+        ttl = ttl if ttl is not None else self.ttl
+        expires_at = time.time() + ttl if ttl else None
+        self._connect().execute(
+            f'INSERT OR REPLACE INTO {self.table} (key, value, expires_at) VALUES (?, ?, ?)',
+            (key, json.dumps(value), expires_at)
+        )
+
+    def delete(self, key: str):
+        self._connect().execute(f'DELETE FROM {self.table} WHERE key = ?', (key,))
+
+    def purge_expired(self) -> int:
+        """Delete expired entries and return how many were removed"""
+        cursor = self._connect().execute(
+            f'DELETE FROM {self.table} WHERE expires_at IS NOT NULL AND expires_at < ?', (time.time(),)
+        )
+        return cursor.rowcount
+
+    def clear(self):
+        self._connect().execute(f'DELETE FROM {self.table}')
+
+    def __len__(self):
+        return self._connect().execute(f'SELECT COUNT(*) FROM {self.table}').fetchone()[0]
@@ -0,0 +1,93 @@
+"""
+Image resizing helpers and content-addressed file storage
+Pillow is optional; callers should check PIL_AVAILABLE before resizing
+"""
+
+import hashlib
+import io
+import os
+import tempfile
+
+try:
+    from PIL import Image, ImageOps
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+
+def content_hash(data: bytes) -> str:
+    """SHA-256 hex digest used as the content address"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def open_image(data: bytes):
+    """
+    Decode image bytes and apply the EXIF orientation
+
+    Raises:
+        ValueError: If the bytes are not a decodable image
+    """
+    try:
+        image = Image.open(io.BytesIO(data))
+        image.load()
+    except Exception as e:
+        raise ValueError(f'Invalid image: {e}') from e
+    return ImageOps.exif_transpose(image)
+
+
+def encode_resized(image, width: int, fmt: str = 'WEBP', quality: int = 80) -> bytes:
+    """
+    Scale an image down to `width` (never up) and re-encode it
+
+    Metadata (EXIF, ICC) is not carried over to the output.
+
+    Args:
+        image: PIL image (already orientation-corrected)
+        width: Target width in pixels
+        fmt: Pillow format name
+        quality: Encoder quality
+
+    Returns:
+        Encoded image bytes
+    """
+    if image.width > width:
+        height = max(1, round(image.height * width / image.width))
+        image = image.resize((width, height), Image.LANCZOS)
+
+    if fmt == 'JPEG' and image.mode != 'RGB':
+        image = image.convert('RGB')
+    elif image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'A' in image.getbands() else 'RGB')
+
+    out = io.BytesIO()
+    image.save(out, format=fmt, quality=quality)
+    return out.getvalue()
+
+
+class ContentStore:
+    """Files stored under <root>/<digest[:2]>/<digest>/<name>"""
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def path_for(self, digest: str, name: str) -> str:
+        return os.path.join(self.root, digest[:2], digest, name)
+
+    def exists(self, digest: str, name: str) -> bool:
+        return os.path.exists(self.path_for(digest, name))
+
+    def write(self, digest: str, name: str, data: bytes) -> str:
+        """Write a file atomically so readers never see partial content"""
+        path = self.path_for(digest, name)
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        return path
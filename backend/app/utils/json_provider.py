@@ -0,0 +1,53 @@
+"""
+Fast JSON provider for Flask backed by orjson
+Falls back to Flask's default provider when orjson is not installed
+"""
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+class ORJSONProvider(DefaultJSONProvider):
+    """
+    JSON provider that serializes with orjson.
+
+    Calls that pass json-module options (indent, sort_keys, ...) are
+    delegated to the default provider so behaviour stays compatible.
+    Unsupported types go through the default provider's hook (dates,
+    decimals, UUIDs, dataclasses).
+    """
+
+    option = orjson.OPT_NON_STR_KEYS if ORJSON_AVAILABLE else 0
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self.option).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        option = self.option | orjson.OPT_APPEND_NEWLINE
+
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            option |= orjson.OPT_INDENT_2
+
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=option),
+            mimetype=self.mimetype
+        )
+
+
+def init_json_provider(app):
+    """Install the orjson provider on the app when orjson is available"""
+    if ORJSON_AVAILABLE:
+        app.json = ORJSONProvider(app)
@@ -0,0 +1,56 @@
+"""
+Thread-safe token bucket rate limiter
+"""
+
+import threading
+import time
+
+
+class RateLimiter:
+    """Allow at most `rate` acquisitions per `per` seconds, with bursts up to `burst`"""
+
+    def __init__(self, rate: float, per: float = 1.0, burst: int = 1):
+        """
+        Args:
+            rate: Number of calls allowed per period
+            per: Period length in seconds
+            burst: Calls that may run back to back before throttling kicks in
+        """
+        if rate <= 0 or per <= 0:
+            raise ValueError('rate and per must be positive')
+        self.interval = per / rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        elapsed = now - self._updated
+        self._tokens = min(self.burst, self._tokens + elapsed / self.interval)
+        self._updated = now
+
+    def acquire(self, timeout: float = None) -> bool:
+        """
+        Block until a call is allowed
+
+        Args:
+            timeout: Maximum seconds to wait (None waits indefinitely)
+
+        Returns:
+            True if acquired, False if the timeout ran out first
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) * self.interval
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            time.sleep(wait)
@@ -0,0 +1,104 @@
+"""
+Size-bounded reading of uploaded files
+Werkzeug spools multipart files larger than 500KB to temporary files on disk;
+these helpers check the size before pulling an upload into memory and read it
+into a single bytes object that hashing, decoding and the Vision request can
+all share without further copies. UploadRequest lets a view that takes
+several files raise the app-wide MAX_CONTENT_LENGTH for itself only
+"""
+
+import io
+
+from flask import Request, current_app
+
+CHUNK_SIZE = 1024 * 1024
+
+
+# Allowance for multipart boundaries, part headers and small form fields
+MULTIPART_OVERHEAD = 1024 * 1024
+
+
+class UploadTooLarge(ValueError):
+    """Raised when an upload exceeds the allowed size"""
+
+    def __init__(self, max_size: int):
+        super().__init__(f'Upload exceeds {max_size} bytes')
+        self.max_size = max_size
+
+
+def _remaining_size(stream):
+    """Bytes left in a seekable stream, or None if it can't be measured"""
+    try:
+        position = stream.tell()
+        end = stream.seek(0, io.SEEK_END)
+        stream.seek(position)
+    except (AttributeError, OSError, ValueError):
+        return None
+    return end - position
+
+
+def read_upload(file, max_size: int, chunk_size: int = CHUNK_SIZE) -> bytes:
+    """
+    Read an uploaded file, aborting as soon as it is known to exceed max_size
+
+    Args:
+        file: Werkzeug FileStorage (or any binary file object)
+        max_size: Largest accepted size in bytes
+        chunk_size: Read size for streams whose length is unknown
+
+    Returns:
+        The file contents
+
+    Raises:
+        UploadTooLarge: If the upload is larger than max_size
+    """
+    stream = getattr(file, 'stream', file)
+
+    size = _remaining_size(stream)
+    if size is not None:
+        if size > max_size:
+            raise UploadTooLarge(max_size)
+        return stream.read(size)
+
+    # Unknown length: read in chunks, stopping one chunk past the limit
+    chunks = []
+    total = 0
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        total += len(chunk)
+        if total > max_size:
+            raise UploadTooLarge(max_size)
+        chunks.append(chunk)
+    return chunks[0] if len(chunks) == 1 else b''.join(chunks)
+
+
+def max_content_length(limit):
+    """
+    Decorator raising the request body limit for a single view
+
+    Args:
+        limit: Largest accepted body in bytes, or a callable taking the app
+            config and returning it. The app-wide MAX_CONTENT_LENGTH still
+            applies if it is larger.
+    """
+    def decorator(view):
+        view.max_content_length = limit
+        return view
+    return decorator
+
+
+class UploadRequest(Request):
+    """Request whose body limit honours @max_content_length on the matched view"""
+
+    @property
+    def max_content_length(self):
+        default = super().max_content_length
+        view = current_app.view_functions.get(self.endpoint) if current_app else None
+        limit = getattr(view, 'max_content_length', None)
+        if limit is None:
+            return default
+        if callable(limit):
+            limit = limit(current_app.config)
+        return limit if default is None else max(limit, default)
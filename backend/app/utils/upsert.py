@@ -0,0 +1,27 @@
+"""
+Dialect-aware INSERT ... ON CONFLICT helpers
+PostgreSQL (production) and SQLite (tests, local) both support upserts, but
+through their own insert() constructs
+"""
+
+from typing import Callable, Optional
+
+
+def dialect_insert(bind) -> Optional[Callable]:
+    """
+    The insert() construct supporting on_conflict_do_update for a bind
+
+    Args:
+        bind: Engine or Connection (e.g. db.session.get_bind())
+
+    Returns:
+        The dialect's insert function, or None if it has no ON CONFLICT support
+    """
+    name = bind.dialect.name
+    if name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+        return insert
+    if name == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+        return insert
+    return None
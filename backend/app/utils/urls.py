@@ -0,0 +1,157 @@
+"""
+Checks for URLs the server fetches on a client's behalf
+Recipe image URLs are user-editable, so before downloading one the host is
+resolved and the request is refused unless every address is public;
+otherwise the server could be pointed at internal services or the cloud
+metadata endpoint. PublicHTTPAdapter repeats the check when it opens the
+socket and connects to the address it checked, so a host that re-resolves
+to an internal address after the first check (DNS rebinding) is refused
+"""
+
+import ipaddress
+import socket
+from typing import Iterable, List
+from urllib.parse import urlsplit
+
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+from urllib3.util import connection
+
+ALLOWED_SCHEMES = ('http', 'https')
+
+
+class UnsafeURL(ValueError):
+    """Raised when a URL must not be fetched by the server"""
+
+
+def _host_allowed(host: str, allowed_hosts: Iterable[str]) -> bool:
+    return any(host == allowed or host.endswith('.' + allowed) for allowed in allowed_hosts)
+
+
+def _resolve(host: str, port: int) -> list:
+    try:
+        return [ipaddress.ip_address(host)]
+    except ValueError:
+        pass
+    try:
+        infos = socket.getaddrinfo(host, port, proto=socket.IPPROTO_TCP)
+    except (socket.gaierror, UnicodeError) as e:
+        raise UnsafeURL(f'Could not resolve {host}') from e
+    # Strip IPv6 scope IDs (fe80::1%eth0) before parsing
+    return [ipaddress.ip_address(info[4][0].split('%')[0]) for info in infos]
+
+
+def is_public_address(address) -> bool:
+    """Whether an IP address is globally routable unicast"""
+    if isinstance(address, ipaddress.IPv6Address) and address.ipv4_mapped:
+        address = address.ipv4_mapped
+    return address.is_global and not address.is_multicast
+
+
+def public_addresses(host: str, port: int) -> List:
+    """
+    Resolve a host, refusing it unless every address is public
+
+    Raises:
+        UnsafeURL: If it cannot be resolved or any address is not public
+    """
+    addresses = _resolve(host.strip('[]'), port)
+    for address in addresses:
+        if not is_public_address(address):
+            raise UnsafeURL(f'Host {host} resolves to non-public address {address}')
+    return addresses
+
+
+def check_public_url(url: str, allowed_hosts: Iterable[str] = None) -> str:
+    """
+    Ensure a URL is safe for the server to fetch
+
+    Args:
+        url: URL to check
+        allowed_hosts: If given, only these hosts (and their subdomains)
+            are accepted
+
+    Returns:
+        The URL unchanged
+
+    Raises:
+        UnsafeURL: If the scheme is not http(s), the host is not allowed, or
+            it resolves to a private, loopback, link-local or other
+            non-public address
+    """
+    parts = urlsplit(url)
+    if parts.scheme not in ALLOWED_SCHEMES:
+        raise UnsafeURL(f'Scheme {parts.scheme!r} is not allowed')
+    host = (parts.hostname or '').lower()
+    if not host:
+        raise UnsafeURL('URL has no host')
+    if allowed_hosts and not _host_allowed(host, [h.lower() for h in allowed_hosts]):
+        raise UnsafeURL(f'Host {host} is not allowed')
+
+    try:
+        port = parts.port or (443 if parts.scheme == 'https' else 80)
+    except ValueError as e:
+        raise UnsafeURL('Invalid port') from e
+
+    public_addresses(host, port)
+    return url
+
+
+class _PublicAddressConnectionMixin:
+    """Resolves and checks the host itself, then connects to a checked address"""
+
+    def _new_conn(self):
+        try:
+            addresses = public_addresses(self._dns_host, self.port)
+        except UnsafeURL as e:
+            raise NewConnectionError(self, f'Refusing to connect: {e}') from e
+
+        error = None
+        for address in addresses:
+            try:
+                return connection.create_connection(
+                    (str(address), self.port),
+                    self.timeout,
+                    source_address=self.source_address,
+                    socket_options=self.socket_options,
+                )
+            except socket.timeout as e:
+                raise ConnectTimeoutError(
+                    self, f'Connection to {self.host} timed out. (connect timeout={self.timeout})'
+                ) from e
+            except OSError as e:
+                error = e
+        raise NewConnectionError(self, f'Failed to establish a new connection: {error}')
+
+
+class _PublicHTTPConnection(_PublicAddressConnectionMixin, HTTPConnection):
+    pass
+
+
+class _PublicHTTPSConnection(_PublicAddressConnectionMixin, HTTPSConnection):
+    pass
+
+
+class _PublicHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _PublicHTTPConnection
+
+
+class _PublicHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _PublicHTTPSConnection
+
+
+class PublicHTTPAdapter(HTTPAdapter):
+    """
+    requests adapter that only opens sockets to public addresses. TLS
+    (SNI and certificate checks) still uses the hostname from the URL.
+    Mount it on a session for both http:// and https://.
+    """
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': _PublicHTTPConnectionPool,
+            'https': _PublicHTTPSConnectionPool
+        }
@@ -21,18 +21,97 @@ class Config:
     # 24 hours for development
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=int(os.getenv('JWT_ACCESS_TOKEN_EXPIRES', 24)))
 
-    # File Upload
+    # File Upload (POST /api/ingredients/detect/batch raises this to fit a full batch)
     MAX_CONTENT_LENGTH = int(os.getenv('MAX_CONTENT_LENGTH', 16 * 1024 * 1024))
     UPLOAD_FOLDER = os.getenv('UPLOAD_FOLDER', 'uploads/')
+    PROFILE_PHOTO_DIR = os.getenv(
+        'PROFILE_PHOTO_DIR',
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), 'uploads', 'profile_photos')
+    )
+    PROFILE_PHOTO_QUALITY = int(os.getenv('PROFILE_PHOTO_QUALITY', 82))
     ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg'}
 
+    # Response compression (gzip, or brotli when installed)
+    COMPRESS_ENABLED = os.getenv('COMPRESS_ENABLED', 'true').lower() == 'true'
+    COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', 1024))  # bytes
+    COMPRESS_LEVEL = int(os.getenv('COMPRESS_LEVEL', 6))
+    COMPRESS_BROTLI_QUALITY = int(os.getenv('COMPRESS_BROTLI_QUALITY', 4))
+
+    # Recipe catalog caching
+    SEARCH_CACHE_SIZE = int(os.getenv('SEARCH_CACHE_SIZE', 512))
+    SEARCH_CACHE_TTL = int(os.getenv('SEARCH_CACHE_TTL', 300))  # seconds
+    FACETS_CACHE_SIZE = int(os.getenv('FACETS_CACHE_SIZE', 128))
+
+    # Background recipe image fetch jobs
+    IMAGE_FETCH_MAX_WORKERS = int(os.getenv('IMAGE_FETCH_MAX_WORKERS', 2))
+    IMAGE_FETCH_MAX_LIMIT = int(os.getenv('IMAGE_FETCH_MAX_LIMIT', 500))
+    IMAGE_FETCH_LEASE_SECONDS = int(os.getenv('IMAGE_FETCH_LEASE_SECONDS', 300))  # running job counts as abandoned after this
+
     # Google Cloud Vision
     GOOGLE_VISION_CREDENTIALS = os.getenv('GOOGLE_VISION_CREDENTIALS', 'credentials/google-vision.json')
 
+    # Cache of raw Vision annotations by image hash (empty path keeps it in memory only)
+    DETECTION_CACHE_SIZE = int(os.getenv('DETECTION_CACHE_SIZE', 256))
+    DETECTION_CACHE_TTL = int(os.getenv('DETECTION_CACHE_TTL', 7 * 24 * 3600))  # seconds
+    DETECTION_CACHE_PATH = os.getenv('DETECTION_CACHE_PATH', 'instance/detection_cache.sqlite')
+
+    # Reuse annotations for near-identical re-shots by the same user (window 0 disables)
+    DETECTION_NEAR_DUPLICATE_WINDOW = int(os.getenv('DETECTION_NEAR_DUPLICATE_WINDOW', 600))  # seconds
+    DETECTION_NEAR_DUPLICATE_DISTANCE = int(os.getenv('DETECTION_NEAR_DUPLICATE_DISTANCE', 6))  # of 64 bits
+    DETECTION_NEAR_DUPLICATE_SIZE = int(os.getenv('DETECTION_NEAR_DUPLICATE_SIZE', 1024))
+
+    # Maximum photos accepted by POST /api/ingredients/detect/batch (its body limit
+    # is this many 10MB images plus 1MB, regardless of MAX_CONTENT_LENGTH)
+    DETECTION_BATCH_MAX_IMAGES = int(os.getenv('DETECTION_BATCH_MAX_IMAGES', 10))
+
+    # Uploads are oriented, stripped of metadata and downscaled before Vision (0 disables)
+    DETECTION_MAX_DIMENSION = int(os.getenv('DETECTION_MAX_DIMENSION', 1600))  # pixels, longest side
+    DETECTION_JPEG_QUALITY = int(os.getenv('DETECTION_JPEG_QUALITY', 85))
+
+    # Detection backend: 'vision' (Google Cloud Vision) or 'stub' (offline fixtures for load tests)
+    DETECTION_BACKEND = os.getenv('DETECTION_BACKEND', 'vision')
+    DETECTION_STUB_FIXTURES = os.getenv('DETECTION_STUB_FIXTURES', '')  # JSON list of annotation sets
+    DETECTION_STUB_LATENCY = float(os.getenv('DETECTION_STUB_LATENCY', 0))  # seconds per call
+    # Backend calls run on a bounded pool; callers give up after the timeout and a
+    # circuit breaker stops calling a failing backend for DETECTION_BREAKER_RESET seconds
+    DETECTION_TIMEOUT = float(os.getenv('DETECTION_TIMEOUT', 10))  # seconds
+    DETECTION_MAX_WORKERS = int(os.getenv('DETECTION_MAX_WORKERS', 4))
+    DETECTION_MAX_PENDING = int(os.getenv('DETECTION_MAX_PENDING', 8))
+    DETECTION_BREAKER_THRESHOLD = int(os.getenv('DETECTION_BREAKER_THRESHOLD', 5))
+    DETECTION_BREAKER_RESET = float(os.getenv('DETECTION_BREAKER_RESET', 30))  # seconds
+
+    # Keep raw annotations of every detection for `flask detection remap`
+    DETECTION_STORE_ANNOTATIONS = os.getenv('DETECTION_STORE_ANNOTATIONS', 'true').lower() == 'true'
+
+    # Count labels no mapping covers; buffered and upserted in batches
+    DETECTION_TRACK_UNMAPPED = os.getenv('DETECTION_TRACK_UNMAPPED', 'true').lower() == 'true'
+    DETECTION_UNMAPPED_FLUSH_SIZE = int(os.getenv('DETECTION_UNMAPPED_FLUSH_SIZE', 200))  # label occurrences
+    DETECTION_UNMAPPED_FLUSH_INTERVAL = int(os.getenv('DETECTION_UNMAPPED_FLUSH_INTERVAL', 60))  # seconds
+
     # Google Custom Search API (for food images)
     GOOGLE_API_KEY = os.getenv('GOOGLE_API_KEY', '')
     GOOGLE_SEARCH_ENGINE_ID = os.getenv('GOOGLE_SEARCH_ENGINE_ID', '')
 
+    # Persistent image search cache (empty path disables it)
+    IMAGE_SEARCH_CACHE_PATH = os.getenv('IMAGE_SEARCH_CACHE_PATH', 'instance/image_search_cache.sqlite')
+    IMAGE_SEARCH_CACHE_TTL = int(os.getenv('IMAGE_SEARCH_CACHE_TTL', 30 * 24 * 3600))  # seconds
+    IMAGE_SEARCH_NEGATIVE_TTL = int(os.getenv('IMAGE_SEARCH_NEGATIVE_TTL', 24 * 3600))  # seconds
+    IMAGE_SEARCH_RETRIES = int(os.getenv('IMAGE_SEARCH_RETRIES', 3))
+    IMAGE_SEARCH_MAX_WORKERS = int(os.getenv('IMAGE_SEARCH_MAX_WORKERS', 4))
+    IMAGE_SEARCH_RATE_LIMIT = float(os.getenv('IMAGE_SEARCH_RATE_LIMIT', 100))  # queries per minute
+    IMAGE_SEARCH_BASE_URL = os.getenv('IMAGE_SEARCH_BASE_URL', '')  # override for stub servers
+
+    # Recipe image thumbnails (WebP, content-addressed on disk)
+    THUMBNAIL_DIR = os.getenv('THUMBNAIL_DIR', 'instance/thumbnails')
+    THUMBNAIL_WIDTHS = [int(w) for w in os.getenv('THUMBNAIL_WIDTHS', '120,240,480').split(',')]
+    THUMBNAIL_QUALITY = int(os.getenv('THUMBNAIL_QUALITY', 80))
+    THUMBNAIL_MAX_AGE = int(os.getenv('THUMBNAIL_MAX_AGE', 7 * 24 * 3600))  # seconds
+    THUMBNAIL_MAX_SOURCE_BYTES = int(os.getenv('THUMBNAIL_MAX_SOURCE_BYTES', 10 * 1024 * 1024))
+    # Source image hosts (and subdomains) thumbnails may be fetched from;
+    # empty allows any host that resolves to a public address
+    THUMBNAIL_ALLOWED_HOSTS = [h.strip() for h in os.getenv('THUMBNAIL_ALLOWED_HOSTS', '').split(',') if h.strip()]
+    THUMBNAIL_MAX_REDIRECTS = int(os.getenv('THUMBNAIL_MAX_REDIRECTS', 3))
+
     # AWS Configuration
     AWS_ACCESS_KEY_ID = os.getenv('AWS_ACCESS_KEY_ID')
     AWS_SECRET_ACCESS_KEY = os.getenv('AWS_SECRET_ACCESS_KEY')
@@ -55,7 +134,10 @@ class ProductionConfig(Config):
 class TestingConfig(Config):
     """Testing configuration"""
     TESTING = True
-    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    # Set TEST_DATABASE_URL to run the suite (incl. EXPLAIN checks) against PostgreSQL
+    SQLALCHEMY_DATABASE_URI = os.getenv('TEST_DATABASE_URL', 'sqlite:///:memory:')
+    IMAGE_SEARCH_CACHE_PATH = ''
+    DETECTION_CACHE_PATH = ''
 
 
 config = {
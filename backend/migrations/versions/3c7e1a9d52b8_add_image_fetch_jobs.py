@@ -0,0 +1,44 @@
+"""Add image_fetch_jobs table for background recipe image fetching
+
+Revision ID: 3c7e1a9d52b8
+Revises: 5a09319114cd
+Create Date: 2026-10-18 23:59:20.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3c7e1a9d52b8'
+down_revision = '5a09319114cd'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('image_fetch_jobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('recipe_ids', sa.JSON(), nullable=False),
+    sa.Column('total', sa.Integer(), nullable=True),
+    sa.Column('processed', sa.Integer(), nullable=True),
+    sa.Column('updated_count', sa.Integer(), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('image_fetch_jobs', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_image_fetch_jobs_status'), ['status'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('image_fetch_jobs', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_image_fetch_jobs_status'))
+
+    op.drop_table('image_fetch_jobs')
@@ -0,0 +1,51 @@
+"""Add indexes for hot recipe, ingredient and meal plan queries
+
+Revision ID: 5a09319114cd
+Revises: f0a20104f78a
+Create Date: 2026-10-18 23:58:10.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5a09319114cd'
+down_revision = 'f0a20104f78a'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('recipe_ingredients', schema=None) as batch_op:
+        batch_op.create_index('ix_recipe_ingredients_recipe_id', ['recipe_id'], unique=False)
+        batch_op.create_index('ix_recipe_ingredients_ingredient_recipe', ['ingredient_id', 'recipe_id'], unique=False)
+
+    with op.batch_alter_table('meal_plans', schema=None) as batch_op:
+        batch_op.create_index('ix_meal_plans_user_planned_date', ['user_id', 'planned_date'], unique=False)
+        batch_op.create_index('ix_meal_plans_recipe_rating', ['recipe_id', 'user_rating'], unique=False)
+
+    with op.batch_alter_table('recipes', schema=None) as batch_op:
+        batch_op.create_index('ix_recipes_cuisine_rating', ['cuisine_type', 'rating'], unique=False)
+        batch_op.create_index('ix_recipes_time_rating', ['total_time', 'rating'], unique=False)
+
+    # user_pantry lookups by user_id are already served by the
+    # unique_user_ingredient (user_id, ingredient_id) constraint index.
+
+    op.create_index('ix_ingredients_name_lower', 'ingredients', [sa.text('lower(name)')], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_ingredients_name_lower', table_name='ingredients')
+
+    with op.batch_alter_table('recipes', schema=None) as batch_op:
+        batch_op.drop_index('ix_recipes_time_rating')
+        batch_op.drop_index('ix_recipes_cuisine_rating')
+
+    with op.batch_alter_table('meal_plans', schema=None) as batch_op:
+        batch_op.drop_index('ix_meal_plans_recipe_rating')
+        batch_op.drop_index('ix_meal_plans_user_planned_date')
+
+    with op.batch_alter_table('recipe_ingredients', schema=None) as batch_op:
+        batch_op.drop_index('ix_recipe_ingredients_ingredient_recipe')
+        batch_op.drop_index('ix_recipe_ingredients_recipe_id')
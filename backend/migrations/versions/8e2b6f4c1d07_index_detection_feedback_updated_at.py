@@ -0,0 +1,25 @@
+"""Index detection_feedback.updated_at for incremental learned-mapping sync
+
+Revision ID: 8e2b6f4c1d07
+Revises: 3c7e1a9d52b8
+Create Date: 2026-10-18 23:59:40.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '8e2b6f4c1d07'
+down_revision = '3c7e1a9d52b8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('detection_feedback', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_detection_feedback_updated_at'), ['updated_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('detection_feedback', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_detection_feedback_updated_at'))
@@ -0,0 +1,25 @@
+"""Index detection_feedback (detected_label, correction_count, id) for winner lookups
+
+Revision ID: a8c4e6f2d913
+Revises: e5b9d2a7c3f1
+Create Date: 2026-10-19 04:25:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'a8c4e6f2d913'
+down_revision = 'e5b9d2a7c3f1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('detection_feedback', schema=None) as batch_op:
+        batch_op.create_index('ix_detection_feedback_label_count', ['detected_label', 'correction_count', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('detection_feedback', schema=None) as batch_op:
+        batch_op.drop_index('ix_detection_feedback_label_count')
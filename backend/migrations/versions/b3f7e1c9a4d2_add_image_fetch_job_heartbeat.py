@@ -0,0 +1,26 @@
+"""Add heartbeat_at to image_fetch_jobs so running jobs are claimed with a lease
+
+Revision ID: b3f7e1c9a4d2
+Revises: a8c4e6f2d913
+Create Date: 2026-10-19 06:40:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b3f7e1c9a4d2'
+down_revision = 'a8c4e6f2d913'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('image_fetch_jobs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('heartbeat_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('image_fetch_jobs', schema=None) as batch_op:
+        batch_op.drop_column('heartbeat_at')
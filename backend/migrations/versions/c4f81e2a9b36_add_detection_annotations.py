@@ -0,0 +1,45 @@
+"""Add detection_annotations table for stored raw Vision annotations
+
+Revision ID: c4f81e2a9b36
+Revises: 8e2b6f4c1d07
+Create Date: 2026-10-19 00:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4f81e2a9b36'
+down_revision = '8e2b6f4c1d07'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('detection_annotations',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('image_hash', sa.String(length=64), nullable=False),
+    sa.Column('backend', sa.String(length=30), nullable=True),
+    sa.Column('labels', sa.JSON(), nullable=False),
+    sa.Column('objects', sa.JSON(), nullable=False),
+    sa.Column('label_mappings', sa.JSON(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('remapped_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('detection_annotations', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_detection_annotations_created_at'), ['created_at'], unique=False)
+        batch_op.create_index(batch_op.f('ix_detection_annotations_image_hash'), ['image_hash'], unique=False)
+        batch_op.create_index(batch_op.f('ix_detection_annotations_user_id'), ['user_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('detection_annotations', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_detection_annotations_user_id'))
+        batch_op.drop_index(batch_op.f('ix_detection_annotations_image_hash'))
+        batch_op.drop_index(batch_op.f('ix_detection_annotations_created_at'))
+
+    op.drop_table('detection_annotations')
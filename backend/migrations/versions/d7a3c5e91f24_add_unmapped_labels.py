@@ -0,0 +1,38 @@
+"""Add unmapped_labels table for unmapped Vision label counts
+
+Revision ID: d7a3c5e91f24
+Revises: c4f81e2a9b36
+Create Date: 2026-10-19 00:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd7a3c5e91f24'
+down_revision = 'c4f81e2a9b36'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('unmapped_labels',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('label', sa.String(length=100), nullable=False),
+    sa.Column('occurrence_count', sa.Integer(), nullable=False),
+    sa.Column('score_sum', sa.Float(), nullable=False),
+    sa.Column('first_seen_at', sa.DateTime(), nullable=True),
+    sa.Column('last_seen_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('label')
+    )
+    with op.batch_alter_table('unmapped_labels', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_unmapped_labels_occurrence_count'), ['occurrence_count'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('unmapped_labels', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_unmapped_labels_occurrence_count'))
+
+    op.drop_table('unmapped_labels')
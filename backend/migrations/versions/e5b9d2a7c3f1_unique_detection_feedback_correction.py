@@ -0,0 +1,54 @@
+"""Make detection_feedback unique per (detected_label, correct_ingredient)
+
+Existing duplicate rows are merged into the earliest one first: counts are
+summed, confidence recomputed and the latest updated_at kept.
+
+Revision ID: e5b9d2a7c3f1
+Revises: d7a3c5e91f24
+Create Date: 2026-10-19 03:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5b9d2a7c3f1'
+down_revision = 'd7a3c5e91f24'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    duplicated = (
+        "SELECT MIN(id) FROM detection_feedback "
+        "GROUP BY detected_label, correct_ingredient HAVING COUNT(*) > 1"
+    )
+    op.execute(sa.text(
+        "UPDATE detection_feedback SET "
+        "correction_count = (SELECT SUM(d.correction_count) FROM detection_feedback d "
+        "WHERE d.detected_label = detection_feedback.detected_label "
+        "AND d.correct_ingredient = detection_feedback.correct_ingredient), "
+        "updated_at = (SELECT MAX(d.updated_at) FROM detection_feedback d "
+        "WHERE d.detected_label = detection_feedback.detected_label "
+        "AND d.correct_ingredient = detection_feedback.correct_ingredient) "
+        f"WHERE id IN ({duplicated})"
+    ))
+    op.execute(sa.text(
+        "UPDATE detection_feedback SET learned_confidence = CASE "
+        "WHEN correction_count >= 5 THEN 0.99 "
+        "ELSE 0.5 + correction_count * 0.1 END "
+        f"WHERE id IN ({duplicated})"
+    ))
+    op.execute(sa.text(
+        "DELETE FROM detection_feedback WHERE id NOT IN ("
+        "SELECT MIN(id) FROM detection_feedback GROUP BY detected_label, correct_ingredient)"
+    ))
+
+    with op.batch_alter_table('detection_feedback', schema=None) as batch_op:
+        batch_op.create_unique_constraint('unique_label_correction', ['detected_label', 'correct_ingredient'])
+
+
+def downgrade():
+    with op.batch_alter_table('detection_feedback', schema=None) as batch_op:
+        batch_op.drop_constraint('unique_label_correction', type_='unique')
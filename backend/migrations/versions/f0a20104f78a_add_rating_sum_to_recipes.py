@@ -0,0 +1,32 @@
+"""Add rating_sum column to recipes for incremental rating averages
+
+Revision ID: f0a20104f78a
+Revises: fd0344f7cc68
+Create Date: 2026-10-18 23:36:52.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f0a20104f78a'
+down_revision = 'fd0344f7cc68'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('recipes', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('rating_sum', sa.Float(), server_default='0', nullable=True))
+
+    # Backfill so existing averages are preserved (rating * rating_count).
+    # Run `flask recipes reconcile-ratings` to rebuild from meal plan history.
+    op.execute(
+        "UPDATE recipes SET rating_sum = COALESCE(rating, 0) * COALESCE(rating_count, 0)"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('recipes', schema=None) as batch_op:
+        batch_op.drop_column('rating_sum')
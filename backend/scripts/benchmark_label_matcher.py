@@ -0,0 +1,75 @@
+"""
+Benchmark the compiled Vision label matcher against the original linear scan
+
+Usage:
+    python scripts/benchmark_label_matcher.py [--learned N] [--repeat N]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.ml.google_vision_detector import GoogleVisionDetector
+from app.ml.label_matcher import LabelMatcher
+from tests.label_corpus import build_label_corpus
+from tests.test_label_matcher import linear_map
+
+
+def make_learned(count):
+    """Synthetic learned corrections drawn from static keys and generic labels"""
+    keys = list(GoogleVisionDetector.VISION_TO_INGREDIENT)
+    return {f'{keys[i % len(keys)]} variant {i}': f'Ingredient {i}' for i in range(count)}
+
+
+def bench(fn, labels, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for label in labels:
+            fn(label)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--learned', type=int, default=200, help='number of learned mappings')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    static = GoogleVisionDetector.VISION_TO_INGREDIENT
+    learned = make_learned(args.learned)
+    labels = build_label_corpus(static)
+
+    start = time.perf_counter()
+    static_matcher = LabelMatcher(static, skip_none_partials=True)
+    learned_matcher = LabelMatcher(learned)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    def compiled(label):
+        label = label.lower().strip()
+        found, value = learned_matcher.match(label)
+        if found:
+            return value
+        return static_matcher.match(label)[1]
+
+    mismatches = [label for label in labels if compiled(label) != linear_map(label, learned)]
+
+    linear_s = bench(lambda label: linear_map(label, learned), labels, args.repeat)
+    compiled_s = bench(compiled, labels, args.repeat)
+
+    print(f'labels:            {len(labels)}')
+    print(f'static keys:       {len(static)}')
+    print(f'learned keys:      {len(learned)}')
+    print(f'matcher build:     {build_ms:.1f} ms')
+    print(f'linear scan:       {linear_s / len(labels) * 1e6:.1f} us/label')
+    print(f'compiled matcher:  {compiled_s / len(labels) * 1e6:.1f} us/label')
+    print(f'speedup:           {linear_s / compiled_s:.1f}x')
+    print(f'parity mismatches: {len(mismatches)}')
+    return 1 if mismatches else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
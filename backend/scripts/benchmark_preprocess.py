@@ -0,0 +1,100 @@
+"""
+Benchmark preprocessing images before Vision annotation
+
+Reports bytes sent and preprocessing time for each image. With --vision (and
+GOOGLE_VISION_CREDENTIALS set) it also times real Vision calls on the original
+and preprocessed bytes and checks the mapped ingredients are the same.
+
+Usage:
+    python scripts/benchmark_preprocess.py [IMAGE ...] [--max-dimension N] [--vision]
+
+Without image paths, synthetic 12MP camera-style JPEGs are used.
+"""
+import argparse
+import io
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from PIL import Image, ImageFilter
+
+from app.ml.google_vision_detector import GoogleVisionDetector
+from app.ml.preprocess import EXIF_ORIENTATION, ImagePreprocessor
+
+
+def synthetic_photo(seed, size=(4032, 3024)):
+    """Noisy, blurred blocks with EXIF orientation - roughly a phone JPEG's entropy"""
+    rng = random.Random(seed)
+    image = Image.effect_noise(size, 40).convert('RGB')
+    for _ in range(80):
+        x, y = rng.randrange(size[0]), rng.randrange(size[1])
+        color = tuple(rng.randrange(256) for _ in range(3))
+        image.paste(color, (x, y, x + rng.randrange(100, 900), y + rng.randrange(100, 900)))
+    image = image.filter(ImageFilter.GaussianBlur(2))
+    exif = Image.Exif()
+    exif[EXIF_ORIENTATION] = 6
+    buffer = io.BytesIO()
+    image.save(buffer, 'JPEG', quality=92, exif=exif.tobytes())
+    return f'synthetic-{seed}.jpg', buffer.getvalue()
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('images', nargs='*', help='image files (default: synthetic photos)')
+    parser.add_argument('--max-dimension', type=int, default=1600)
+    parser.add_argument('--quality', type=int, default=85)
+    parser.add_argument('--vision', action='store_true', help='call Vision and check detection parity')
+    args = parser.parse_args()
+
+    if args.images:
+        samples = [(os.path.basename(path), open(path, 'rb').read()) for path in args.images]
+    else:
+        samples = [synthetic_photo(seed) for seed in range(3)]
+
+    preprocess = ImagePreprocessor(max_dimension=args.max_dimension, quality=args.quality)
+    detector = None
+    if args.vision:
+        detector = GoogleVisionDetector(credentials_path=os.getenv('GOOGLE_VISION_CREDENTIALS'))
+        detector._get_learned_mappings = lambda: {}
+        if not detector.available:
+            print('Vision client unavailable; skipping latency and parity checks')
+            detector = None
+
+    total_in = total_out = 0
+    mismatches = 0
+    for name, data in samples:
+        prepared, prep_s = timed(preprocess, data)
+        total_in += len(data)
+        total_out += len(prepared)
+        size = Image.open(io.BytesIO(prepared)).size
+        print(f'{name}: {len(data) / 1024:.0f} KB -> {len(prepared) / 1024:.0f} KB '
+              f'{size[0]}x{size[1]} in {prep_s * 1000:.0f} ms')
+
+        if detector is not None:
+            raw, raw_s = timed(detector.annotate, data)
+            small, small_s = timed(detector.annotate, prepared)
+            raw_names = {d['name'] for d in detector.map_annotations(raw) if d['name']}
+            small_names = {d['name'] for d in detector.map_annotations(small) if d['name']}
+            same = raw_names == small_names
+            mismatches += not same
+            print(f'  vision: {raw_s * 1000:.0f} ms -> {small_s * 1000:.0f} ms, '
+                  f'ingredients {"match" if same else "DIFFER"}: {sorted(raw_names)} / {sorted(small_names)}')
+
+    print(f'total bytes:       {total_in / 1024:.0f} KB -> {total_out / 1024:.0f} KB '
+          f'({100 * (1 - total_out / total_in):.0f}% saved)')
+    if detector is not None:
+        print(f'parity mismatches: {mismatches}')
+    return 1 if mismatches else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
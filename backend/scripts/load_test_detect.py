@@ -0,0 +1,72 @@
+"""
+Load-test POST /api/ingredients/detect against a running server
+
+Start the server with the offline stub backend so no Vision calls are made:
+
+    DETECTION_BACKEND=stub DETECTION_STUB_LATENCY=0.3 gunicorn -w 2 --threads 8 run:app
+
+then:
+
+    python scripts/load_test_detect.py --token <JWT> [--requests 200] [--concurrency 20]
+
+Every request sends a distinct image so the annotation caches don't hide the
+backend. Reports throughput, latency percentiles and status codes (503s are
+requests shed by the detection timeout, capacity limit or circuit breaker).
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='http://localhost:5000/api/ingredients/detect')
+    parser.add_argument('--token', default=os.getenv('EATEASE_TOKEN'), help='JWT access token')
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=20)
+    parser.add_argument('--size', type=int, default=256 * 1024, help='bytes per fake image')
+    args = parser.parse_args()
+
+    if not args.token:
+        parser.error('--token (or EATEASE_TOKEN) is required')
+
+    headers = {'Authorization': f'Bearer {args.token}'}
+    payload = os.urandom(args.size)
+
+    def send(i):
+        image = i.to_bytes(8, 'big') + payload
+        start = time.perf_counter()
+        try:
+            response = requests.post(args.url, headers=headers, timeout=60,
+                                     files={'image': (f'load-{i}.jpg', image, 'image/jpeg')})
+            status = response.status_code
+        except requests.RequestException as e:
+            status = type(e).__name__
+        return status, time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        results = list(executor.map(send, range(args.requests)))
+    elapsed = time.perf_counter() - start
+
+    latencies = [latency * 1000 for _, latency in results]
+    print(f'requests:    {len(results)} in {elapsed:.1f}s ({len(results) / elapsed:.1f} req/s)')
+    print(f'latency ms:  p50 {statistics.median(latencies):.0f}  p95 {percentile(latencies, 95):.0f}  '
+          f'max {max(latencies):.0f}')
+    print(f'status:      {dict(Counter(status for status, _ in results))}')
+    return 0 if all(status == 200 for status, _ in results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,11 +1,14 @@
-"""Shared test fixtures for ingredient detection tests."""
+"""Shared test fixtures for API and ingredient detection tests."""
 
 import io
 import pytest
 from unittest.mock import MagicMock
 
 from app import create_app, db as _db
-from app.models import User, Ingredient
+from app.models import User, Ingredient, Recipe, RecipeIngredient
+from app.ml.google_vision_detector import GoogleVisionDetector
+from app.services.catalog_cache import CatalogCache
+from app.services.unmapped_labels import unmapped_label_counter
 from flask_jwt_extended import create_access_token
 
 
@@ -19,6 +22,9 @@ def app():
 @pytest.fixture(autouse=True)
 def db_session(app):
     """Fresh DB per test — drops and recreates all tables."""
+    CatalogCache.invalidate_all()
+    GoogleVisionDetector.reset_learned_mappings()
+    unmapped_label_counter.clear()
     with app.app_context():
         _db.create_all()
         yield _db.session
@@ -88,3 +94,82 @@ def make_mock_detector(available=True, detections=None):
     mock.available = available
     mock.detect_from_bytes.return_value = detections or []
     return mock
+
+
+@pytest.fixture
+def sample_recipes(db_session, sample_ingredients):
+    """Seed recipes using the sample ingredients.
+
+    - Chicken Adobo: Chicken, Garlic, Onion
+    - Tomato Salad: Tomato, Onion (vegetarian)
+    - Pineapple Chicken: Pineapple, Chicken, Tomato, Garlic
+    """
+    by_name = {ing.name: ing for ing in sample_ingredients}
+    specs = [
+        ('Chicken Adobo', ['Chicken', 'Garlic', 'Onion'], 4.5, False),
+        ('Tomato Salad', ['Tomato', 'Onion'], 3.0, True),
+        ('Pineapple Chicken', ['Pineapple', 'Chicken', 'Tomato', 'Garlic'], 4.0, False),
+    ]
+    recipes = []
+    for name, ingredient_names, rating, is_vegetarian in specs:
+        recipe = Recipe(
+            name=name,
+            cuisine_type='Filipino',
+            meal_type='lunch',
+            difficulty_level='easy',
+            total_time=30,
+            rating=rating,
+            is_vegetarian=is_vegetarian,
+        )
+        db_session.add(recipe)
+        db_session.flush()
+        for ing_name in ingredient_names:
+            db_session.add(RecipeIngredient(
+                recipe_id=recipe.id,
+                ingredient_id=by_name[ing_name].id,
+                quantity=1,
+                unit='pieces',
+            ))
+        recipes.append(recipe)
+    db_session.flush()
+    return recipes
+
+
+def make_vision_response(labels=(), objects=()):
+    """Build a Vision AnnotateImageResponse.
+
+    labels: (description, score) pairs; objects: (name, score) pairs with a
+    fixed bounding box.
+    """
+    from google.cloud import vision
+
+    box = [vision.NormalizedVertex(x=x, y=y) for x, y in [(0.1, 0.2), (0.5, 0.2), (0.5, 0.6), (0.1, 0.6)]]
+    return vision.AnnotateImageResponse(
+        label_annotations=[vision.EntityAnnotation(description=d, score=s) for d, s in labels],
+        localized_object_annotations=[
+            vision.LocalizedObjectAnnotation(name=n, score=s, bounding_poly=vision.BoundingPoly(normalized_vertices=box))
+            for n, s in objects
+        ],
+    )
+
+
+@pytest.fixture
+def vision_detector():
+    """A GoogleVisionDetector with a mocked Vision client and no learned mappings."""
+    from app.ml.google_vision_detector import GoogleVisionDetector, VisionBackend
+
+    detector = GoogleVisionDetector.__new__(GoogleVisionDetector)
+    detector.available = True
+    detector.client = MagicMock()
+    detector.client.annotate_image.return_value = make_vision_response(
+        labels=[('Chicken', 0.95), ('Food', 0.9)],
+        objects=[('Tomato', 0.8)],
+    )
+    detector.backend = VisionBackend(client=detector.client)
+    detector.annotation_cache = None
+    detector.near_duplicates = None
+    detector.preprocessor = None
+    detector.annotation_recorder = None
+    detector.unmapped_counter = None
+    detector._get_learned_mappings = lambda: {}
+    return detector
@@ -0,0 +1,59 @@
+"""
+Realistic Google Vision label corpus for label matcher tests and benchmarks.
+
+GENERIC_LABELS are descriptions Vision commonly returns for kitchen and food
+photos. build_label_corpus() adds variants of every mapping key (modifiers,
+plurals, truncations) so partial-match guards are exercised as well.
+"""
+
+GENERIC_LABELS = [
+    'food', 'ingredient', 'recipe', 'cuisine', 'dish', 'meal', 'produce',
+    'natural foods', 'whole food', 'staple food', 'vegetable', 'leaf vegetable',
+    'root vegetable', 'cruciferous vegetables', 'fruit', 'citrus', 'tropical fruit',
+    'seedless fruit', 'superfood', 'local food', 'comfort food', 'fast food',
+    'finger food', 'junk food', 'vegan nutrition', 'vegetarian food', 'plant',
+    'flowering plant', 'terrestrial plant', 'annual plant', 'herb', 'spice',
+    'condiment', 'sauce', 'tableware', 'dishware', 'plate', 'bowl', 'serveware',
+    'kitchen utensil', 'cutting board', 'knife', 'countertop', 'table', 'wood',
+    'plastic bag', 'packaging and labeling', 'bottle', 'glass bottle', 'jar',
+    'tin can', 'carton', 'box', 'label', 'font', 'logo', 'brand', 'text',
+    'rectangle', 'circle', 'pattern', 'still life photography', 'photography',
+    'close-up', 'macro photography', 'red', 'green', 'yellow', 'orange', 'white',
+    'meat', 'red meat', 'pork', 'beef', 'poultry', 'chicken meat', 'chicken thighs',
+    'fried chicken', 'fish', 'seafood', 'shellfish', 'shrimp', 'prawn', 'squid',
+    'egg', 'egg yolk', 'boiled egg', 'eggs', 'dairy', 'milk', 'cheese', 'butter',
+    'rice', 'white rice', 'jasmine rice', 'noodle', 'rice noodles', 'bread',
+    'baked goods', 'flour', 'sugar', 'salt', 'black pepper', 'chili pepper',
+    'bird\'s eye chili', 'bell pepper', 'red onion', 'shallot', 'garlic',
+    'ginger', 'lemongrass', 'tomato', 'plum tomato', 'cherry tomatoes', 'potato',
+    'sweet potato', 'yam', 'carrot', 'cabbage', 'napa cabbage', 'bok choy',
+    'water spinach', 'spinach', 'lettuce', 'cucumber', 'eggplant', 'bitter melon',
+    'bitter gourd', 'squash', 'winter squash', 'pumpkin', 'calabaza', 'okra',
+    'string bean', 'green bean', 'long bean', 'snap pea', 'mung bean', 'tofu',
+    'banana', 'saba banana', 'cooking plantain', 'mango', 'pineapple', 'papaya',
+    'calamansi', 'lime', 'lemon', 'coconut', 'coconut milk', 'coconut water',
+    'soy sauce', 'fish sauce', 'vinegar', 'cane vinegar', 'cooking oil',
+    'vegetable oil', 'olive oil', 'annatto', 'bay leaf', 'peppercorn',
+    'hamburger', 'sandwich', 'pizza', 'soup', 'stew', 'broth', 'curry',
+    'stir frying', 'frying', 'cooking', 'baking', 'grilling', 'barbecue',
+    'laptop', 'car', 'skyscraper', 'person', 'hand', 'finger', 'nail',
+    'tree', 'sky', 'cat', 'dog', 'automotive tire', 'electronic device',
+]
+
+MODIFIERS = ['fresh', 'sliced', 'chopped', 'raw', 'organic', 'dried', 'frozen', 'grilled']
+SUFFIXES = ['s', ' slices', ' leaves', ' powder', ' sauce']
+
+
+def build_label_corpus(mapping):
+    """Generic labels plus exact, modified and truncated variants of mapping keys."""
+    labels = list(GENERIC_LABELS)
+    for i, key in enumerate(mapping):
+        labels.append(key)
+        labels.append(f'{MODIFIERS[i % len(MODIFIERS)]} {key}')
+        labels.append(key + SUFFIXES[i % len(SUFFIXES)])
+        if len(key) > 5:
+            labels.append(key[:-1])
+            labels.append(key[1:])
+        if ' ' in key:
+            labels.extend(key.split())
+    return labels
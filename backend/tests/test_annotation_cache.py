@@ -0,0 +1,64 @@
+"""Tests for caching raw Vision annotations by image hash."""
+
+import pytest
+
+from app.ml.annotation_cache import AnnotationCache
+
+pytest.importorskip('google.cloud.vision')
+
+
+class TestAnnotationCache:
+    """Tests for GoogleVisionDetector.detect_from_bytes with an AnnotationCache."""
+
+    def test_repeat_upload_skips_vision(self, vision_detector):
+        vision_detector.annotation_cache = AnnotationCache(maxsize=8)
+        first = vision_detector.detect_from_bytes(b'photo-1')
+        second = vision_detector.detect_from_bytes(b'photo-1')
+
+        assert first == second
+        assert {d['name'] for d in first} == {'Chicken', 'Tomato'}
+        assert vision_detector.client.annotate_image.call_count == 1
+
+        vision_detector.detect_from_bytes(b'photo-2')
+        assert vision_detector.client.annotate_image.call_count == 2
+
+    def test_hit_is_remapped_with_current_mappings(self, vision_detector):
+        vision_detector.annotation_cache = AnnotationCache(maxsize=8)
+        assert 'Pineapple' not in {d['name'] for d in vision_detector.detect_from_bytes(b'photo')}
+
+        vision_detector._get_learned_mappings = lambda: {'food': 'Pineapple'}
+        names = {d['name'] for d in vision_detector.detect_from_bytes(b'photo')}
+        assert 'Pineapple' in names
+        assert vision_detector.client.annotate_image.call_count == 1
+
+    def test_disk_level_survives_new_cache(self, vision_detector, tmp_path):
+        path = str(tmp_path / 'detections.sqlite')
+        vision_detector.annotation_cache = AnnotationCache(maxsize=8, ttl=60, path=path)
+        expected = vision_detector.detect_from_bytes(b'photo')
+
+        vision_detector.annotation_cache = AnnotationCache(maxsize=8, ttl=60, path=path)
+        assert vision_detector.detect_from_bytes(b'photo') == expected
+        assert vision_detector.client.annotate_image.call_count == 1
+
+    def test_failed_call_is_not_cached(self, vision_detector):
+        vision_detector.annotation_cache = AnnotationCache(maxsize=8)
+        vision_detector.client.annotate_image.side_effect = RuntimeError('deadline exceeded')
+        assert vision_detector.detect_from_bytes(b'photo') == []
+
+        vision_detector.client.annotate_image.side_effect = None
+        assert vision_detector.detect_from_bytes(b'photo')
+        assert vision_detector.client.annotate_image.call_count == 2
+
+    def test_object_bbox_is_kept(self, vision_detector):
+        tomato = next(d for d in vision_detector.detect_from_bytes(b'photo') if d['name'] == 'Tomato')
+        assert tomato['source'] == 'object'
+        assert tomato['bbox'] == pytest.approx([0.1, 0.2, 0.5, 0.6])
+
+    def test_unmapped_labels_fall_back_to_raw(self, vision_detector):
+        from tests.conftest import make_vision_response
+
+        vision_detector.client.annotate_image.return_value = make_vision_response(
+            labels=[('Tableware', 0.9), ('Laptop', 0.5)])
+        detections = vision_detector.detect_from_bytes(b'photo')
+        assert [d['source'] for d in detections] == ['label_raw', 'label_raw']
+        assert detections[0]['google_label'] == 'Tableware'
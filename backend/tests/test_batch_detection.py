@@ -0,0 +1,151 @@
+"""Tests for multi-image detection (POST /api/ingredients/detect/batch)."""
+
+from unittest.mock import patch
+
+import pytest
+
+from app.ml.annotation_cache import AnnotationCache
+from app.ml.google_vision_detector import GoogleVisionDetector, _batch_chunks
+from tests.conftest import make_test_image, make_mock_detector, make_vision_response
+
+# Labels returned for each fake image, keyed by its bytes
+IMAGE_LABELS = {
+    b'shelf-1': [('Chicken', 0.95), ('Onion', 0.7)],
+    b'shelf-2': [('Onion', 0.9), ('Garlic', 0.8)],
+    b'shelf-3': [('Tableware', 0.9)],
+}
+
+
+def fake_batch_annotate(requests):
+    """Vision batch_annotate_images stand-in answering from IMAGE_LABELS."""
+    from google.cloud import vision
+
+    responses = []
+    for req in requests:
+        labels = IMAGE_LABELS.get(req.image.content)
+        if labels is None:
+            responses.append(vision.AnnotateImageResponse(error={'code': 3, 'message': 'Bad image data.'}))
+        else:
+            responses.append(make_vision_response(labels=labels))
+    return vision.BatchAnnotateImagesResponse(responses=responses)
+
+
+@pytest.fixture
+def batch_detector(vision_detector):
+    pytest.importorskip('google.cloud.vision')
+    vision_detector.client.batch_annotate_images.side_effect = fake_batch_annotate
+    return vision_detector
+
+
+def names(detections):
+    return {d['name'] for d in detections}
+
+
+class TestBatchChunks:
+    """Tests for splitting a batch to the Vision request limits."""
+
+    def test_respects_count_and_size(self):
+        assert _batch_chunks([1] * 5, max_items=2, max_bytes=100) == [[0, 1], [2, 3], [4]]
+        assert _batch_chunks([40, 40, 40, 10], max_items=16, max_bytes=100) == [[0, 1], [2, 3]]
+
+    def test_oversized_item_gets_own_chunk(self):
+        assert _batch_chunks([10, 500, 10], max_items=16, max_bytes=100) == [[0], [1], [2]]
+
+
+class TestDetectBatchFromBytes:
+    """Tests for GoogleVisionDetector.detect_batch_from_bytes."""
+
+    def test_one_call_for_all_images(self, batch_detector):
+        results = batch_detector.detect_batch_from_bytes([b'shelf-1', b'shelf-2'])
+
+        assert [names(r) for r in results] == [{'Chicken', 'Onion'}, {'Onion', 'Garlic'}]
+        assert batch_detector.client.batch_annotate_images.call_count == 1
+        assert batch_detector.client.annotate_image.call_count == 0
+
+    def test_chunked_to_api_limit(self, batch_detector, monkeypatch):
+        monkeypatch.setattr(GoogleVisionDetector, 'BATCH_MAX_IMAGES', 2)
+        images = [b'shelf-1', b'shelf-2', b'shelf-3']
+        results = batch_detector.detect_batch_from_bytes(images)
+
+        assert batch_detector.client.batch_annotate_images.call_count == 2
+        assert names(results[0]) == {'Chicken', 'Onion'}
+
+    def test_identical_and_cached_images_sent_once(self, batch_detector):
+        batch_detector.annotation_cache = AnnotationCache(maxsize=8)
+        batch_detector.detect_batch_from_bytes([b'shelf-1'])
+        results = batch_detector.detect_batch_from_bytes([b'shelf-1', b'shelf-2', b'shelf-2'])
+
+        sent = [
+            [req.image.content for req in call.kwargs['requests']]
+            for call in batch_detector.client.batch_annotate_images.call_args_list
+        ]
+        assert sent == [[b'shelf-1'], [b'shelf-2']]
+        assert names(results[1]) == names(results[2]) == {'Onion', 'Garlic'}
+
+    def test_failed_image_yields_empty_list(self, batch_detector):
+        results = batch_detector.detect_batch_from_bytes([b'shelf-1', b'corrupt'])
+
+        assert names(results[0]) == {'Chicken', 'Onion'}
+        assert results[1] == []
+
+    def test_merge_dedupes_across_images(self, batch_detector):
+        merged = GoogleVisionDetector.merge_detections(
+            batch_detector.detect_batch_from_bytes([b'shelf-1', b'shelf-2', b'shelf-3'])
+        )
+
+        assert sorted(d['name'] for d in merged) == ['Chicken', 'Garlic', 'Onion']
+        onion = next(d for d in merged if d['name'] == 'Onion')
+        assert onion['confidence'] == pytest.approx(0.9)
+
+    def test_merge_keeps_raw_labels_when_nothing_mapped(self, batch_detector):
+        merged = GoogleVisionDetector.merge_detections(batch_detector.detect_batch_from_bytes([b'shelf-3']))
+
+        assert [(d['name'], d['source']) for d in merged] == [(None, 'label_raw')]
+
+
+class TestDetectBatchEndpoint:
+    """Integration tests for POST /api/ingredients/detect/batch."""
+
+    def post(self, client, auth_headers, files):
+        return client.post('/api/ingredients/detect/batch', data={'images': files},
+                           content_type='multipart/form-data', headers=auth_headers)
+
+    def test_requires_images(self, client, auth_headers):
+        resp = client.post('/api/ingredients/detect/batch', headers=auth_headers)
+        assert resp.status_code == 400
+        assert 'No image files provided' in resp.get_json()['error']
+
+    def test_rejects_too_many_images(self, app, client, auth_headers):
+        app.config['DETECTION_BATCH_MAX_IMAGES'] = 2
+        resp = self.post(client, auth_headers, [make_test_image(f'{i}.jpg') for i in range(3)])
+        assert resp.status_code == 400
+        assert 'Too many images' in resp.get_json()['error']
+
+    def test_rejects_invalid_file_type(self, client, auth_headers):
+        resp = self.post(client, auth_headers, [make_test_image('a.jpg'), make_test_image('notes.txt')])
+        assert resp.status_code == 400
+        assert 'Invalid file type' in resp.get_json()['error']
+
+    @patch('app.api.ingredients.get_vision_detector')
+    def test_rejects_image_too_large(self, mock_get_det, client, auth_headers):
+        mock_get_det.return_value = make_mock_detector()
+        resp = self.post(client, auth_headers, [make_test_image('big.jpg', size=10 * 1024 * 1024 + 1)])
+        assert resp.status_code == 400
+        assert 'too large' in resp.get_json()['error']
+
+    @patch('app.api.ingredients.get_vision_detector')
+    def test_merged_response(self, mock_get_det, client, auth_headers, sample_ingredients, batch_detector):
+        mock_get_det.return_value = batch_detector
+        files = [make_test_image('top.jpg', b'shelf-1'), make_test_image('bottom.jpg', b'shelf-2')]
+        resp = self.post(client, auth_headers, files)
+
+        assert resp.status_code == 200
+        body = resp.get_json()
+        assert sorted(body['ingredient_names']) == ['Chicken', 'Garlic', 'Onion']
+        assert body['total_detected'] == 3
+        assert body['total_images'] == 2
+        assert [img['filename'] for img in body['images']] == ['top.jpg', 'bottom.jpg']
+        assert body['images'][1]['ingredient_names'] == ['Garlic', 'Onion']
+        assert {ing['name'] for ing in body['detected_ingredients']} == {'Chicken', 'Garlic', 'Onion'}
+        assert body['debug_info']['detection_source'] == 'google_vision'
+        assert batch_detector.client.batch_annotate_images.call_count == 1
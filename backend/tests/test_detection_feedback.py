@@ -1,8 +1,14 @@
 """Tests for detection feedback endpoint and learned mappings."""
 
 import json
+from datetime import datetime, timedelta
+
 import pytest
+from sqlalchemy import event
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import IntegrityError
 
+from app import db
 from app.models import DetectionFeedback
 from app.ml.google_vision_detector import GoogleVisionDetector
 
@@ -76,10 +82,58 @@ class TestFeedbackEndpoint:
         body = resp.get_json()
         assert 'error' in body['results'][0]
 
-    def test_submit_feedback_clears_cache(self, client, auth_headers, sample_ingredients, db_session):
-        """After feedback, cache_timestamp is set to None."""
-        # Set a fake cache timestamp
-        GoogleVisionDetector._cache_timestamp = 'some_old_time'
+    def test_submit_feedback_batch(self, client, auth_headers, sample_ingredients, db_session):
+        """Several corrections are resolved and saved with one query each."""
+        GoogleVisionDetector.__new__(GoogleVisionDetector)._get_learned_mappings()
+        statements = []
+
+        def before_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement.lstrip())
+
+        event.listen(db.engine, 'before_cursor_execute', before_execute)
+        try:
+            resp = client.post('/api/ingredients/detect/feedback',
+                               headers=auth_headers,
+                               data=json.dumps({
+                                   'corrections': [
+                                       {'detected_label': 'Jackfruit', 'correct_ingredient': 'Pineapple'},
+                                       {'detected_label': 'shallot'},
+                                       {'detected_label': 'shallot', 'correct_ingredient': 'Onion'},
+                                       {'detected_label': 'jackfruit', 'correct_ingredient': 'Pineapple'},
+                                       {'detected_label': 'ampalaya', 'correct_ingredient': 'Bitter Gourd'}
+                                   ]
+                               }),
+                               content_type='application/json')
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', before_execute)
+
+        assert resp.status_code == 200
+        results = resp.get_json()['results']
+        assert 'error' in results[1]
+        assert [r['feedback']['detected_label'] for r in results if 'feedback' in r] == \
+            ['jackfruit', 'shallot', 'jackfruit', 'ampalaya']
+        assert results[0]['feedback']['correction_count'] == 2
+
+        rows = {(fb.detected_label, fb.correct_ingredient): fb for fb in DetectionFeedback.query}
+        assert len(rows) == 3
+        assert rows[('jackfruit', 'Pineapple')].correction_count == 2
+        assert rows[('jackfruit', 'Pineapple')].learned_confidence == pytest.approx(0.7)
+        assert rows[('shallot', 'Onion')].correct_ingredient_id == sample_ingredients[3].id
+        assert rows[('ampalaya', 'Bitter Gourd')].correct_ingredient_id is None
+
+        # One ingredient lookup and one upsert; the response and the
+        # in-memory mappings are built without re-loading the saved rows
+        assert len(statements) == 2
+        assert 'FROM ingredients' in statements[0]
+        assert statements[1].startswith('INSERT INTO detection_feedback')
+        assert GoogleVisionDetector._learned_mappings_cache['jackfruit'] == 'Pineapple'
+
+    def test_submit_feedback_applies_delta(self, client, app, auth_headers, sample_ingredients, db_session):
+        """Feedback updates the in-memory mappings without forcing a reload."""
+        detector = GoogleVisionDetector.__new__(GoogleVisionDetector)
+        assert detector._get_learned_mappings() == {}
+        synced_at = GoogleVisionDetector._cache_timestamp
+        assert synced_at is not None
 
         client.post(
             '/api/ingredients/detect/feedback',
@@ -92,7 +146,141 @@ class TestFeedbackEndpoint:
             }),
             content_type='application/json')
 
-        assert GoogleVisionDetector._cache_timestamp is None
+        assert GoogleVisionDetector._cache_timestamp == synced_at
+        assert GoogleVisionDetector._learned_mappings_cache == {'test_label': 'Tomato'}
+        assert detector._map_to_ingredient('test_label') == 'Tomato'
+
+
+class TestLearnedMappingSync:
+    """Tests for incremental learned-mapping sync."""
+
+    @pytest.fixture
+    def detector(self):
+        return GoogleVisionDetector.__new__(GoogleVisionDetector)
+
+    @staticmethod
+    def _expire_sync():
+        GoogleVisionDetector._cache_timestamp -= GoogleVisionDetector.LEARNED_SYNC_INTERVAL * 2
+
+    def test_incremental_sync_fetches_only_changed_rows(self, detector, db_session, monkeypatch):
+        old = datetime.utcnow() - timedelta(days=1)
+        for i in range(20):
+            updated = old + timedelta(minutes=5 * i)
+            db_session.add(DetectionFeedback(detected_label=f'label {i}', correct_ingredient='Tomato',
+                                             correction_count=1, created_at=updated, updated_at=updated))
+        db_session.commit()
+        assert len(detector._get_learned_mappings()) == 20
+
+        # Another worker records a correction
+        db_session.add(DetectionFeedback(detected_label='ananas', correct_ingredient='Pineapple', correction_count=1))
+        db_session.commit()
+
+        fetched = []
+        original = DetectionFeedback.get_changed_rows.__func__
+
+        def spy(cls, since=None):
+            rows = original(cls, since)
+            fetched.append((since, len(rows)))
+            return rows
+
+        monkeypatch.setattr(DetectionFeedback, 'get_changed_rows', classmethod(spy))
+        assert 'ananas' not in detector._get_learned_mappings()  # within the sync interval
+
+        self._expire_sync()
+        mappings = detector._get_learned_mappings()
+        assert mappings['ananas'] == 'Pineapple'
+        assert len(mappings) == 21
+        assert len(fetched) == 1
+        # Only the new row plus the newest old row (inside the overlap window)
+        assert fetched[0][0] is not None
+        assert fetched[0][1] == 2
+
+    def test_winner_switches_when_overtaken(self, detector, db_session):
+        for _ in range(2):
+            DetectionFeedback.add_or_update_feedback('jackfruit', 'Langka')
+        detector._get_learned_mappings()
+        assert GoogleVisionDetector._learned_mappings_cache['jackfruit'] == 'Langka'
+
+        # Tie keeps the earlier row; a third correction takes over
+        saved = [DetectionFeedback.add_or_update_feedback('jackfruit', 'Pineapple') for _ in range(2)]
+        GoogleVisionDetector.apply_feedback(saved)
+        assert GoogleVisionDetector._learned_mappings_cache['jackfruit'] == 'Langka'
+
+        GoogleVisionDetector.apply_feedback([DetectionFeedback.add_or_update_feedback('jackfruit', 'Pineapple')])
+        assert GoogleVisionDetector._learned_mappings_cache['jackfruit'] == 'Pineapple'
+        assert detector._map_to_ingredient('jackfruit') == 'Pineapple'
+
+    def test_matches_full_aggregation(self, detector, db_session):
+        corrections = [('ube', 'Ube'), ('ube', 'Kamote'), ('ube', 'Kamote'), ('gabi', 'Taro'),
+                       ('labanos', 'Radish'), ('ube', 'Ube'), ('ube', 'Ube')]
+        detector._get_learned_mappings()
+        for label, ingredient in corrections:
+            GoogleVisionDetector.apply_feedback([DetectionFeedback.add_or_update_feedback(label, ingredient)])
+
+        expected = {label: data['ingredient']
+                    for label, data in DetectionFeedback.get_all_learned_mappings().items()}
+        assert GoogleVisionDetector._learned_mappings_cache == expected
+
+        GoogleVisionDetector._cache_timestamp = None
+        assert detector._get_learned_mappings() == expected
+
+
+class TestLearnedMappingWinners:
+    """Tests for picking the winning correction per label in SQL."""
+
+    CORRECTIONS = [
+        ('ube', 'Ube', 2), ('ube', 'Kamote', 3), ('gabi', 'Taro', 1),
+        ('labanos', 'Radish', 2), ('labanos', 'Daikon', 2), ('sayote', 'Chayote', 1)
+    ]
+
+    @pytest.fixture(params=['window', 'anti_join'])
+    def strategy(self, request, monkeypatch, db_session):
+        monkeypatch.setattr(DetectionFeedback, '_winner_strategy', staticmethod(lambda dialect: request.param))
+        for label, ingredient, count in self.CORRECTIONS:
+            db_session.add(DetectionFeedback(detected_label=label, correct_ingredient=ingredient,
+                                             correction_count=count, learned_confidence=0.5))
+        db_session.commit()
+        return request.param
+
+    def test_winner_per_label(self, strategy):
+        mappings = DetectionFeedback.get_all_learned_mappings()
+        # Ties go to the earliest row
+        assert {label: data['ingredient'] for label, data in mappings.items()} == {
+            'ube': 'Kamote', 'gabi': 'Taro', 'labanos': 'Radish', 'sayote': 'Chayote'
+        }
+        assert mappings['ube']['count'] == 3
+
+    def test_min_corrections(self, strategy):
+        mappings = DetectionFeedback.get_all_learned_mappings(min_corrections=2)
+        assert sorted(mappings) == ['labanos', 'ube']
+
+    def test_matches_incremental_rule(self, strategy):
+        mappings, candidates = {}, {}
+        GoogleVisionDetector._merge_feedback_rows(DetectionFeedback.get_changed_rows(), mappings, candidates)
+        winners = {row[1]: row[2] for row in DetectionFeedback.get_winner_rows()}
+        assert winners == mappings
+
+    def test_distinct_on_for_postgresql(self, app):
+        stmt = DetectionFeedback.winners_query(DetectionFeedback.detected_label, dialect=postgresql.dialect())
+        assert 'DISTINCT ON (detection_feedback.detected_label)' in str(stmt.compile(dialect=postgresql.dialect()))
+
+    def test_full_sync_loads_winners_only(self, db_session):
+        for label, ingredient, count in self.CORRECTIONS:
+            db_session.add(DetectionFeedback(detected_label=label, correct_ingredient=ingredient,
+                                             correction_count=count))
+        db_session.commit()
+
+        detector = GoogleVisionDetector.__new__(GoogleVisionDetector)
+        assert detector._get_learned_mappings()['ube'] == 'Kamote'
+        assert all(len(c) == 1 for c in GoogleVisionDetector._learned_candidates.values())
+        assert GoogleVisionDetector._sync_watermark == DetectionFeedback.get_latest_update()
+
+        # A dropped winner falls back to the runner-up via a full reload
+        kamote = DetectionFeedback.query.filter_by(detected_label='ube', correct_ingredient='Kamote').one()
+        kamote.correction_count = 0
+        db_session.commit()
+        GoogleVisionDetector._cache_timestamp -= GoogleVisionDetector.LEARNED_SYNC_INTERVAL * 2
+        assert detector._get_learned_mappings()['ube'] == 'Ube'
 
 
 class TestLearnedMappingsEndpoint:
@@ -184,3 +372,29 @@ class TestDetectionFeedbackModel:
             correct_ingredient='Tomato'
         ).count()
         assert count == 1
+
+    def test_upsert_adds_to_existing_row(self, app, db_session, sample_ingredients):
+        """Upserts increment a row saved elsewhere and keep its ingredient link."""
+        db_session.add(DetectionFeedback(detected_label='ananas', correct_ingredient='Pineapple',
+                                         correct_ingredient_id=sample_ingredients[0].id,
+                                         correction_count=4, learned_confidence=0.9))
+        db_session.commit()
+
+        saved = DetectionFeedback.upsert_many([
+            {'detected_label': 'ANANAS ', 'correct_ingredient': 'Pineapple'},
+            {'detected_label': 'ananas', 'correct_ingredient': 'Pineapple'}
+        ])
+
+        assert saved[0] is saved[1]
+        assert saved[0].correction_count == 6
+        assert saved[0].learned_confidence == pytest.approx(0.99)
+        assert saved[0].correct_ingredient_id == sample_ingredients[0].id
+        assert DetectionFeedback.query.count() == 1
+
+    def test_duplicate_correction_rejected(self, app, db_session):
+        """The unique constraint stops duplicate rows for one correction."""
+        DetectionFeedback.add_or_update_feedback('ananas', 'Pineapple')
+        db_session.add(DetectionFeedback(detected_label='ananas', correct_ingredient='Pineapple'))
+        with pytest.raises(IntegrityError):
+            db_session.commit()
+        db_session.rollback()
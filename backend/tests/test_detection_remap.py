@@ -0,0 +1,134 @@
+"""Tests for stored detection annotations and the bulk remapping job."""
+
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.ml.detector_backends import AnnotationBackend
+from app.ml.google_vision_detector import GoogleVisionDetector
+from app.models import DetectionAnnotation, DetectionFeedback
+from app.services.detection_remap import remap_detection_annotations
+
+
+def add_annotation(db_session, labels, mappings, created_at=None):
+    row = DetectionAnnotation(
+        image_hash='0' * 64,
+        labels=[{'description': label, 'score': 0.9} for label in labels],
+        objects=[],
+        label_mappings=mappings,
+        created_at=created_at or datetime.utcnow()
+    )
+    db_session.add(row)
+    db_session.commit()
+    return row
+
+
+@pytest.fixture
+def mapper():
+    """A detector used only for mapping; it has no way to call an API."""
+    return GoogleVisionDetector(backend=AnnotationBackend())
+
+
+class TestRecordAnnotations:
+    """Detections store their raw annotations."""
+
+    @pytest.fixture(autouse=True)
+    def _vision(self, vision_detector):
+        pytest.importorskip('google.cloud.vision')
+        vision_detector.annotation_recorder = DetectionAnnotation.record_many
+
+    def test_detection_is_recorded(self, vision_detector, test_user):
+        vision_detector.detect_from_bytes(b'photo', scope=str(test_user.id))
+
+        row = DetectionAnnotation.query.one()
+        assert row.user_id == test_user.id
+        assert [label['description'] for label in row.labels] == ['Chicken', 'Food']
+        assert [obj['name'] for obj in row.objects] == ['Tomato']
+        assert row.label_mappings == {'chicken': 'Chicken', 'food': None, 'tomato': 'Tomato'}
+
+    def test_batch_records_each_image(self, vision_detector):
+        from tests.test_batch_detection import fake_batch_annotate
+        vision_detector.client.batch_annotate_images.side_effect = fake_batch_annotate
+        vision_detector.detect_batch_from_bytes([b'shelf-1', b'shelf-2', b'corrupt'])
+
+        assert DetectionAnnotation.query.count() == 2
+
+    def test_recorder_failure_does_not_fail_detection(self, vision_detector):
+        def broken(records):
+            raise RuntimeError('database is locked')
+        vision_detector.annotation_recorder = broken
+
+        assert {d['name'] for d in vision_detector.detect_from_bytes(b'photo')} == {'Chicken', 'Tomato'}
+
+
+class TestRemapDetectionAnnotations:
+    """Tests for remap_detection_annotations."""
+
+    def test_unchanged_mappings(self, mapper, db_session):
+        add_annotation(db_session, ['Chicken', 'Food'], {'chicken': 'Chicken', 'food': None})
+        report = remap_detection_annotations(mapper)
+
+        assert (report.scanned, report.changed) == (1, 0)
+
+    def test_learned_feedback_change_reported(self, mapper, db_session):
+        for _ in range(3):
+            add_annotation(db_session, ['Chicken', 'Leaf vegetable'], {'chicken': 'Chicken', 'leaf vegetable': None})
+        add_annotation(db_session, ['Tomato'], {'tomato': 'Tomato'})
+        db_session.add(DetectionFeedback(detected_label='leaf vegetable', correct_ingredient='Pechay', correction_count=2))
+        db_session.commit()
+
+        report = remap_detection_annotations(mapper, batch_size=2)
+
+        assert (report.scanned, report.changed, report.updated) == (4, 3, 0)
+        assert report.to_dict()['label_changes'] == [
+            {'label': 'leaf vegetable', 'old': None, 'new': 'Pechay', 'images': 3}
+        ]
+        assert report.gained == {'Pechay': 3}
+        assert report.distinct_labels == 3
+        # Dry run leaves the stored mappings alone
+        assert all(row.remapped_at is None for row in DetectionAnnotation.query)
+
+    def test_static_mapping_change(self, mapper, db_session, monkeypatch):
+        add_annotation(db_session, ['Chicken'], {'chicken': 'Chicken'})
+        mapping = dict(GoogleVisionDetector.VISION_TO_INGREDIENT, chicken='Chicken Thigh')
+        monkeypatch.setattr(GoogleVisionDetector, 'VISION_TO_INGREDIENT', mapping)
+
+        report = remap_detection_annotations(mapper)
+
+        assert report.lost == {'Chicken': 1}
+        assert report.gained == {'Chicken Thigh': 1}
+
+    def test_apply_stores_new_mappings(self, mapper, db_session):
+        row = add_annotation(db_session, ['Food'], {'food': None})
+        db_session.add(DetectionFeedback(detected_label='food', correct_ingredient='Rice', correction_count=1))
+        db_session.commit()
+
+        report = remap_detection_annotations(mapper, apply=True)
+        assert report.updated == 1
+
+        db_session.refresh(row)
+        assert row.label_mappings == {'food': 'Rice'}
+        assert row.remapped_at is not None
+        assert remap_detection_annotations(mapper).changed == 0
+
+    def test_since_filter(self, mapper, db_session):
+        add_annotation(db_session, ['Food'], {'food': 'Rice'}, created_at=datetime.utcnow() - timedelta(days=30))
+        add_annotation(db_session, ['Food'], {'food': 'Rice'})
+
+        report = remap_detection_annotations(mapper, since=datetime.utcnow() - timedelta(days=1))
+        assert (report.scanned, report.changed) == (1, 1)
+
+    def test_cli(self, app, db_session):
+        add_annotation(db_session, ['Food'], {'food': 'Rice'})
+        runner = app.test_cli_runner()
+
+        result = runner.invoke(args=['detection', 'remap', '--json'])
+        assert result.exit_code == 0
+        report = json.loads(result.output)
+        assert report['label_changes'] == [{'label': 'food', 'old': 'Rice', 'new': None, 'images': 1}]
+
+        result = runner.invoke(args=['detection', 'remap', '--apply'])
+        assert result.exit_code == 0
+        assert '1 changed, 1 updated' in result.output
+        assert 'Lost: Rice (1)' in result.output
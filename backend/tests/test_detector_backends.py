@@ -0,0 +1,206 @@
+"""Tests for detection backends, the guarded executor and the circuit breaker."""
+
+import json
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+import app.api.ingredients as ingredients_api
+from app.ml.detector_backends import (
+    DEFAULT_STUB_FIXTURES, AnnotationBackend, DetectorUnavailable, GuardedBackend, StubBackend
+)
+from app.utils.circuit_breaker import CircuitBreaker
+from tests.conftest import make_test_image, make_mock_detector
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class FailingBackend(AnnotationBackend):
+    name = 'failing'
+
+    def __init__(self):
+        self.calls = 0
+
+    def annotate(self, image_bytes):
+        self.calls += 1
+        raise RuntimeError('upstream error')
+
+
+class BlockingBackend(AnnotationBackend):
+    name = 'blocking'
+
+    def __init__(self):
+        self.release = threading.Event()
+
+    def annotate(self, image_bytes):
+        self.release.wait(5)
+        return {'labels': [], 'objects': []}
+
+
+class TestCircuitBreaker:
+    """Tests for CircuitBreaker state transitions."""
+
+    @pytest.fixture
+    def clock(self, monkeypatch):
+        clock = FakeClock()
+        monkeypatch.setattr('app.utils.circuit_breaker.time.monotonic', clock)
+        return clock
+
+    def test_opens_after_threshold(self, clock):
+        breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30)
+        for _ in range(2):
+            breaker.record_failure()
+        assert breaker.allow()
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+        assert not breaker.allow()
+
+    def test_success_resets_failure_count(self, clock):
+        breaker = CircuitBreaker(failure_threshold=2)
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_half_open_allows_one_trial(self, clock):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+        breaker.record_failure()
+        clock.now += 30
+
+        assert breaker.allow()
+        assert not breaker.allow()
+        breaker.record_success()
+        assert breaker.state == CircuitBreaker.CLOSED
+        assert breaker.allow()
+
+    def test_failed_trial_reopens(self, clock):
+        breaker = CircuitBreaker(failure_threshold=5, reset_timeout=30)
+        for _ in range(5):
+            breaker.record_failure()
+        clock.now += 31
+        assert breaker.allow()
+        breaker.record_failure()
+        assert not breaker.allow()
+
+
+class TestStubBackend:
+    """Tests for the deterministic offline backend."""
+
+    def test_same_image_same_fixture(self):
+        stub = StubBackend()
+        assert stub.annotate(b'photo-1') == stub.annotate(b'photo-1')
+        assert stub.annotate(b'photo-1') in DEFAULT_STUB_FIXTURES
+        assert stub.batch_annotate([b'photo-1', b'photo-2']) == [stub.annotate(b'photo-1'), stub.annotate(b'photo-2')]
+
+    def test_latency(self):
+        stub = StubBackend(latency=0.05)
+        start = time.monotonic()
+        stub.batch_annotate([b'a', b'b', b'c'])
+        assert 0.05 <= time.monotonic() - start < 0.15
+
+    def test_fixtures_from_config(self, tmp_path):
+        fixtures = [{'labels': [{'description': 'Kangkong', 'score': 0.9}], 'objects': []}]
+        path = tmp_path / 'fixtures.json'
+        path.write_text(json.dumps(fixtures))
+        stub = StubBackend.from_config({'DETECTION_STUB_FIXTURES': str(path), 'DETECTION_STUB_LATENCY': 0.2})
+
+        assert stub.annotate(b'anything') == fixtures[0]
+        assert stub.latency == 0.2
+
+
+class TestGuardedBackend:
+    """Tests for timeouts, capacity limits and the circuit breaker."""
+
+    def test_passes_results_through(self):
+        guarded = GuardedBackend(StubBackend())
+        assert guarded.annotate(b'photo') == StubBackend().annotate(b'photo')
+        assert guarded.name == 'stub'
+        guarded.shutdown()
+
+    def test_timeout(self):
+        backend = BlockingBackend()
+        guarded = GuardedBackend(backend, timeout=0.05)
+        start = time.monotonic()
+        with pytest.raises(DetectorUnavailable, match='timed out'):
+            guarded.annotate(b'photo')
+        assert time.monotonic() - start < 1
+        backend.release.set()
+        guarded.shutdown()
+
+    def test_rejects_when_at_capacity(self):
+        backend = BlockingBackend()
+        guarded = GuardedBackend(backend, max_workers=1, max_pending=0, timeout=0.05)
+        with pytest.raises(DetectorUnavailable, match='timed out'):
+            guarded.annotate(b'slow')
+        # The timed-out call still occupies the only slot
+        with pytest.raises(DetectorUnavailable, match='capacity'):
+            guarded.annotate(b'next')
+
+        backend.release.set()
+        guarded.shutdown()
+        assert guarded.annotate(b'after') == {'labels': [], 'objects': []}
+        guarded.shutdown()
+
+    def test_breaker_stops_calling_failing_backend(self):
+        backend = FailingBackend()
+        guarded = GuardedBackend(backend, breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60))
+        for _ in range(2):
+            with pytest.raises(RuntimeError):
+                guarded.annotate(b'photo')
+
+        with pytest.raises(DetectorUnavailable, match='circuit is open'):
+            guarded.annotate(b'photo')
+        assert backend.calls == 2
+        guarded.shutdown()
+
+
+class TestDetectEndpointBackends:
+    """The /detect endpoint with the stub backend and an unavailable backend."""
+
+    @pytest.fixture
+    def stub_app(self, app, monkeypatch):
+        app.config['DETECTION_BACKEND'] = 'stub'
+        app.config['DETECTION_NEAR_DUPLICATE_WINDOW'] = 0
+        monkeypatch.setattr(ingredients_api, 'vision_detector', None)
+        return app
+
+    def test_stub_backend_detects_offline(self, stub_app, client, auth_headers, sample_ingredients):
+        expected = ingredients_api.GoogleVisionDetector(backend=StubBackend()).map_annotations(
+            StubBackend().annotate(b'pantry-shelf')
+        )
+        resp = client.post('/api/ingredients/detect', data={'image': make_test_image(content=b'pantry-shelf')},
+                           content_type='multipart/form-data', headers=auth_headers)
+
+        assert resp.status_code == 200
+        body = resp.get_json()
+        assert body['detections'] == expected
+        assert body['debug_info']['vision_available'] is True
+        assert isinstance(ingredients_api.vision_detector.backend, GuardedBackend)
+        ingredients_api.vision_detector.backend.shutdown()
+
+    @patch('app.api.ingredients.get_vision_detector')
+    def test_unavailable_backend_returns_503(self, mock_get_det, client, auth_headers):
+        detector = make_mock_detector()
+        detector.detect_from_bytes.side_effect = DetectorUnavailable('google_vision backend timed out')
+        mock_get_det.return_value = detector
+        resp = client.post('/api/ingredients/detect', data={'image': make_test_image()},
+                           content_type='multipart/form-data', headers=auth_headers)
+
+        assert resp.status_code == 503
+        assert 'temporarily unavailable' in resp.get_json()['error']
+
+    def test_detector_propagates_unavailable(self, vision_detector):
+        pytest.importorskip('google.cloud.vision')
+        vision_detector.backend = GuardedBackend(BlockingBackend(), max_workers=1, max_pending=0, timeout=0.01)
+        with pytest.raises(DetectorUnavailable):
+            vision_detector.detect_from_bytes(b'photo')
+        vision_detector.backend.backend.release.set()
+        vision_detector.backend.shutdown()
@@ -0,0 +1,142 @@
+"""Tests for background recipe image fetch jobs."""
+
+import json
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+
+from app import db
+from app.models import ImageFetchJob, Recipe
+from app.services.image_fetch_jobs import image_fetch_runner
+
+
+def _start(client, headers, **body):
+    return client.post('/api/recipes/fetch-images',
+                       headers=headers,
+                       data=json.dumps(body),
+                       content_type='application/json')
+
+
+@pytest.fixture
+def search_image():
+    """Stub Google Custom Search lookups."""
+    with patch('app.services.image_search_service.image_search_service.search_food_image') as mock:
+        mock.side_effect = lambda name, cuisine_type=None: f'https://img.example/{name.replace(" ", "-")}.jpg'
+        yield mock
+
+
+class TestFetchImagesJob:
+    """Tests for POST /api/recipes/fetch-images and its status endpoint."""
+
+    def test_returns_job_id_and_completes(self, client, auth_headers, sample_recipes, search_image):
+        resp = _start(client, auth_headers, limit=10)
+        assert resp.status_code == 202
+        body = resp.get_json()
+        job_id = body['job_id']
+        assert body['job']['total'] == 3
+        assert body['status_url'] == f'/api/recipes/fetch-images/{job_id}'
+
+        image_fetch_runner.wait(job_id, timeout=10)
+
+        resp = client.get(f'/api/recipes/fetch-images/{job_id}', headers=auth_headers)
+        assert resp.status_code == 200
+        job = resp.get_json()['job']
+        assert job['status'] == 'completed'
+        assert job['processed'] == 3
+        assert job['updated_count'] == 3
+        assert job['progress'] == 100.0
+
+        db.session.expire_all()
+        adobo = db.session.get(Recipe, sample_recipes[0].id)
+        assert adobo.image_url == 'https://img.example/Chicken-Adobo.jpg'
+
+    def test_limit_and_missing_results(self, client, auth_headers, sample_recipes, search_image):
+        search_image.side_effect = lambda name, cuisine_type=None: None
+        job_id = _start(client, auth_headers, limit=2).get_json()['job_id']
+        image_fetch_runner.wait(job_id, timeout=10)
+
+        job = db.session.get(ImageFetchJob, job_id)
+        db.session.refresh(job)
+        assert job.status == ImageFetchJob.STATUS_COMPLETED
+        assert job.total == 2
+        assert job.processed == 2
+        assert job.updated_count == 0
+
+    def test_failure_is_recorded(self, client, auth_headers, sample_recipes, search_image):
+        search_image.side_effect = RuntimeError('quota exceeded')
+        job_id = _start(client, auth_headers).get_json()['job_id']
+        image_fetch_runner.wait(job_id, timeout=10)
+
+        job = client.get(f'/api/recipes/fetch-images/{job_id}', headers=auth_headers).get_json()['job']
+        assert job['status'] == 'failed'
+        assert 'quota exceeded' in job['error']
+        assert job['finished_at'] is not None
+
+    def test_resume_skips_processed_recipes(self, app, sample_recipes, search_image):
+        job = image_fetch_runner.create_job(limit=10)
+        job.processed = 1
+        job.status = ImageFetchJob.STATUS_RUNNING
+        db.session.commit()
+
+        assert image_fetch_runner.resume_incomplete(app) == 1
+        image_fetch_runner.wait(job.id, timeout=10)
+
+        db.session.refresh(job)
+        assert job.status == ImageFetchJob.STATUS_COMPLETED
+        assert search_image.call_count == 2
+
+    def test_resume_skips_jobs_with_live_lease(self, app, sample_recipes, search_image):
+        live = image_fetch_runner.create_job(limit=10)
+        live.status = ImageFetchJob.STATUS_RUNNING
+        live.heartbeat_at = datetime.utcnow()
+        stale = image_fetch_runner.create_job(limit=10)
+        stale.status = ImageFetchJob.STATUS_RUNNING
+        stale.heartbeat_at = datetime.utcnow() - timedelta(seconds=app.config['IMAGE_FETCH_LEASE_SECONDS'] + 1)
+        db.session.commit()
+
+        assert image_fetch_runner.resume_incomplete(app) == 1
+        image_fetch_runner.wait(stale.id, timeout=10)
+
+        db.session.refresh(live)
+        db.session.refresh(stale)
+        assert live.status == ImageFetchJob.STATUS_RUNNING
+        assert stale.status == ImageFetchJob.STATUS_COMPLETED
+
+    def test_new_job_skips_recipes_of_unfinished_jobs(self, app, sample_recipes):
+        first = image_fetch_runner.create_job(limit=2)
+        second = image_fetch_runner.create_job(limit=10)
+        assert set(first.recipe_ids).isdisjoint(second.recipe_ids)
+        assert second.total == 1
+
+        # Once a job finishes (or moves past a recipe) its recipes are free again
+        first.status = ImageFetchJob.STATUS_FAILED
+        db.session.commit()
+        assert image_fetch_runner.create_job(limit=10).recipe_ids == first.recipe_ids
+
+    def test_job_claimed_once(self, app, sample_recipes, search_image):
+        job = image_fetch_runner.create_job(limit=10)
+
+        assert image_fetch_runner._claim(app, job.id) is True
+        assert image_fetch_runner._claim(app, job.id) is False
+
+        # A second runner for the same job does nothing
+        image_fetch_runner.submit(app, job.id)
+        image_fetch_runner.wait(job.id, timeout=10)
+        db.session.refresh(job)
+        assert job.status == ImageFetchJob.STATUS_RUNNING
+        assert job.heartbeat_at is not None
+        assert search_image.call_count == 0
+
+    @pytest.mark.parametrize('limit', [0, -1, 'ten', True, 10_000])
+    def test_invalid_limit(self, client, auth_headers, limit):
+        resp = _start(client, auth_headers, limit=limit)
+        assert resp.status_code == 400
+
+    def test_unknown_job(self, client, auth_headers):
+        resp = client.get('/api/recipes/fetch-images/999', headers=auth_headers)
+        assert resp.status_code == 404
+
+    def test_requires_auth(self, client):
+        resp = _start(client, {}, limit=1)
+        assert resp.status_code == 401
@@ -0,0 +1,98 @@
+"""Tests for preprocessing images before Vision annotation."""
+
+import io
+import random
+
+import pytest
+
+from app.ml.near_duplicates import dhash
+from app.ml.preprocess import EXIF_ORIENTATION, ImagePreprocessor
+from app.utils.bktree import hamming_distance
+
+Image = pytest.importorskip('PIL.Image')
+
+
+def make_photo(size=(4000, 3000), orientation=None, fmt='JPEG', mode='RGB', seed=3):
+    """A camera-sized photo of coloured blocks, optionally with an EXIF orientation."""
+    rng = random.Random(seed)
+    image = Image.new(mode, size, (200, 200, 200, 255)[:len(mode)])
+    for _ in range(60):
+        x, y = rng.randrange(size[0]), rng.randrange(size[1])
+        color = tuple(rng.randrange(256) for _ in range(len(mode)))
+        image.paste(color, (x, y, x + size[0] // 5, y + size[1] // 5))
+    kwargs = {}
+    if orientation:
+        exif = Image.Exif()
+        exif[EXIF_ORIENTATION] = orientation
+        kwargs['exif'] = exif.tobytes()
+    buffer = io.BytesIO()
+    image.save(buffer, fmt, **kwargs)
+    return buffer.getvalue()
+
+
+class TestImagePreprocessor:
+    """Tests for ImagePreprocessor."""
+
+    def test_downscales_to_max_dimension(self):
+        original = make_photo()
+        prepared = ImagePreprocessor(max_dimension=1600)(original)
+
+        image = Image.open(io.BytesIO(prepared))
+        assert image.format == 'JPEG'
+        assert image.size == (1600, 1200)
+        assert len(prepared) < len(original)
+
+    def test_applies_orientation_and_strips_exif(self):
+        prepared = ImagePreprocessor(max_dimension=1600)(make_photo(orientation=6))
+
+        image = Image.open(io.BytesIO(prepared))
+        assert image.size == (1200, 1600)
+        assert not image.getexif()
+
+    def test_small_clean_image_unchanged(self):
+        original = make_photo(size=(800, 600), fmt='PNG')
+        assert ImagePreprocessor(max_dimension=1600)(original) is original
+
+    def test_small_image_with_exif_is_stripped(self):
+        prepared = ImagePreprocessor(max_dimension=1600)(make_photo(size=(800, 600), orientation=8))
+
+        image = Image.open(io.BytesIO(prepared))
+        assert image.size == (600, 800)
+        assert not image.getexif()
+
+    def test_transparency_flattened_to_rgb(self):
+        prepared = ImagePreprocessor(max_dimension=500)(make_photo(size=(1000, 1000), fmt='PNG', mode='RGBA'))
+
+        image = Image.open(io.BytesIO(prepared))
+        assert image.mode == 'RGB'
+        assert image.size == (500, 500)
+
+    def test_undecodable_bytes_passed_through(self):
+        assert ImagePreprocessor()(b'not an image') == b'not an image'
+
+    def test_content_parity(self):
+        """The downscaled image looks the same as the original."""
+        original = make_photo()
+        assert hamming_distance(dhash(original), dhash(ImagePreprocessor(max_dimension=1024)(original))) <= 2
+
+    def test_disabled_by_config(self):
+        assert ImagePreprocessor.from_config({'DETECTION_MAX_DIMENSION': 0}) is None
+        assert ImagePreprocessor.from_config({'DETECTION_MAX_DIMENSION': 800}).max_dimension == 800
+
+
+class TestDetectorPreprocessing:
+    """Tests for GoogleVisionDetector sending preprocessed images."""
+
+    @pytest.fixture(autouse=True)
+    def _vision(self):
+        pytest.importorskip('google.cloud.vision')
+
+    def test_vision_receives_downscaled_image(self, vision_detector):
+        vision_detector.preprocessor = ImagePreprocessor(max_dimension=1024)
+        original = make_photo()
+        detections = vision_detector.detect_from_bytes(original)
+
+        sent = vision_detector.client.annotate_image.call_args.kwargs['request'].image.content
+        assert Image.open(io.BytesIO(sent)).size == (1024, 768)
+        assert len(sent) < len(original)
+        assert {d['name'] for d in detections} == {'Chicken', 'Tomato'}
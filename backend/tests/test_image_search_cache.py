@@ -0,0 +1,112 @@
+"""Tests for the persistent image search cache."""
+
+from unittest.mock import MagicMock
+
+import pytest
+import requests
+
+from app.services.image_search_service import ImageSearchService
+from app.utils import disk_cache
+from app.utils.disk_cache import DiskCache, MISSING
+
+
+def _response(items):
+    resp = MagicMock()
+    resp.json.return_value = {'items': items} if items else {}
+    resp.raise_for_status.return_value = None
+    return resp
+
+
+@pytest.fixture
+def service(app, tmp_path):
+    """ImageSearchService with credentials, an on-disk cache and a stub session."""
+    app.config.update(
+        GOOGLE_API_KEY='key',
+        GOOGLE_SEARCH_ENGINE_ID='cx',
+        IMAGE_SEARCH_CACHE_PATH=str(tmp_path / 'image_search.sqlite'),
+        IMAGE_SEARCH_NEGATIVE_TTL=60
+    )
+    svc = ImageSearchService()
+    svc._session = MagicMock()
+    svc._session.get.return_value = _response([{'link': 'https://img.example/adobo.jpg'}])
+    return svc
+
+
+class TestDiskCache:
+    """Tests for the SQLite-backed DiskCache."""
+
+    def test_round_trip_and_none(self, tmp_path):
+        cache = DiskCache(str(tmp_path / 'c.sqlite'))
+        assert cache.get('a') is MISSING
+        cache.set('a', {'x': 1})
+        cache.set('b', None)
+        assert cache.get('a') == {'x': 1}
+        assert cache.get('b') is None
+        assert len(cache) == 2
+
+    def test_expiry(self, tmp_path, monkeypatch):
+        cache = DiskCache(str(tmp_path / 'c.sqlite'), ttl=10)
+        monkeypatch.setattr(disk_cache.time, 'time', lambda: 1000.0)
+        cache.set('a', 'value')
+        cache.set('b', 'short', ttl=1)
+        monkeypatch.setattr(disk_cache.time, 'time', lambda: 1005.0)
+        assert cache.get('a') == 'value'
+        assert cache.purge_expired() == 1
+        monkeypatch.setattr(disk_cache.time, 'time', lambda: 1011.0)
+        assert cache.get('a') is MISSING
+
+    def test_persists_across_instances(self, tmp_path):
+        path = str(tmp_path / 'c.sqlite')
+        DiskCache(path).set('a', 'value')
+        assert DiskCache(path).get('a') == 'value'
+
+
+class TestImageSearchCache:
+    """Tests for ImageSearchService.search_food_image caching."""
+
+    def test_repeat_lookup_skips_api(self, app, service):
+        with app.app_context():
+            first = service.search_food_image('Chicken Adobo', cuisine_type='Filipino')
+            second = service.search_food_image('chicken  adobo', cuisine_type='filipino')
+        assert first == second == 'https://img.example/adobo.jpg'
+        assert service._session.get.call_count == 1
+
+    def test_no_result_is_cached(self, app, service):
+        service._session.get.return_value = _response([])
+        with app.app_context():
+            assert service.search_food_image('Mystery Stew') is None
+            assert service.search_food_image('Mystery Stew') is None
+        assert service._session.get.call_count == 1
+
+    def test_negative_entries_expire_sooner(self, app, service, monkeypatch):
+        service._session.get.return_value = _response([])
+        monkeypatch.setattr(disk_cache.time, 'time', lambda: 1000.0)
+        with app.app_context():
+            service.search_food_image('Mystery Stew')
+            service._session.get.return_value = _response([{'link': 'https://img.example/stew.jpg'}])
+            monkeypatch.setattr(disk_cache.time, 'time', lambda: 1061.0)
+            assert service.search_food_image('Mystery Stew') == 'https://img.example/stew.jpg'
+        assert service._session.get.call_count == 2
+
+    def test_errors_are_not_cached(self, app, service):
+        service._session.get.side_effect = requests.exceptions.ConnectionError('down')
+        with app.app_context():
+            assert service.search_food_image('Sinigang') is None
+            service._session.get.side_effect = None
+            assert service.search_food_image('Sinigang') == 'https://img.example/adobo.jpg'
+        assert service._session.get.call_count == 2
+
+    def test_cache_survives_new_service(self, app, service):
+        with app.app_context():
+            service.search_food_image('Sinigang')
+            fresh = ImageSearchService()
+            fresh._session = MagicMock()
+            assert fresh.search_food_image('Sinigang') == 'https://img.example/adobo.jpg'
+        fresh._session.get.assert_not_called()
+
+    def test_session_retries_transient_errors(self, app):
+        with app.app_context():
+            session = ImageSearchService()._get_session()
+        retries = session.get_adapter('https://www.googleapis.com').max_retries
+        assert retries.total == 3
+        assert 429 in retries.status_forcelist
@@ -0,0 +1,136 @@
+"""Tests for concurrent image search against a local stub Custom Search server."""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from app.services.image_search_service import ImageSearchService
+from app.utils.rate_limiter import RateLimiter
+
+STUB_DELAY = 0.2
+
+
+class StubSearchServer(ThreadingHTTPServer):
+    """Custom Search stand-in that records concurrency and request count."""
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), StubSearchHandler)
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.requests = 0
+
+
+class StubSearchHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests += 1
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+
+        query = parse_qs(urlparse(self.path).query)['q'][0]
+        time.sleep(STUB_DELAY * (3 if 'slow' in query else 1))
+        if 'unknown' in query:
+            body = {}
+        else:
+            body = {'items': [{'link': f'http://stub/{query.replace(" ", "-")}.jpg'}]}
+
+        with server.lock:
+            server.in_flight -= 1
+
+        payload = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server(app, monkeypatch):
+    server = StubSearchServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setenv('NO_PROXY', '127.0.0.1,localhost')
+    app.config.update(
+        GOOGLE_API_KEY='key',
+        GOOGLE_SEARCH_ENGINE_ID='cx',
+        IMAGE_SEARCH_BASE_URL=f'http://127.0.0.1:{server.server_address[1]}/customsearch/v1',
+        IMAGE_SEARCH_MAX_WORKERS=3,
+        IMAGE_SEARCH_RATE_LIMIT=6000
+    )
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+class TestConcurrentImageSearch:
+    """Tests for search_multiple_food_images and iter_food_images."""
+
+    def test_runs_lookups_concurrently(self, app, stub_server):
+        names = [f'Dish {i}' for i in range(6)] + ['unknown dish']
+        with app.app_context():
+            start = time.monotonic()
+            results = ImageSearchService().search_multiple_food_images(names)
+            elapsed = time.monotonic() - start
+
+        assert set(results) == {f'Dish {i}' for i in range(6)}
+        assert results['Dish 0'] == 'http://stub/Dish-0-food.jpg'
+        assert 1 < stub_server.max_in_flight <= 3
+        assert elapsed < STUB_DELAY * len(names)
+
+    def test_generator_yields_in_completion_order(self, app, stub_server):
+        with app.app_context():
+            order = [name for name, _ in ImageSearchService().iter_food_images(['slow dish', 'Adobo', 'Sinigang'])]
+        assert order[-1] == 'slow dish'
+        assert sorted(order) == ['Adobo', 'Sinigang', 'slow dish']
+
+    def test_duplicate_names_are_looked_up_once(self, app, stub_server):
+        with app.app_context():
+            results = list(ImageSearchService().iter_food_images(['Adobo', 'Adobo', 'Sinigang']))
+        assert len(results) == 2
+        assert stub_server.requests == 2
+
+    def test_rate_limit_spaces_api_calls(self, app, stub_server):
+        # 10 calls/second with a burst of 3: six lookups need at least 0.3s of waiting
+        app.config['IMAGE_SEARCH_RATE_LIMIT'] = 600
+        with app.app_context():
+            start = time.monotonic()
+            ImageSearchService().search_multiple_food_images([f'Dish {i}' for i in range(6)])
+            elapsed = time.monotonic() - start
+        assert elapsed >= 0.3 + STUB_DELAY
+
+    def test_cached_lookups_skip_server(self, app, stub_server, tmp_path):
+        app.config['IMAGE_SEARCH_CACHE_PATH'] = str(tmp_path / 'image_search.sqlite')
+        names = ['Adobo', 'Sinigang', 'unknown dish']
+        with app.app_context():
+            service = ImageSearchService()
+            first = service.search_multiple_food_images(names)
+            second = service.search_multiple_food_images(names)
+        assert first == second
+        assert stub_server.requests == 3
+
+
+class TestRateLimiter:
+    """Tests for the token bucket RateLimiter."""
+
+    def test_burst_then_throttle(self):
+        limiter = RateLimiter(rate=10, per=1, burst=2)
+        assert limiter.acquire(timeout=0)
+        assert limiter.acquire(timeout=0)
+        assert not limiter.acquire(timeout=0)
+        assert limiter.acquire(timeout=0.5)
+
+    def test_rejects_non_positive_rate(self):
+        with pytest.raises(ValueError):
+            RateLimiter(rate=0)
@@ -0,0 +1,140 @@
+"""Parity tests for the compiled LabelMatcher against the linear label scan."""
+
+from datetime import datetime
+
+import pytest
+
+from app.ml.google_vision_detector import GoogleVisionDetector
+from app.ml.label_matcher import LabelMatcher
+from tests.label_corpus import build_label_corpus
+
+STATIC = GoogleVisionDetector.VISION_TO_INGREDIENT
+
+LEARNED = {
+    'leaf vegetable': 'Pechay',
+    'shellfish': 'Shrimp',
+    'chicken thighs': 'Chicken',
+    'citrus': 'Calamansi',
+    'noodle': 'Pancit Canton',
+    'root vegetable': 'Kamote',
+    'natural foods': None,
+}
+
+
+def linear_map(label, learned, static=STATIC):
+    """The original linear _map_to_ingredient scan, kept as the reference."""
+    valid = GoogleVisionDetector._is_valid_partial_match
+    label = label.lower().strip()
+    if label in learned:
+        return learned[label]
+    for key, value in learned.items():
+        if (key in label or label in key) and valid(key, label):
+            return value
+    if label in static:
+        return static[label]
+    for key, value in static.items():
+        if value is None:
+            continue
+        if (key in label or label in key) and valid(key, label):
+            return value
+    return None
+
+
+@pytest.fixture
+def detector():
+    det = GoogleVisionDetector.__new__(GoogleVisionDetector)
+    GoogleVisionDetector._learned_mappings_cache = {}
+    GoogleVisionDetector._cache_timestamp = None
+    return det
+
+
+class TestLabelMatcherParity:
+    """The compiled matcher must agree with the linear scan label for label."""
+
+    @pytest.mark.parametrize('learned', [{}, LEARNED], ids=['static', 'learned'])
+    def test_corpus_parity(self, detector, learned, monkeypatch):
+        monkeypatch.setattr(GoogleVisionDetector, '_get_learned_mappings', lambda self: learned)
+        corpus = build_label_corpus(STATIC) + build_label_corpus(learned)
+        mismatches = [
+            (label, detector._map_to_ingredient(label), linear_map(label, learned))
+            for label in corpus
+            if detector._map_to_ingredient(label) != linear_map(label, learned)
+        ]
+        assert not mismatches
+
+    def test_first_key_in_mapping_order_wins(self):
+        matcher = LabelMatcher({'green onion': 'Scallion', 'onion': 'Onion'})
+        assert matcher.match('chopped green onion') == (True, 'Scallion')
+        matcher = LabelMatcher({'onion': 'Onion', 'green onion': 'Scallion'})
+        assert matcher.match('chopped green onion') == (True, 'Onion')
+
+    def test_label_contained_in_longer_key(self):
+        matcher = LabelMatcher({'pineapple': 'Pineapple', 'sweet potato': 'Kamote'})
+        assert matcher.match('pineappl') == (True, 'Pineapple')   # ratio >= 0.7
+        assert matcher.match('appl') == (False, None)              # ratio guard
+        assert matcher.match('potato') == (True, 'Kamote')         # whole word
+
+    def test_none_values(self):
+        mapping = {'food': None, 'seafood': None, 'carrot': 'Carrot'}
+        assert LabelMatcher(mapping, skip_none_partials=True).match('food') == (True, None)
+        assert LabelMatcher(mapping, skip_none_partials=True).match('seafood platter') == (False, None)
+        assert LabelMatcher(mapping).match('seafood platter') == (True, None)
+
+    def test_word_boundaries_match_regex(self):
+        keys = ['egg', 'eggs', 'salt', "bird's eye", 'soy_sauce', 'café']
+        labels = ['salty', 'sea salt', "bird's eye chili", 'soy_sauce_bottle', 'café au lait', 'nutmeg salt-cured']
+        matcher = LabelMatcher({k: k for k in keys})
+        for label in labels:
+            expected = linear_map(label, {}, static={k: k for k in keys})
+            assert matcher.match(label)[1] == expected, label
+
+    def test_generic_labels_stay_unmapped(self, detector, monkeypatch):
+        monkeypatch.setattr(GoogleVisionDetector, '_get_learned_mappings', lambda self: {})
+        for label in ['food', 'dish', 'tableware', 'laptop', 'cuisine']:
+            assert detector._map_to_ingredient(label) is None
+
+
+class TestLearnedMatcherUpdates:
+    """Learned mapping changes reuse the compiled tables between recompiles."""
+
+    def test_rebind(self):
+        matcher = LabelMatcher({'leaf vegetable': 'Pechay', 'shellfish': 'Shrimp'})
+
+        changed = matcher.rebind({'leaf vegetable': 'Kangkong', 'shellfish': 'Shrimp'})
+        assert changed.match('green leaf vegetable') == (True, 'Kangkong')
+        assert changed.recompile() is changed
+
+        added = matcher.rebind({'leaf vegetable': 'Pechay', 'shellfish': 'Shrimp', 'root vegetable': 'Kamote'})
+        assert added.match('root vegetable') == (True, 'Kamote')
+        assert added.match('fresh root vegetable') == (False, None)  # Partial waits for recompile
+        assert added.recompile().match('fresh root vegetable') == (True, 'Kamote')
+
+        removed = matcher.rebind({'leaf vegetable': 'Pechay'})
+        assert removed.match('shellfish platter') == (False, None)
+
+    def test_feedback_does_not_recompile_every_change(self, detector, monkeypatch):
+        builds = []
+        original = LabelMatcher._build_automaton
+
+        def counting(self):
+            builds.append(len(self._keys))
+            original(self)
+
+        monkeypatch.setattr(LabelMatcher, '_build_automaton', counting)
+        monkeypatch.setattr(GoogleVisionDetector, '_sync_learned_mappings', classmethod(lambda cls, full=False: 0))
+        GoogleVisionDetector._learned_mappings_cache = dict(LEARNED)
+        GoogleVisionDetector._cache_timestamp = datetime.utcnow()
+        detector._map_to_ingredient('shellfish')
+        assert len(builds) == 1
+
+        for i in range(5):
+            GoogleVisionDetector._learned_mappings_cache = dict(GoogleVisionDetector._learned_mappings_cache,
+                                                                **{f'new label {i}': 'Tomato'})
+            assert detector._map_to_ingredient(f'new label {i}') == 'Tomato'
+        assert len(builds) == 1
+
+        GoogleVisionDetector._learned_matcher_compiled_at -= GoogleVisionDetector.LEARNED_SYNC_INTERVAL
+        assert detector._map_to_ingredient('fresh new label 4') == 'Tomato'
+        assert len(builds) == 2
+        detector._map_to_ingredient('shellfish')
+        assert len(builds) == 2
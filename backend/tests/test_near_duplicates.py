@@ -0,0 +1,130 @@
+"""Tests for reusing Vision annotations across near-duplicate photos."""
+
+import io
+import random
+
+import pytest
+
+from app.ml.near_duplicates import NearDuplicateIndex, dhash
+from app.utils.bktree import BKTree, hamming_distance
+
+Image = pytest.importorskip('PIL.Image')
+ImageEnhance = pytest.importorskip('PIL.ImageEnhance')
+
+
+def make_photo(seed, size=(320, 240), scale=1.0, brightness=1.0, quality=90):
+    """A JPEG of random coloured blocks, deterministic per seed."""
+    rng = random.Random(seed)
+    image = Image.new('RGB', size)
+    for _ in range(40):
+        x, y = rng.randrange(size[0]), rng.randrange(size[1])
+        color = tuple(rng.randrange(256) for _ in range(3))
+        image.paste(color, (x, y, x + rng.randrange(20, 120), y + rng.randrange(20, 120)))
+    if scale != 1.0:
+        image = image.resize((int(size[0] * scale), int(size[1] * scale)))
+    if brightness != 1.0:
+        image = ImageEnhance.Brightness(image).enhance(brightness)
+    buffer = io.BytesIO()
+    image.save(buffer, 'JPEG', quality=quality)
+    return buffer.getvalue()
+
+
+class TestBKTree:
+    """Tests for the BK-tree radius search."""
+
+    def test_search_matches_brute_force(self):
+        rng = random.Random(7)
+        keys = [rng.getrandbits(64) for _ in range(500)]
+        tree = BKTree()
+        for i, key in enumerate(keys):
+            tree.add(key, i)
+        assert len(tree) == 500
+
+        for probe in keys[:20] + [rng.getrandbits(64) for _ in range(20)]:
+            expected = sorted(i for i, key in enumerate(keys) if hamming_distance(probe, key) <= 24)
+            found = tree.search(probe, 24)
+            assert sorted(value for _, _, value in found) == expected
+            assert [d for d, _, _ in found] == sorted(d for d, _, _ in found)
+
+    def test_empty_tree(self):
+        assert BKTree().search(0, 5) == []
+
+
+class TestDHash:
+    """Tests for the difference hash."""
+
+    def test_stable_under_reencode_and_brightness(self):
+        original = dhash(make_photo(1))
+        assert hamming_distance(original, dhash(make_photo(1, quality=40))) <= 6
+        assert hamming_distance(original, dhash(make_photo(1, brightness=1.1))) <= 6
+        assert hamming_distance(original, dhash(make_photo(1, scale=2))) <= 6
+
+    def test_different_photos_differ(self):
+        assert hamming_distance(dhash(make_photo(1)), dhash(make_photo(2))) > 6
+
+    def test_undecodable_bytes(self):
+        assert dhash(b'not an image') is None
+
+
+class TestNearDuplicateIndex:
+    """Tests for the windowed, scoped index."""
+
+    def test_find_within_distance_and_scope(self):
+        index = NearDuplicateIndex(max_distance=4)
+        index.add(0b1111, {'labels': []}, scope=1)
+
+        assert index.find(0b0111, scope=1) == {'labels': []}
+        assert index.find(0b0111, scope=2) is None
+        assert index.find(0b1111 << 8, scope=1) is None
+
+    def test_entries_expire_after_window(self, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr('app.ml.near_duplicates.time.monotonic', lambda: now[0])
+        index = NearDuplicateIndex(window=60)
+        index.add(42, {'labels': []})
+
+        now[0] += 59
+        assert index.find(42) is not None
+        now[0] += 2
+        assert index.find(42) is None
+        assert len(index) == 0
+
+    def test_maxsize_evicts_oldest(self):
+        index = NearDuplicateIndex(max_distance=0, maxsize=3)
+        for key in range(5):
+            index.add(key << 16, {'key': key})
+
+        assert len(index) == 3
+        assert index.find(0) is None
+        assert index.find(4 << 16) == {'key': 4}
+
+    def test_disabled_by_config(self):
+        assert NearDuplicateIndex.from_config({'DETECTION_NEAR_DUPLICATE_WINDOW': 0}) is None
+        index = NearDuplicateIndex.from_config({'DETECTION_NEAR_DUPLICATE_WINDOW': 30})
+        assert index.window == 30
+
+
+class TestDetectorNearDuplicates:
+    """Tests for GoogleVisionDetector.detect_from_bytes with a NearDuplicateIndex."""
+
+    @pytest.fixture(autouse=True)
+    def _vision(self):
+        pytest.importorskip('google.cloud.vision')
+
+    def test_reshot_reuses_annotations(self, vision_detector):
+        vision_detector.near_duplicates = NearDuplicateIndex()
+        first = vision_detector.detect_from_bytes(make_photo(1), scope=1)
+        second = vision_detector.detect_from_bytes(make_photo(1, brightness=1.1), scope=1)
+
+        assert first == second
+        assert vision_detector.client.annotate_image.call_count == 1
+
+        vision_detector.detect_from_bytes(make_photo(2), scope=1)
+        assert vision_detector.client.annotate_image.call_count == 2
+
+    def test_not_shared_across_scopes(self, vision_detector):
+        vision_detector.near_duplicates = NearDuplicateIndex()
+        vision_detector.detect_from_bytes(make_photo(1), scope=1)
+        vision_detector.detect_from_bytes(make_photo(1, quality=60), scope=2)
+
+        assert vision_detector.client.annotate_image.call_count == 2
@@ -0,0 +1,117 @@
+"""Tests for the profile photo upload and serving pipeline."""
+
+import io
+import os
+
+import pytest
+
+from app.models import User
+
+Image = pytest.importorskip('PIL.Image')
+
+
+def _photo(width=1200, height=900, fmt='JPEG', filename='me.jpg'):
+    buf = io.BytesIO()
+    Image.new('RGB', (width, height), (30, 120, 200)).save(buf, format=fmt)
+    buf.seek(0)
+    return {'photo': (buf, filename)}
+
+
+@pytest.fixture
+def photo_dir(app, tmp_path):
+    app.config['PROFILE_PHOTO_DIR'] = str(tmp_path)
+    return tmp_path
+
+
+def _upload(client, headers, **kwargs):
+    return client.post('/api/users/profile/photo', headers=headers,
+                       data=_photo(**kwargs), content_type='multipart/form-data')
+
+
+class TestProfilePhotoUpload:
+    """Tests for POST /api/users/profile/photo."""
+
+    def test_stores_resized_sizes_by_hash(self, client, auth_headers, photo_dir):
+        resp = _upload(client, auth_headers)
+        assert resp.status_code == 200
+        user = resp.get_json()['user']
+        digest = user['profile_photo']
+        assert len(digest) == 64
+        assert user['profile_photo_urls']['md'] == f'/api/users/profile/photo/{digest}/md'
+
+        stored = os.listdir(photo_dir / digest[:2] / digest)
+        assert sorted(stored) == ['lg.webp', 'md.webp', 'sm.webp']
+        with Image.open(photo_dir / digest[:2] / digest / 'sm.webp') as img:
+            assert img.size == (64, 64)
+
+    def test_replacing_photo_removes_old_files(self, client, auth_headers, photo_dir):
+        first = _upload(client, auth_headers).get_json()['user']['profile_photo']
+        second = _upload(client, auth_headers, width=500, height=500).get_json()['user']['profile_photo']
+        assert first != second
+        assert not os.path.exists(photo_dir / first[:2] / first)
+        assert os.path.exists(photo_dir / second[:2] / second)
+
+    def test_rejects_non_image(self, client, auth_headers, photo_dir):
+        resp = client.post('/api/users/profile/photo', headers=auth_headers,
+                           data={'photo': (io.BytesIO(b'not an image'), 'me.jpg')},
+                           content_type='multipart/form-data')
+        assert resp.status_code == 400
+
+
+class TestProfilePhotoServing:
+    """Tests for serving stored profile photos."""
+
+    def test_content_route_is_immutable(self, client, auth_headers, photo_dir):
+        digest = _upload(client, auth_headers).get_json()['user']['profile_photo']
+        resp = client.get(f'/api/users/profile/photo/{digest}/lg')
+        assert resp.status_code == 200
+        assert resp.mimetype == 'image/webp'
+        assert 'immutable' in resp.headers['Cache-Control']
+        assert 'max-age=31536000' in resp.headers['Cache-Control']
+
+        with Image.open(io.BytesIO(resp.data)) as img:
+            assert img.size == (512, 512)
+
+        resp = client.get(f'/api/users/profile/photo/{digest}/lg',
+                          headers={'If-None-Match': resp.headers['ETag']})
+        assert resp.status_code == 304
+
+    def test_content_route_skips_database(self, app, client, auth_headers, photo_dir):
+        from sqlalchemy import event
+        from app import db
+
+        digest = _upload(client, auth_headers).get_json()['user']['profile_photo']
+        statements = []
+
+        def listener(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', listener)
+        try:
+            assert client.get(f'/api/users/profile/photo/{digest}/sm').status_code == 200
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', listener)
+        assert statements == []
+
+    def test_user_route_redirects_to_content(self, client, auth_headers, test_user, photo_dir):
+        digest = _upload(client, auth_headers).get_json()['user']['profile_photo']
+        resp = client.get(f'/api/users/profile/photo/{test_user.id}?size=sm')
+        assert resp.status_code == 302
+        assert resp.headers['Location'].endswith(f'/api/users/profile/photo/{digest}/sm')
+
+    def test_unknown_digest_or_size(self, client, auth_headers, photo_dir):
+        digest = _upload(client, auth_headers).get_json()['user']['profile_photo']
+        assert client.get(f'/api/users/profile/photo/{digest}/xl').status_code == 404
+        assert client.get(f'/api/users/profile/photo/{"0" * 64}/md').status_code == 404
+        assert client.get('/api/users/profile/photo/../../etc/md').status_code == 404
+
+    def test_legacy_path_still_served(self, client, test_user, db_session, tmp_path):
+        legacy = tmp_path / 'user_1.png'
+        Image.new('RGB', (10, 10)).save(legacy)
+        test_user.profile_photo = str(legacy)
+        db_session.commit()
+
+        resp = client.get(f'/api/users/profile/photo/{test_user.id}')
+        assert resp.status_code == 200
+        assert resp.mimetype == 'image/png'
+        assert db_session.get(User, test_user.id).to_dict()['profile_photo_urls'] is None
@@ -0,0 +1,197 @@
+"""
+EXPLAIN-based regression tests for hot query paths.
+
+Each test drives a real endpoint or service against a large seeded
+catalog, captures the SELECTs it issues and runs EXPLAIN on them. A full
+table scan of any hot table fails the test, so a dropped index or a
+query rewritten into an unindexable shape shows up here.
+"""
+
+import json
+import random
+import re
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from app import db
+from app.models import Ingredient, MealPlan, Recipe, RecipeIngredient, User, UserPantry
+from app.ml.recipe_recommender import RecipeRecommender
+from app.services.recipe_serializer import load_ingredient_lines
+from flask_jwt_extended import create_access_token
+
+HOT_TABLES = {'recipes', 'recipe_ingredients', 'ingredients', 'meal_plans', 'user_pantry'}
+
+NUM_INGREDIENTS = 400
+NUM_RECIPES = 3000
+LINES_PER_RECIPE = 8
+NUM_USERS = 20
+MEAL_PLANS_PER_USER = 200
+CUISINES = ['Filipino', 'Italian', 'Chinese', 'Japanese', 'Mexican', 'Indian', 'Thai', 'French']
+
+
+@pytest.fixture
+def large_catalog(db_session):
+    """Seed a catalog large enough for the planner to prefer indexes."""
+    rng = random.Random(42)
+    now = datetime.utcnow()
+
+    db_session.execute(db.insert(Ingredient), [
+        {'name': f'Ingredient {i}', 'category': 'test', 'created_at': now, 'updated_at': now}
+        for i in range(NUM_INGREDIENTS)
+    ])
+    db_session.execute(db.insert(Recipe), [
+        {
+            'name': f'Recipe {i}',
+            'cuisine_type': CUISINES[i % len(CUISINES)],
+            'meal_type': 'lunch',
+            'total_time': rng.randint(5, 180),
+            'rating': round(rng.uniform(0, 5), 2),
+            'created_at': now,
+        }
+        for i in range(NUM_RECIPES)
+    ])
+    ingredient_ids = [row[0] for row in db_session.query(Ingredient.id).all()]
+    recipe_ids = [row[0] for row in db_session.query(Recipe.id).all()]
+
+    db_session.execute(db.insert(RecipeIngredient), [
+        {'recipe_id': recipe_id, 'ingredient_id': ingredient_id, 'quantity': 1, 'unit': 'g'}
+        for recipe_id in recipe_ids
+        for ingredient_id in rng.sample(ingredient_ids, LINES_PER_RECIPE)
+    ])
+
+    users = []
+    for i in range(NUM_USERS):
+        user = User(email=f'user{i}@eatease.com', username=f'user{i}', password_hash='x')
+        db_session.add(user)
+        users.append(user)
+    db_session.flush()
+
+    start = date(2026, 1, 1)
+    db_session.execute(db.insert(MealPlan), [
+        {
+            'user_id': user.id,
+            'recipe_id': rng.choice(recipe_ids),
+            'planned_date': start + timedelta(days=rng.randint(0, 365)),
+            'user_rating': rng.choice([None, 1, 2, 3, 4, 5]),
+            'created_at': now,
+        }
+        for user in users
+        for _ in range(MEAL_PLANS_PER_USER)
+    ])
+    db_session.execute(db.insert(UserPantry), [
+        {'user_id': user.id, 'ingredient_id': ingredient_id}
+        for user in users
+        for ingredient_id in rng.sample(ingredient_ids, 30)
+    ])
+    db_session.commit()
+    db_session.execute(db.text('ANALYZE'))
+
+    return {'users': users, 'recipe_ids': recipe_ids}
+
+
+@contextmanager
+def capture_selects():
+    """Capture (statement, parameters) for every SELECT executed."""
+    captured = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(('SELECT', 'WITH')):
+            captured.append((statement, parameters))
+
+    engine = db.engine
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield captured
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+
+def explain(statement, parameters):
+    """Return the query plan lines for a statement on the current dialect."""
+    connection = db.session.connection()
+    if connection.dialect.name == 'sqlite':
+        rows = connection.exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters).fetchall()
+        return [row[-1] for row in rows]
+    rows = connection.exec_driver_sql(f'EXPLAIN {statement}', parameters).fetchall()
+    return [row[0] for row in rows]
+
+
+def sequential_scans(plan_lines):
+    """Names of hot tables read with a full scan in a plan."""
+    scans = set()
+    for line in plan_lines:
+        # SQLite: "SCAN recipes" / "SCAN recipes USING COVERING INDEX ..."
+        # PostgreSQL: "Seq Scan on recipes"
+        match = re.search(r'(?:^|\s)SCAN (\w+)', line) or re.search(r'Seq Scan on (\w+)', line)
+        if match and match.group(1) in HOT_TABLES:
+            scans.add(match.group(1))
+    return scans
+
+
+def assert_no_seq_scans(captured):
+    assert captured, 'No SELECT statements were captured'
+    for statement, parameters in captured:
+        plan = explain(statement, parameters)
+        scans = sequential_scans(plan)
+        assert not scans, f'Sequential scan on {scans}:\n{statement}\n' + '\n'.join(plan)
+
+
+def _headers(user):
+    return {'Authorization': f'Bearer {create_access_token(identity=str(user.id))}'}
+
+
+class TestHotQueryPlans:
+    """Hot query paths must be index-driven."""
+
+    def test_search_recipes(self, client, large_catalog):
+        with capture_selects() as captured:
+            resp = client.post('/api/recipes/search',
+                               data=json.dumps({'ingredients': ['ingredient 1', 'Ingredient 2']}),
+                               content_type='application/json')
+        assert resp.status_code == 200
+        assert_no_seq_scans(captured)
+
+    def test_load_ingredient_lines(self, app, large_catalog):
+        recipe_ids = large_catalog['recipe_ids'][:20]
+        with capture_selects() as captured:
+            lines = load_ingredient_lines(recipe_ids)
+        assert len(lines) == 20
+        assert_no_seq_scans(captured)
+
+    def test_recipes_by_cuisine(self, client, large_catalog):
+        with capture_selects() as captured:
+            resp = client.get('/api/recipes/recommend/cuisine/Thai?limit=10')
+        assert resp.status_code == 200
+        assert_no_seq_scans(captured)
+
+    def test_quick_recipes(self, app, large_catalog):
+        with capture_selects() as captured:
+            RecipeRecommender().recommend_quick_recipes(max_time=10, limit=10)
+        assert_no_seq_scans(captured)
+
+    def test_meal_plans_by_date_range(self, client, large_catalog):
+        user = large_catalog['users'][0]
+        with capture_selects() as captured:
+            resp = client.get('/api/users/meal-plans?start_date=2026-03-01&end_date=2026-03-31',
+                              headers=_headers(user))
+        assert resp.status_code == 200
+        assert_no_seq_scans(captured)
+
+    def test_recipe_rating_history(self, app, large_catalog):
+        recipe_id = large_catalog['recipe_ids'][0]
+        with capture_selects() as captured:
+            db.session.query(db.func.sum(MealPlan.user_rating), db.func.count(MealPlan.id)).filter(
+                MealPlan.recipe_id == recipe_id,
+                MealPlan.user_rating.isnot(None)
+            ).one()
+        assert_no_seq_scans(captured)
+
+    def test_user_pantry(self, client, large_catalog):
+        user = large_catalog['users'][0]
+        with capture_selects() as captured:
+            resp = client.get('/api/users/pantry', headers=_headers(user))
+        assert resp.status_code == 200
+        assert_no_seq_scans(captured)
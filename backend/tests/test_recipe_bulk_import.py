@@ -0,0 +1,133 @@
+"""Integration tests for POST /api/recipes/bulk endpoint."""
+
+import json
+
+from app.models import Recipe, RecipeIngredient
+
+
+def _bulk(client, headers, recipes):
+    return client.post('/api/recipes/bulk',
+                       headers=headers,
+                       data=json.dumps({'recipes': recipes}),
+                       content_type='application/json')
+
+
+class TestBulkImport:
+    """Tests for bulk recipe import with nested ingredient lines."""
+
+    def test_bulk_requires_auth(self, client):
+        """Returns 401 without JWT token."""
+        resp = client.post('/api/recipes/bulk', data=json.dumps({'recipes': []}),
+                           content_type='application/json')
+        assert resp.status_code == 401
+
+    def test_bulk_requires_recipes(self, client, auth_headers):
+        """Returns 400 for a missing or empty recipes array."""
+        resp = _bulk(client, auth_headers, [])
+        assert resp.status_code == 400
+
+    def test_bulk_creates_recipes_with_ingredients(self, client, auth_headers, sample_ingredients):
+        """Ingredients resolve by id or case-insensitive name."""
+        chicken = next(i for i in sample_ingredients if i.name == 'Chicken')
+        resp = _bulk(client, auth_headers, [
+            {
+                'name': 'Tinola',
+                'cuisine_type': 'Filipino',
+                'ingredients': [
+                    {'ingredient_id': chicken.id, 'quantity': 500, 'unit': 'g'},
+                    {'name': 'garlic', 'quantity': 3, 'unit': 'cloves', 'preparation': 'minced'},
+                ]
+            },
+            {'name': 'Plain Rice', 'is_vegan': True},
+        ])
+
+        assert resp.status_code == 201
+        body = resp.get_json()
+        assert body['created_count'] == 2
+        assert body['errors'] is None
+
+        tinola = Recipe.query.filter_by(name='Tinola').first()
+        lines = RecipeIngredient.query.filter_by(recipe_id=tinola.id).all()
+        assert sorted(line.ingredient.name for line in lines) == ['Chicken', 'Garlic']
+        assert tinola.servings == 1
+        assert Recipe.query.filter_by(name='Plain Rice').first().is_vegan is True
+
+        created_ids = {c['name']: c['id'] for c in body['created']}
+        assert created_ids['Tinola'] == tinola.id
+
+    def test_bulk_reports_per_item_errors(self, client, auth_headers, sample_ingredients):
+        """Invalid items are reported by index; valid ones are still created."""
+        resp = _bulk(client, auth_headers, [
+            {'name': 'Good', 'ingredients': [{'name': 'Onion', 'quantity': 1, 'unit': 'pc'}]},
+            {'description': 'no name'},
+            {'name': 'Unknown Ingredient', 'ingredients': [{'name': 'Unobtainium', 'quantity': 1, 'unit': 'g'}]},
+            {'name': 'Missing Unit', 'ingredients': [{'name': 'Onion', 'quantity': 1}]},
+            {'name': 'Bad Id', 'ingredients': [{'ingredient_id': 9999, 'quantity': 1, 'unit': 'g'}]},
+        ])
+
+        assert resp.status_code == 201
+        body = resp.get_json()
+        assert body['created_count'] == 1
+        assert [e['index'] for e in body['errors']] == [1, 2, 3, 4]
+        assert 'Unobtainium' in body['errors'][1]['error']
+        assert Recipe.query.count() == 1
+
+    def test_bulk_all_invalid(self, client, auth_headers):
+        """Returns 400 when no item is valid."""
+        resp = _bulk(client, auth_headers, [{'description': 'no name'}])
+        assert resp.status_code == 400
+        assert resp.get_json()['errors'][0]['index'] == 0
+
+    def test_bulk_reports_wrong_field_types(self, client, auth_headers, sample_ingredients):
+        """Wrong-typed recipe fields fail their item, not the whole import."""
+        resp = _bulk(client, auth_headers, [
+            {'name': 'Good', 'servings': 4, 'calories': 250},
+            {'name': 'Bad Servings', 'servings': 'four'},
+            {'name': 'Bad Flag', 'is_vegan': 'yes'},
+            {'name': 'Bad Steps', 'instructions': {'1': 'Boil'}},
+            {'name': 'x' * 201},
+            {'name': 'Bad Lines', 'ingredients': 7},
+        ])
+
+        assert resp.status_code == 201
+        body = resp.get_json()
+        assert body['created_count'] == 1
+        assert [e['index'] for e in body['errors']] == [1, 2, 3, 4, 5]
+        assert "'servings' must be an integer" in body['errors'][0]['error']
+        assert Recipe.query.count() == 1
+
+    def test_bulk_reports_invalid_ingredient_lines(self, client, auth_headers, sample_ingredients):
+        """Bad unit, preparation or quantity values fail their item, not the whole import."""
+        def line(**fields):
+            return dict({'name': 'Onion', 'quantity': 1, 'unit': 'pc'}, **fields)
+
+        resp = _bulk(client, auth_headers, [
+            {'name': 'Good', 'ingredients': [line(preparation='sliced')]},
+            {'name': 'Dict Unit', 'ingredients': [line(unit={'a': 1})]},
+            {'name': 'Long Unit', 'ingredients': [line(unit='u' * 21)]},
+            {'name': 'Blank Unit', 'ingredients': [line(unit='  ')]},
+            {'name': 'List Preparation', 'ingredients': [line(preparation=['minced'])]},
+            {'name': 'Long Preparation', 'ingredients': [line(preparation='p' * 101)]},
+            {'name': 'NaN Quantity', 'ingredients': [line(quantity='nan')]},
+            {'name': 'Infinite Quantity', 'ingredients': [line(quantity='inf')]},
+        ])
+
+        assert resp.status_code == 201
+        body = resp.get_json()
+        assert body['created_count'] == 1
+        assert [e['index'] for e in body['errors']] == [1, 2, 3, 4, 5, 6, 7]
+        assert 'at most 20 characters' in body['errors'][1]['error']
+        assert 'finite quantity' in body['errors'][5]['error']
+        assert RecipeIngredient.query.count() == 1
+
+    def test_bulk_rejects_non_integer_ingredient_id(self, client, auth_headers, sample_ingredients):
+        """A list or dict ingredient_id is a per-item 400, not a server error."""
+        resp = _bulk(client, auth_headers, [
+            {'name': 'List Id', 'ingredients': [{'ingredient_id': [1], 'quantity': 1, 'unit': 'g'}]},
+            {'name': 'Dict Id', 'ingredients': [{'ingredient_id': {'id': 1}, 'quantity': 1, 'unit': 'g'}]},
+        ])
+
+        assert resp.status_code == 400
+        errors = resp.get_json()['errors']
+        assert [e['index'] for e in errors] == [0, 1]
+        assert all('integer ingredient_id' in e['error'] for e in errors)
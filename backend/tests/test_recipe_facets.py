@@ -0,0 +1,50 @@
+"""Integration tests for GET /api/recipes/facets endpoint."""
+
+from app.models import Recipe
+from app.services.catalog_cache import facets_cache
+
+
+class TestRecipeFacets:
+    """Tests for grouped facet counts."""
+
+    def test_facet_counts(self, client, sample_recipes, db_session):
+        """Counts per facet reflect the whole catalog."""
+        db_session.add(Recipe(name='Halo-Halo', cuisine_type='Filipino', meal_type='snack',
+                              difficulty_level='medium', total_time=90, is_vegetarian=True,
+                              is_gluten_free=True))
+        db_session.add(Recipe(name='Pasta', cuisine_type='Italian', meal_type='dinner',
+                              total_time=10, is_vegan=True, is_vegetarian=True))
+        db_session.commit()
+
+        resp = client.get('/api/recipes/facets')
+        assert resp.status_code == 200
+        body = resp.get_json()
+
+        assert body['total'] == 5
+        facets = body['facets']
+        assert facets['cuisine_type'] == {'Filipino': 4, 'Italian': 1}
+        assert facets['meal_type'] == {'lunch': 3, 'snack': 1, 'dinner': 1}
+        assert facets['difficulty_level'] == {'easy': 3, 'medium': 1}
+        assert facets['dietary'] == {'is_vegetarian': 3, 'is_vegan': 1,
+                                     'is_gluten_free': 1, 'is_dairy_free': 0}
+        assert facets['total_time'] == {'0-15': 1, '16-30': 3, '31-60': 0, '60+': 1}
+
+    def test_facets_respect_filters(self, client, sample_recipes):
+        """Counts are computed for the current filter set."""
+        body = client.get('/api/recipes/facets?is_vegetarian=1').get_json()
+        assert body['total'] == 1
+        assert body['facets']['cuisine_type'] == {'Filipino': 1}
+
+    def test_facets_cached_until_catalog_changes(self, client, sample_recipes, db_session):
+        """Results are cached per catalog version and refreshed after writes."""
+        db_session.commit()
+        client.get('/api/recipes/facets')
+        assert len(facets_cache) == 1
+
+        db_session.add(Recipe(name='Lumpia', cuisine_type='Filipino', total_time=45))
+        db_session.commit()
+        assert len(facets_cache) == 0
+
+        body = client.get('/api/recipes/facets').get_json()
+        assert body['total'] == 4
+        assert body['facets']['total_time']['31-60'] == 1
@@ -0,0 +1,126 @@
+"""Tests for incremental recipe rating aggregation."""
+
+import json
+from datetime import date
+
+import pytest
+
+from app import db
+from app.models import MealPlan, Recipe, User
+from flask_jwt_extended import create_access_token
+
+
+def _rate(client, headers, recipe_id, rating):
+    return client.post(f'/api/recipes/{recipe_id}/rate',
+                       headers=headers,
+                       data=json.dumps({'rating': rating}),
+                       content_type='application/json')
+
+
+@pytest.fixture
+def other_headers(app, db_session):
+    """Auth headers for a second user."""
+    user = User(email='other@eatease.com', username='otheruser')
+    user.set_password('otherpassword123')
+    db_session.add(user)
+    db_session.flush()
+    return {'Authorization': f'Bearer {create_access_token(identity=str(user.id))}'}
+
+
+class TestRateRecipe:
+    """Tests for POST /api/recipes/<id>/rate."""
+
+    def test_first_ratings_accumulate(self, client, auth_headers, other_headers, sample_recipes):
+        """Each new rater adds to the sum and count."""
+        recipe_id = sample_recipes[0].id
+        _rate(client, auth_headers, recipe_id, 5)
+        resp = _rate(client, other_headers, recipe_id, 2)
+
+        body = resp.get_json()['recipe']
+        assert body['rating_count'] == 2
+        assert body['rating'] == 3.5
+
+        recipe = db.session.get(Recipe, recipe_id)
+        assert recipe.rating_sum == 7
+
+    def test_rerating_applies_delta(self, client, auth_headers, other_headers, sample_recipes):
+        """Re-rating by the same user replaces their rating, not adds to it."""
+        recipe_id = sample_recipes[0].id
+        _rate(client, auth_headers, recipe_id, 5)
+        _rate(client, other_headers, recipe_id, 4)
+        resp = _rate(client, auth_headers, recipe_id, 1)
+
+        body = resp.get_json()['recipe']
+        assert body['rating_count'] == 2
+        assert body['rating'] == 2.5
+
+    def test_concurrent_rerating_applies_delta_once(self, client, auth_headers, sample_recipes, monkeypatch):
+        """A re-rating that lost a race re-reads the old rating before applying its delta."""
+        recipe_id = sample_recipes[0].id
+        _rate(client, auth_headers, recipe_id, 5)
+        original = MealPlan.replace_rating.__func__
+        raced = []
+
+        def racing(cls, meal_plan_id, expected_rating, rating, **values):
+            if not raced:
+                # Another request re-rates 5 -> 2 between our read and write
+                raced.append(True)
+                original(cls, meal_plan_id, expected_rating, 2)
+                Recipe.apply_rating_delta(recipe_id, 2 - expected_rating, 0)
+            return original(cls, meal_plan_id, expected_rating, rating, **values)
+
+        monkeypatch.setattr(MealPlan, 'replace_rating', classmethod(racing))
+        resp = _rate(client, auth_headers, recipe_id, 4)
+
+        assert resp.status_code == 200
+        recipe = db.session.get(Recipe, recipe_id)
+        db.session.refresh(recipe)
+        assert (recipe.rating_sum, recipe.rating_count) == (4, 1)
+
+    def test_rating_rounded(self, client, auth_headers, other_headers, sample_recipes, db_session):
+        """Average is rounded to two decimals."""
+        recipe_id = sample_recipes[0].id
+        _rate(client, auth_headers, recipe_id, 5)
+        _rate(client, other_headers, recipe_id, 4)
+        third = User(email='third@eatease.com', username='third')
+        third.set_password('thirdpassword123')
+        db_session.add(third)
+        db_session.commit()
+        headers = {'Authorization': f'Bearer {create_access_token(identity=str(third.id))}'}
+
+        body = _rate(client, headers, recipe_id, 5).get_json()['recipe']
+        assert body['rating'] == 4.67
+
+    def test_delete_meal_plan_removes_rating(self, client, auth_headers, other_headers, sample_recipes):
+        """Deleting a rated meal plan subtracts its rating."""
+        recipe_id = sample_recipes[0].id
+        _rate(client, auth_headers, recipe_id, 5)
+        _rate(client, other_headers, recipe_id, 3)
+
+        meal_plan = MealPlan.query.filter_by(recipe_id=recipe_id, user_rating=5).first()
+        client.delete(f'/api/users/meal-plans/{meal_plan.id}', headers=auth_headers)
+
+        recipe = db.session.get(Recipe, recipe_id)
+        assert recipe.rating_count == 1
+        assert recipe.rating == 3
+
+
+class TestReconcileRatings:
+    """Tests for the `flask recipes reconcile-ratings` command."""
+
+    def test_reconcile_rebuilds_from_history(self, app, sample_recipes, test_user, db_session):
+        """Aggregates drifted from history are rebuilt."""
+        adobo, salad, _ = sample_recipes
+        for rating in (4, 5):
+            db_session.add(MealPlan(user_id=test_user.id, recipe_id=adobo.id,
+                                    planned_date=date.today(), user_rating=rating))
+        adobo.rating_sum, adobo.rating_count, adobo.rating = 100, 3, 1.0
+        salad.rating_count = 7
+        db_session.commit()
+
+        result = app.test_cli_runner().invoke(args=['recipes', 'reconcile-ratings'])
+        assert 'Reconciled rating aggregates for 3 recipes' in result.output
+
+        db_session.expire_all()
+        assert (adobo.rating_sum, adobo.rating_count, adobo.rating) == (9, 2, 4.5)
+        assert (salad.rating_sum, salad.rating_count, salad.rating) == (0, 0, 0)
@@ -0,0 +1,110 @@
+"""Integration tests for POST /api/recipes/search endpoint."""
+
+import json
+
+from app.models import Ingredient, RecipeIngredient
+from app.services.catalog_cache import search_cache
+
+
+def _search(client, **body):
+    return client.post('/api/recipes/search',
+                       data=json.dumps(body),
+                       content_type='application/json')
+
+
+class TestSearchRecipes:
+    """Tests for SQL-ranked, paginated ingredient search."""
+
+    def test_search_requires_ingredients(self, client):
+        """Returns 400 when the ingredients list is missing."""
+        resp = _search(client)
+        assert resp.status_code == 400
+
+    def test_search_unknown_ingredients(self, client, sample_recipes):
+        """Unknown ingredient names return an empty page."""
+        resp = _search(client, ingredients=['Unobtainium'])
+        assert resp.status_code == 200
+        body = resp.get_json()
+        assert body['recipes'] == []
+        assert body['total'] == 0
+
+    def test_search_ranks_by_match_percentage(self, client, sample_recipes):
+        """Recipes are ordered by match percentage computed in SQL."""
+        resp = _search(client, ingredients=['chicken', 'GARLIC'])
+        body = resp.get_json()
+
+        names = [r['name'] for r in body['recipes']]
+        assert names == ['Chicken Adobo', 'Pineapple Chicken']
+        assert body['total'] == 2
+
+        adobo = body['recipes'][0]
+        assert adobo['matching_ingredients'] == 2
+        assert adobo['total_ingredients'] == 3
+        assert adobo['match_percentage'] == 66.67
+        assert len(adobo['ingredients']) == 3
+
+    def test_search_paginates(self, client, sample_recipes):
+        """per_page/page limit the serialized results."""
+        resp = _search(client, ingredients=['Onion', 'Tomato'], per_page=1, page=2)
+        body = resp.get_json()
+
+        assert body['total'] == 3
+        assert body['pages'] == 3
+        assert body['page'] == 2
+        assert len(body['recipes']) == 1
+        assert body['recipes'][0]['name'] == 'Chicken Adobo'
+
+    def test_search_dietary_filter(self, client, sample_recipes):
+        """Dietary preferences filter the ranked results."""
+        resp = _search(client, ingredients=['Onion'],
+                       dietary_preferences={'is_vegetarian': True})
+        body = resp.get_json()
+        assert [r['name'] for r in body['recipes']] == ['Tomato Salad']
+
+    def test_search_invalid_pagination(self, client, sample_recipes):
+        """Non-integer pagination values return 400."""
+        resp = _search(client, ingredients=['Onion'], page='two')
+        assert resp.status_code == 400
+
+
+class TestSearchCache:
+    """Tests for the normalized-query search result cache."""
+
+    def test_normalized_queries_share_cache_entry(self, client, sample_recipes):
+        """Ingredient order, case and duplicates don't change the cache key."""
+        _search(client, ingredients=['Chicken', 'garlic'])
+        assert len(search_cache) == 1
+
+        resp = _search(client, ingredients=['GARLIC', 'chicken', 'Chicken'])
+        assert resp.status_code == 200
+        assert len(search_cache) == 1
+        assert resp.get_json()['total'] == 2
+
+    def test_dietary_flags_are_part_of_key(self, client, sample_recipes):
+        """Different dietary filters are cached separately."""
+        _search(client, ingredients=['Onion'])
+        _search(client, ingredients=['Onion'], dietary_preferences={'is_vegetarian': True})
+        assert len(search_cache) == 2
+
+    def test_recipe_write_invalidates(self, client, auth_headers, sample_recipes, db_session):
+        """Committing a recipe ingredient line clears cached results."""
+        _search(client, ingredients=['Pineapple'])
+        assert len(search_cache) == 1
+
+        tomato_salad = sample_recipes[1]
+        pineapple = Ingredient.query.filter_by(name='Pineapple').first()
+        db_session.add(RecipeIngredient(recipe_id=tomato_salad.id, ingredient_id=pineapple.id,
+                                        quantity=1, unit='pieces'))
+        db_session.commit()
+        assert len(search_cache) == 0
+
+        body = _search(client, ingredients=['Pineapple']).get_json()
+        assert body['total'] == 2
+
+    def test_recipe_view_does_not_invalidate(self, client, sample_recipes, db_session):
+        """Bumping view_count on GET /api/recipes/<id> keeps the cache."""
+        db_session.commit()
+        _search(client, ingredients=['Onion'])
+
+        client.get(f'/api/recipes/{sample_recipes[0].id}')
+        assert len(search_cache) == 1
@@ -0,0 +1,124 @@
+"""Tests for the batch-loading recipe serializer layer."""
+
+import json
+from contextlib import contextmanager
+from datetime import date
+
+from sqlalchemy import event
+
+from app import db
+from app.models import MealPlan
+from app.services.recipe_serializer import (
+    load_ingredient_lines, serialize_meal_plans, serialize_recipes
+)
+
+
+@contextmanager
+def count_queries():
+    """Count SQL statements executed on the app engine."""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    engine = db.engine
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+
+class TestRecipeSerializer:
+    """Tests for serialize_recipes / load_ingredient_lines."""
+
+    def test_ingredient_lines_shape(self, sample_recipes):
+        """Lines match the RecipeIngredient.to_dict shape."""
+        adobo = sample_recipes[0]
+        lines = load_ingredient_lines([adobo.id])[adobo.id]
+
+        assert [line['ingredient_name'] for line in lines] == ['Chicken', 'Garlic', 'Onion']
+        first = lines[0]
+        assert set(first) == {'id', 'ingredient_id', 'ingredient_name', 'ingredient',
+                              'quantity', 'unit', 'preparation', 'is_optional'}
+        assert first['ingredient']['category'] == 'Protein'
+        assert first['ingredient']['nutrition']['calories'] == 239
+
+    def test_serialize_recipes_single_line_query(self, sample_recipes, db_session):
+        """All recipes' ingredient lines are loaded with one query."""
+        db_session.commit()
+        with count_queries() as statements:
+            results = serialize_recipes(sample_recipes)
+
+        # One query for lines (plus at most one refresh of expired recipes)
+        line_queries = [s for s in statements if 'recipe_ingredients' in s]
+        assert len(line_queries) == 1
+        assert [len(r['ingredients']) for r in results] == [3, 2, 4]
+
+    def test_to_dict_delegates_to_serializer(self, sample_recipes):
+        """Recipe.to_dict produces the serializer output."""
+        recipe = sample_recipes[2]
+        assert recipe.to_dict() == serialize_recipes([recipe])[0]
+        assert 'ingredients' not in recipe.to_dict(include_ingredients=False)
+
+    def test_serialize_meal_plans(self, sample_recipes, test_user, db_session):
+        """Meal plans embed their recipe without ingredients."""
+        plan = MealPlan(user_id=test_user.id, recipe_id=sample_recipes[0].id,
+                        planned_date=date(2026, 1, 5), meal_type='dinner')
+        db_session.add(plan)
+        db_session.flush()
+
+        data = serialize_meal_plans([plan])[0]
+        assert data['planned_date'] == '2026-01-05'
+        assert data['recipe']['name'] == 'Chicken Adobo'
+        assert 'ingredients' not in data['recipe']
+        assert plan.to_dict() == data
+
+
+class TestEndpointsUseSerializer:
+    """Endpoints return serializer output."""
+
+    def test_recommendations_include_ingredients(self, client, auth_headers, sample_recipes):
+        """Personalized recommendations embed ingredients and match info."""
+        resp = client.post('/api/recipes/recommend', headers=auth_headers,
+                           data=json.dumps({'ingredients': ['Chicken', 'Garlic']}),
+                           content_type='application/json')
+        assert resp.status_code == 200
+        top = resp.get_json()['recommendations'][0]['recipe']
+        assert top['name'] == 'Chicken Adobo'
+        assert len(top['ingredients']) == 3
+        assert top['matching_ingredients'] == 2
+
+    def test_recommendations_serialize_only_returned(self, client, auth_headers, sample_recipes, monkeypatch):
+        """Only the top `limit` recipes are serialized."""
+        import app.ml.recipe_recommender as recommender_module
+        serialized = []
+        original = recommender_module.serialize_recipes
+
+        def spy(recipes, **kwargs):
+            serialized.append(len(recipes))
+            return original(recipes, **kwargs)
+
+        monkeypatch.setattr(recommender_module, 'serialize_recipes', spy)
+        resp = client.post('/api/recipes/recommend', headers=auth_headers,
+                           data=json.dumps({'limit': 1, 'min_match_percentage': 0}),
+                           content_type='application/json')
+        assert len(resp.get_json()['recommendations']) == 1
+        assert serialized == [1]
+
+    def test_quick_recommendations(self, client, sample_recipes):
+        """Quick recommendations serialize with ingredients."""
+        resp = client.get('/api/recipes/recommend/quick?max_time=30')
+        recs = resp.get_json()['recommendations']
+        assert len(recs) == 3
+        assert all('ingredients' in r['recipe'] for r in recs)
+
+    def test_meal_plans_endpoint(self, client, auth_headers, sample_recipes, test_user, db_session):
+        """GET /api/users/meal-plans serializes plans with recipes."""
+        db_session.add(MealPlan(user_id=test_user.id, recipe_id=sample_recipes[1].id,
+                                planned_date=date(2026, 1, 5)))
+        db_session.commit()
+
+        resp = client.get('/api/users/meal-plans', headers=auth_headers)
+        plans = resp.get_json()['meal_plans']
+        assert plans[0]['recipe']['name'] == 'Tomato Salad'
@@ -0,0 +1,227 @@
+"""Tests for GET /api/recipes/<id>/image/thumb."""
+
+import io
+import os
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from unittest.mock import MagicMock
+
+import pytest
+import requests
+
+from app import db
+from app.services.thumbnail_service import thumbnail_service
+from app.utils.urls import PublicHTTPAdapter, check_public_url
+
+Image = pytest.importorskip('PIL.Image')
+
+
+def _jpeg(width=800, height=600):
+    buf = io.BytesIO()
+    Image.new('RGB', (width, height), (200, 80, 40)).save(buf, format='JPEG')
+    return buf.getvalue()
+
+
+def _addresses(*ips):
+    return lambda host, port, **kwargs: [(socket.AF_INET, socket.SOCK_STREAM, 6, '', (ip, port)) for ip in ips]
+
+
+@pytest.fixture
+def thumbnails(app, tmp_path, monkeypatch):
+    """Point thumbnail storage at tmp_path and stub DNS and the image download."""
+    app.config['THUMBNAIL_DIR'] = str(tmp_path)
+    monkeypatch.setattr('app.utils.urls.socket.getaddrinfo', _addresses('93.184.216.34'))
+    session = MagicMock()
+    response = MagicMock(is_redirect=False)
+    response.iter_content.return_value = [_jpeg()]
+    session.get.return_value = response
+    monkeypatch.setattr(thumbnail_service, '_session', session)
+    monkeypatch.setattr(thumbnail_service, '_sources', None)
+    return session
+
+
+@pytest.fixture
+def recipe_with_image(sample_recipes, db_session):
+    recipe = sample_recipes[0]
+    recipe.image_url = 'https://images.example/adobo.jpg'
+    db_session.commit()
+    return recipe
+
+
+class TestRecipeThumbnail:
+    """Tests for recipe image thumbnails."""
+
+    def test_serves_webp_at_fixed_width(self, client, thumbnails, recipe_with_image):
+        resp = client.get(f'/api/recipes/{recipe_with_image.id}/image/thumb?w=100')
+        assert resp.status_code == 200
+        assert resp.mimetype == 'image/webp'
+        assert 'max-age=604800' in resp.headers['Cache-Control']
+        assert 'public' in resp.headers['Cache-Control']
+        assert resp.headers['ETag'].endswith('-120"')
+
+        thumb = Image.open(io.BytesIO(resp.data))
+        assert thumb.format == 'WEBP'
+        assert thumb.size == (120, 90)
+
+    def test_source_fetched_once(self, client, thumbnails, recipe_with_image, tmp_path):
+        for w in (100, 240, 480, 2000):
+            assert client.get(f'/api/recipes/{recipe_with_image.id}/image/thumb?w={w}').status_code == 200
+        assert thumbnails.get.call_count == 1
+
+        files = sorted(name for _, _, names in os.walk(tmp_path) for name in names if name.endswith('.webp'))
+        assert files == ['120.webp', '240.webp', '480.webp']
+
+    def test_conditional_request(self, client, thumbnails, recipe_with_image):
+        url = f'/api/recipes/{recipe_with_image.id}/image/thumb?w=240'
+        etag = client.get(url).headers['ETag']
+        resp = client.get(url, headers={'If-None-Match': etag})
+        assert resp.status_code == 304
+
+    def test_new_image_url_refetches(self, client, thumbnails, recipe_with_image):
+        url = f'/api/recipes/{recipe_with_image.id}/image/thumb'
+        client.get(url)
+        recipe_with_image.image_url = 'https://images.example/adobo-v2.jpg'
+        db.session.commit()
+        client.get(url)
+        assert thumbnails.get.call_count == 2
+
+    def test_recipe_without_image(self, client, thumbnails, sample_recipes):
+        resp = client.get(f'/api/recipes/{sample_recipes[1].id}/image/thumb')
+        assert resp.status_code == 404
+
+    def test_invalid_width(self, client, thumbnails, recipe_with_image):
+        resp = client.get(f'/api/recipes/{recipe_with_image.id}/image/thumb?w=abc')
+        assert resp.status_code == 400
+
+    def test_undecodable_source(self, client, thumbnails, recipe_with_image):
+        thumbnails.get.return_value.iter_content.return_value = [b'not an image']
+        resp = client.get(f'/api/recipes/{recipe_with_image.id}/image/thumb')
+        assert resp.status_code == 502
+
+    def test_oversized_source(self, app, client, thumbnails, recipe_with_image):
+        app.config['THUMBNAIL_MAX_SOURCE_BYTES'] = 100
+        resp = client.get(f'/api/recipes/{recipe_with_image.id}/image/thumb')
+        assert resp.status_code == 502
+
+
+class TestThumbnailSourceURLs:
+    """The server only fetches thumbnail sources from public hosts."""
+
+    @pytest.mark.parametrize('image_url', [
+        'http://127.0.0.1/admin.jpg',
+        'http://169.254.169.254/latest/meta-data/',
+        'http://[::1]:8080/x.jpg',
+        'http://10.0.0.8/x.jpg',
+        'file:///etc/passwd',
+        'ftp://images.example/x.jpg',
+    ])
+    def test_internal_url_refused(self, client, thumbnails, recipe_with_image, image_url):
+        recipe_with_image.image_url = image_url
+        db.session.commit()
+
+        resp = client.get(f'/api/recipes/{recipe_with_image.id}/image/thumb')
+        assert resp.status_code == 502
+        assert thumbnails.get.call_count == 0
+
+    def test_host_resolving_to_private_address_refused(self, client, thumbnails, recipe_with_image, monkeypatch):
+        monkeypatch.setattr('app.utils.urls.socket.getaddrinfo', _addresses('93.184.216.34', '192.168.1.10'))
+        resp = client.get(f'/api/recipes/{recipe_with_image.id}/image/thumb')
+        assert resp.status_code == 502
+        assert thumbnails.get.call_count == 0
+
+    def test_redirect_to_internal_address_refused(self, client, thumbnails, recipe_with_image):
+        redirect = MagicMock(is_redirect=True, headers={'Location': 'http://169.254.169.254/latest/'})
+        thumbnails.get.return_value = redirect
+
+        resp = client.get(f'/api/recipes/{recipe_with_image.id}/image/thumb')
+        assert resp.status_code == 502
+        assert thumbnails.get.call_count == 1
+        assert thumbnails.get.call_args.kwargs['allow_redirects'] is False
+
+    def test_public_redirect_followed(self, client, thumbnails, recipe_with_image):
+        final = thumbnails.get.return_value
+        redirect = MagicMock(is_redirect=True, headers={'Location': '/cdn/adobo.jpg'})
+        thumbnails.get.side_effect = [redirect, final]
+
+        resp = client.get(f'/api/recipes/{recipe_with_image.id}/image/thumb')
+        assert resp.status_code == 200
+        assert thumbnails.get.call_args.args[0] == 'https://images.example/cdn/adobo.jpg'
+
+    def test_allowed_hosts(self, app, client, thumbnails, recipe_with_image):
+        app.config['THUMBNAIL_ALLOWED_HOSTS'] = ['cdn.example']
+        assert client.get(f'/api/recipes/{recipe_with_image.id}/image/thumb').status_code == 502
+
+        app.config['THUMBNAIL_ALLOWED_HOSTS'] = ['example']
+        assert client.get(f'/api/recipes/{recipe_with_image.id}/image/thumb').status_code == 200
+
+
+@pytest.fixture
+def local_server():
+    """An HTTP server on 127.0.0.1 recording the paths it serves."""
+    served = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            served.append(self.path)
+            self.send_response(200)
+            self.send_header('Content-Length', '2')
+            self.end_headers()
+            self.wfile.write(b'ok')
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server.server_address[1], served
+    server.shutdown()
+    server.server_close()
+
+
+class TestPublicHTTPAdapter:
+    """The adapter connects only to the public address it checked."""
+
+    @pytest.fixture
+    def session(self):
+        session = requests.Session()
+        adapter = PublicHTTPAdapter()
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    def test_dns_rebinding_refused(self, session, local_server, monkeypatch):
+        port, served = local_server
+        answers = iter(['93.184.216.34', '127.0.0.1'])
+        monkeypatch.setattr('app.utils.urls.socket.getaddrinfo',
+                            lambda host, p, **kwargs: _addresses(next(answers))(host, p))
+
+        url = f'http://rebind.example:{port}/latest/meta-data/'
+        check_public_url(url)  # First answer is public
+        with pytest.raises(requests.exceptions.ConnectionError, match='non-public address 127.0.0.1'):
+            session.get(url, timeout=5)
+        assert served == []
+
+    def test_connects_to_checked_address(self, session, local_server, monkeypatch):
+        port, served = local_server
+        lookups = []
+
+        def resolve(host, p, *args, **kwargs):
+            lookups.append(host)
+            return _addresses('127.0.0.1')(host, p)
+
+        monkeypatch.setattr('app.utils.urls.socket.getaddrinfo', resolve)
+        monkeypatch.setattr('app.utils.urls.is_public_address', lambda address: True)
+
+        resp = session.get(f'http://images.example:{port}/adobo.jpg', timeout=5)
+        assert resp.content == b'ok'
+        assert served == ['/adobo.jpg']
+        # The hostname is resolved once; the socket opens to the checked IP
+        assert lookups == ['images.example', '127.0.0.1']
+
+    def test_thumbnail_session_uses_adapter(self, monkeypatch):
+        monkeypatch.setattr(thumbnail_service, '_session', None)
+        session = thumbnail_service._get_session()
+        assert isinstance(session.get_adapter('https://images.example/x.jpg'), PublicHTTPAdapter)
+        assert isinstance(session.get_adapter('http://images.example/x.jpg'), PublicHTTPAdapter)
@@ -0,0 +1,64 @@
+"""Tests for the orjson JSON provider and response compression."""
+
+import gzip
+import json
+from datetime import date
+from decimal import Decimal
+
+from app.utils.json_provider import ORJSONProvider
+
+
+class TestJSONProvider:
+    """Tests for the fast JSON provider."""
+
+    def test_provider_installed(self, app):
+        """create_app installs the orjson provider."""
+        assert isinstance(app.json, ORJSONProvider)
+
+    def test_dumps_fallback_types(self, app):
+        """Types orjson can't handle natively go through the default hook."""
+        with app.app_context():
+            data = json.loads(app.json.dumps({'price': Decimal('1.50'), 1: 'int key'}))
+        assert data == {'price': '1.50', '1': 'int key'}
+
+    def test_dumps_with_options_delegates(self, app):
+        """json-module options are still honoured."""
+        with app.app_context():
+            assert app.json.dumps({'b': 1, 'a': 2}, sort_keys=True, indent=None) == '{"a": 2, "b": 1}'
+
+    def test_response_roundtrip(self, app):
+        """Responses decode to the same data."""
+        with app.test_request_context():
+            resp = app.json.response({'day': date(2026, 1, 5).isoformat(), 'n': [1, 2]})
+        assert resp.mimetype == 'application/json'
+        assert json.loads(resp.get_data()) == {'day': '2026-01-05', 'n': [1, 2]}
+
+
+class TestCompression:
+    """Tests for gzip compression of large responses."""
+
+    def test_large_response_gzipped(self, client, sample_recipes):
+        """Responses above the threshold are gzipped when accepted."""
+        resp = client.post('/api/recipes/search',
+                           data=json.dumps({'ingredients': ['Onion', 'Chicken']}),
+                           content_type='application/json',
+                           headers={'Accept-Encoding': 'gzip'})
+
+        assert resp.headers['Content-Encoding'] == 'gzip'
+        assert 'Accept-Encoding' in resp.headers['Vary']
+        body = json.loads(gzip.decompress(resp.data))
+        assert body['total'] == 3
+
+    def test_small_response_not_compressed(self, client):
+        """Responses under the threshold are left alone."""
+        resp = client.get('/health', headers={'Accept-Encoding': 'gzip'})
+        assert 'Content-Encoding' not in resp.headers
+        assert resp.get_json()['status'] == 'healthy'
+
+    def test_not_compressed_without_accept_encoding(self, client, sample_recipes):
+        """Clients that don't accept gzip get plain JSON."""
+        resp = client.post('/api/recipes/search',
+                           data=json.dumps({'ingredients': ['Onion', 'Chicken']}),
+                           content_type='application/json')
+        assert 'Content-Encoding' not in resp.headers
+        assert resp.get_json()['total'] == 3
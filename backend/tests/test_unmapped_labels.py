@@ -0,0 +1,129 @@
+"""Tests for buffered unmapped-label counting and the ranked endpoint."""
+
+import pytest
+from sqlalchemy import event
+
+from app import db
+from app.models import UnmappedLabel
+from app.services.unmapped_labels import UnmappedLabelCounter, unmapped_label_counter
+from tests.conftest import make_vision_response
+
+
+@pytest.fixture
+def statements(app):
+    """INSERT statements executed against the database."""
+    executed = []
+
+    def before_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('INSERT INTO UNMAPPED_LABELS'):
+            executed.append(statement)
+
+    engine = db.engine
+    event.listen(engine, 'before_cursor_execute', before_execute)
+    yield executed
+    event.remove(engine, 'before_cursor_execute', before_execute)
+
+
+def counts():
+    return {row.label: row.occurrence_count for row in UnmappedLabel.query}
+
+
+class TestUnmappedLabelCounter:
+    """Tests for UnmappedLabelCounter buffering and flushing."""
+
+    def test_buffers_until_flush_size(self, db_session, statements):
+        counter = UnmappedLabelCounter(flush_size=10, flush_interval=3600)
+        for _ in range(4):
+            counter.add([('Kitchen appliance', 0.8), ('Countertop', 0.6)])
+        assert statements == []
+        assert len(counter) == 8
+
+        counter.add([('Kitchen appliance', 0.9), ('Shelf', 0.5)])
+        assert len(statements) == 1
+        assert len(counter) == 0
+        assert counts() == {'kitchen appliance': 5, 'countertop': 4, 'shelf': 1}
+
+    def test_counts_accumulate_across_flushes(self, db_session):
+        counter = UnmappedLabelCounter(flush_size=1000)
+        counter.add([('Shelf', 0.5)])
+        counter.flush()
+        counter.add([('Shelf', 0.7), ('Jar', 0.9)])
+        counter.flush()
+
+        shelf = UnmappedLabel.query.filter_by(label='shelf').one()
+        assert shelf.occurrence_count == 2
+        assert shelf.to_dict()['average_score'] == pytest.approx(0.6)
+        assert counts()['jar'] == 1
+
+    def test_label_counted_once_per_image(self, db_session):
+        counter = UnmappedLabelCounter()
+        counter.add([('Jar', 0.9), ('jar ', 0.7)])
+        assert len(counter) == 1
+
+    def test_flushes_after_interval(self, db_session, monkeypatch):
+        now = [100.0]
+        monkeypatch.setattr('app.services.unmapped_labels.time.monotonic', lambda: now[0])
+        counter = UnmappedLabelCounter(flush_size=1000, flush_interval=60)
+        counter.add([('Jar', 0.9)])
+        now[0] += 61
+        counter.add([('Shelf', 0.5)])
+
+        assert counts() == {'jar': 1, 'shelf': 1}
+
+    def test_failed_flush_keeps_counts(self, db_session, monkeypatch):
+        counter = UnmappedLabelCounter(flush_size=1000)
+        counter.add([('Jar', 0.9)])
+
+        def fail(*args, **kwargs):
+            raise RuntimeError('connection reset')
+        monkeypatch.setattr(db.session, 'execute', fail)
+        assert counter.flush() == 0
+        assert len(counter) == 1
+
+        monkeypatch.undo()
+        counter.add([('Jar', 0.8)])
+        counter.flush()
+        assert counts() == {'jar': 2}
+
+
+class TestDetectorUnmappedLabels:
+    """The detector counts labels no mapping covers."""
+
+    def test_only_unknown_labels_counted(self, vision_detector, monkeypatch):
+        pytest.importorskip('google.cloud.vision')
+        counter = UnmappedLabelCounter(flush_size=1000)
+        vision_detector.unmapped_counter = counter
+        vision_detector._get_learned_mappings = lambda: {'leaf vegetable': 'Pechay'}
+        vision_detector.client.annotate_image.return_value = make_vision_response(
+            labels=[('Chicken', 0.9), ('Food', 0.9), ('Leaf vegetable', 0.8), ('Kitchen appliance', 0.7)],
+            objects=[('Countertop', 0.6)],
+        )
+        vision_detector.detect_from_bytes(b'photo')
+        counter.flush()
+
+        assert counts() == {'kitchen appliance': 1, 'countertop': 1}
+
+
+class TestUnmappedLabelsEndpoint:
+    """Tests for GET /api/ingredients/detect/unmapped-labels."""
+
+    def test_requires_auth(self, client):
+        assert client.get('/api/ingredients/detect/unmapped-labels').status_code == 401
+
+    def test_ranked_with_buffered_counts(self, client, auth_headers, db_session):
+        db_session.add(UnmappedLabel(label='countertop', occurrence_count=3, score_sum=1.8))
+        db_session.add(UnmappedLabel(label='jar', occurrence_count=1, score_sum=0.9))
+        db_session.commit()
+        for _ in range(4):
+            unmapped_label_counter.add([('Shelf', 0.5)])
+
+        resp = client.get('/api/ingredients/detect/unmapped-labels?min_count=2', headers=auth_headers)
+
+        assert resp.status_code == 200
+        body = resp.get_json()
+        assert [(item['label'], item['count']) for item in body['labels']] == [('shelf', 4), ('countertop', 3)]
+        assert body['labels'][1]['average_score'] == pytest.approx(0.6)
+
+    def test_invalid_limit(self, client, auth_headers):
+        resp = client.get('/api/ingredients/detect/unmapped-labels?limit=0', headers=auth_headers)
+        assert resp.status_code == 400
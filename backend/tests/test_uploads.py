@@ -0,0 +1,111 @@
+"""Tests for size-bounded upload reading."""
+
+import io
+import tempfile
+from unittest.mock import patch
+
+import pytest
+from werkzeug.datastructures import FileStorage
+
+from app.utils.uploads import UploadTooLarge, read_upload
+from tests.conftest import make_mock_detector, make_test_image
+
+
+class CountingStream(io.RawIOBase):
+    """A non-seekable stream that records how many bytes were read."""
+
+    def __init__(self, size):
+        self.remaining = size
+        self.bytes_read = 0
+
+    def readable(self):
+        return True
+
+    def read(self, n=-1):
+        n = self.remaining if n < 0 else min(n, self.remaining)
+        self.remaining -= n
+        self.bytes_read += n
+        return b'x' * n
+
+
+class TestReadUpload:
+    """Tests for read_upload."""
+
+    def test_reads_spooled_file(self):
+        spooled = tempfile.SpooledTemporaryFile(max_size=16)
+        spooled.write(b'a' * 100)  # rolled over to disk
+        spooled.seek(0)
+        assert read_upload(FileStorage(spooled, 'photo.jpg'), max_size=100) == b'a' * 100
+
+    def test_seekable_too_large_rejected_without_reading(self):
+        stream = io.BytesIO(b'a' * 101)
+        with pytest.raises(UploadTooLarge):
+            read_upload(FileStorage(stream, 'photo.jpg'), max_size=100)
+        assert stream.tell() == 0
+
+    def test_unknown_length_aborts_early(self):
+        stream = CountingStream(50 * 1024 * 1024)
+        with pytest.raises(UploadTooLarge):
+            read_upload(stream, max_size=1024 * 1024, chunk_size=256 * 1024)
+        assert stream.bytes_read <= 1024 * 1024 + 256 * 1024
+
+    def test_unknown_length_within_limit(self):
+        assert read_upload(CountingStream(1000), max_size=1000, chunk_size=300) == b'x' * 1000
+
+
+class TestDetectUploadLimits:
+    """The /detect endpoints pass the bounded upload to the detector."""
+
+    @patch('app.api.ingredients.get_vision_detector')
+    def test_detect_passes_upload_bytes(self, mock_get_det, client, auth_headers):
+        detector = make_mock_detector()
+        mock_get_det.return_value = detector
+        resp = client.post('/api/ingredients/detect', data={'image': make_test_image(content=b'shelf')},
+                           content_type='multipart/form-data', headers=auth_headers)
+
+        assert resp.status_code == 200
+        assert detector.detect_from_bytes.call_args.args[0] == b'shelf'
+
+    @patch('app.api.ingredients.get_vision_detector')
+    def test_batch_rejects_oversized_image(self, mock_get_det, client, auth_headers):
+        detector = make_mock_detector()
+        mock_get_det.return_value = detector
+        files = [make_test_image('a.jpg'), make_test_image('b.jpg', size=10 * 1024 * 1024 + 1)]
+        resp = client.post('/api/ingredients/detect/batch', data={'images': files},
+                           content_type='multipart/form-data', headers=auth_headers)
+
+        assert resp.status_code == 400
+        assert resp.get_json()['error'].startswith('b.jpg: Image too large')
+        detector.detect_batch_from_bytes.assert_not_called()
+
+
+class TestRequestBodyLimits:
+    """The batch endpoint accepts a full batch beyond MAX_CONTENT_LENGTH."""
+
+    @patch('app.api.ingredients.get_vision_detector')
+    def test_batch_accepts_body_over_app_limit(self, mock_get_det, app, client, auth_headers):
+        detector = make_mock_detector()
+        detector.detect_batch_from_bytes.return_value = [[], [], []]
+        mock_get_det.return_value = detector
+        size = 7 * 1024 * 1024
+        files = [make_test_image(f'{i}.jpg', size=size) for i in range(3)]
+        assert 3 * size > app.config['MAX_CONTENT_LENGTH']
+
+        resp = client.post('/api/ingredients/detect/batch', data={'images': files},
+                           content_type='multipart/form-data', headers=auth_headers)
+
+        assert resp.status_code == 200
+        assert resp.get_json()['total_images'] == 3
+
+    def test_batch_limit_follows_batch_cap(self, app, client, auth_headers):
+        app.config['DETECTION_BATCH_MAX_IMAGES'] = 1
+        files = [make_test_image(f'{i}.jpg', size=9 * 1024 * 1024) for i in range(2)]
+        resp = client.post('/api/ingredients/detect/batch', data={'images': files},
+                           content_type='multipart/form-data', headers=auth_headers)
+        assert resp.status_code == 413
+
+    def test_other_routes_keep_app_limit(self, app, client, auth_headers):
+        resp = client.post('/api/ingredients/detect',
+                           data={'image': make_test_image(size=app.config['MAX_CONTENT_LENGTH'] + 1)},
+                           content_type='multipart/form-data', headers=auth_headers)
+        assert resp.status_code == 413